@@ -21,7 +21,8 @@ from .geometry import (
     PERFORMER_HALF_WIDTH,
     PERFORMER_HEIGHT,
     PERFORMER_WIDTH,
-    ObjectBounds
+    ObjectBounds,
+    ObjectBoundsIndex
 )
 from .interactive_goals import (
     InteractiveGoal,
@@ -3,7 +3,17 @@ from __future__ import annotations
 import copy
 import random
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union
+)
 
 from machine_common_sense.config_manager import Vector3d
 from shapely import geometry
@@ -8311,21 +8321,37 @@ for key, details in _TYPES_TO_DETAILS.items():
         _MATERIAL_TO_VALID_TYPE["_all_types"].append(key)
 
 
+# Map each type to its set of valid material strings (all the unrestricted
+# types share the same set).
+_UNRESTRICTED_MATERIAL_SET = frozenset(ALL_UNRESTRICTED_MATERIAL_STRINGS)
+_TYPE_TO_VALID_MATERIAL_SET = {
+    key: _UNRESTRICTED_MATERIAL_SET if (
+        details.material_restrictions is None
+    ) else frozenset(material[0] for material in details.material_restrictions)
+    for key, details in _TYPES_TO_DETAILS.items()
+}
+
+
 def get_type_from_material(material: str) -> str:
     """Given a material string, return a type/shape or None if a valid
     type/shape cannot be found."""
+    type_list = get_valid_types_for_material(material)
+    return random.choice(type_list) if type_list else None
+
+
+def get_valid_types_for_material(material: str) -> List[str]:
+    """Return the list of all types/shapes that are valid for the given
+    material string."""
     type_list = (
         _MATERIAL_TO_VALID_TYPE.get(material, []) +
         _MATERIAL_TO_VALID_TYPE["_all_types"])
     # not empty or None
     if type_list:
-        shape = random.choice(type_list)
-    else:
-        shape = random.choice(FULL_TYPE_LIST)
-    if is_valid_shape_material(shape, material):
-        return shape
-    else:
-        return None
+        return type_list
+    return [
+        shape for shape in FULL_TYPE_LIST
+        if is_valid_shape_material(shape, material)
+    ]
 
 
 def get_material_restriction_strings(shape: str) -> List[str]:
@@ -8356,6 +8382,12 @@ def get_material_restriction_tuples(shape: str) -> List[MaterialTuple]:
     return []
 
 
+def get_material_restriction_set(shape: str) -> Optional[FrozenSet[str]]:
+    """Return the set of materials that are valid for the given shape (see
+    get_material_restriction_strings), or None if the shape is unknown."""
+    return _TYPE_TO_VALID_MATERIAL_SET.get(shape)
+
+
 def has_material_restriction(shape: str) -> bool:
     """Returns whether the given shape has a material restriction or not"""
     return shape in _TYPES_TO_DETAILS and _TYPES_TO_DETAILS[shape] is not None
@@ -1,6 +1,8 @@
 from enum import Enum, auto
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
 from .definitions import ObjectDefinition
 from .geometry import (
     ORIGIN,
@@ -278,7 +280,61 @@ def can_contain_both(
         if cx >= width and cz >= depth:
             return area_index, [90, 90], Orientation.FRONT_TO_BACK
 
-        return None
+    return None
+
+
+def _find_enclose_mask(
+    area_dimensions: np.ndarray,
+    target: ObjectDefinition
+) -> np.ndarray:
+    # Vectorized can_enclose: whether the target fits in each area either
+    # normally or rotated 90 degrees (NaN, or missing, areas never fit).
+    x = area_dimensions[..., 0]
+    y = area_dimensions[..., 1]
+    z = area_dimensions[..., 2]
+    return (y >= target.dimensions.y) & (
+        ((x >= target.dimensions.x) & (z >= target.dimensions.z)) |
+        ((x >= target.dimensions.z) & (z >= target.dimensions.x))
+    )
+
+
+def find_enclosable_mask(
+    area_dimensions: np.ndarray,
+    definition_a: ObjectDefinition,
+    definition_b: ObjectDefinition = None
+) -> np.ndarray:
+    """Return a mask of each container, given the X/Y/Z dimensions of its
+    enclosed areas (as an array shaped by container, area, and axis, padded
+    with NaN), for which can_contain would return an enclosed area."""
+    mask = ~np.isnan(area_dimensions[..., 0])
+    for definition in [definition_a, definition_b]:
+        if definition:
+            mask &= _find_enclose_mask(area_dimensions, definition)
+    return mask.any(axis=-1)
+
+
+def find_enclosable_both_mask(
+    area_dimensions: np.ndarray,
+    definition_a: ObjectDefinition,
+    definition_b: ObjectDefinition
+) -> np.ndarray:
+    """Return a mask of each container, given the X/Y/Z dimensions of its
+    enclosed areas (as an array shaped by container, area, and axis, padded
+    with NaN), for which can_contain_both would return an enclosed area."""
+    ax = definition_a.dimensions.x
+    bx = definition_b.dimensions.x
+    az = definition_a.dimensions.z
+    bz = definition_b.dimensions.z
+    cx = area_dimensions[..., 0]
+    cz = area_dimensions[..., 2]
+    mask = np.zeros(cx.shape, dtype=bool)
+    # Try each side-by-side and front-to-back layout tried by
+    # can_contain_both (with each object rotated 0 or 90 degrees).
+    for a_width, a_depth in [(ax, az), (az, ax)]:
+        for b_width, b_depth in [(bx, bz), (bz, bx)]:
+            mask |= (cx >= a_width + b_width) & (cz >= max(a_depth, b_depth))
+            mask |= (cx >= max(a_width, b_width)) & (cz >= a_depth + b_depth)
+    return mask.any(axis=-1)
 
 
 def shift_lid_positions_based_on_movement(objects):
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
 import copy
+import gc
+import hashlib
+import json
 import math
+import os
+import pickle
 import random
+import tempfile
 from abc import ABC, abstractmethod
 from collections import namedtuple
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 from machine_common_sense.config_manager import Vector3d
 
 from . import materials, tags
@@ -16,6 +23,18 @@ from .objects import SceneObject
 
 MAX_SIZE_DIFF = 0.05
 
+# The folder for the on-disk cache of fully expanded definition datasets
+# (shared by all processes), or an empty string (the default) to disable the
+# cache.
+DATASET_CACHE_FOLDER = os.path.expanduser(
+    os.environ.get('MCS_DATASET_CACHE_FOLDER', '')
+)
+
+# Increase this version whenever a change to code outside of this module and
+# the materials module changes how definitions are expanded, so the dataset
+# cache won't return stale expansions.
+DATASET_CACHE_VERSION = 1
+
 
 class _DefinitionChoice(ABC):
 
@@ -615,6 +634,16 @@ def _create_size_list(
     return size_list
 
 
+def _find_similarity_type(type_name: str) -> str:
+    """Return the given object type as compared by the is_similar_except
+    functions: all apple types are the same, and all crayon types are the
+    same."""
+    for type_prefix in ['apple', 'crayon']:
+        if type_name.startswith(type_prefix):
+            return type_prefix
+    return type_name
+
+
 def do_materials_match(
     materials_1: List[str],
     materials_2: List[str],
@@ -658,11 +687,8 @@ def is_similar_except_in_color(
         color_2 = definition_or_instance_2.color or []
 
     # Special cases for specific object types.
-    for type_prefix in ['apple', 'crayon']:
-        if type_1.startswith(type_prefix):
-            type_1 = type_prefix
-        if type_2.startswith(type_prefix):
-            type_2 = type_prefix
+    type_1 = _find_similarity_type(type_1)
+    type_2 = _find_similarity_type(type_2)
 
     size_list = _create_size_list(
         definition_or_instance_1,
@@ -710,11 +736,8 @@ def is_similar_except_in_shape(
         color_2 = definition_or_instance_2.color or []
 
     # Special cases for specific object types.
-    for type_prefix in ['apple', 'crayon']:
-        if type_1.startswith(type_prefix):
-            type_1 = type_prefix
-        if type_2.startswith(type_prefix):
-            type_2 = type_prefix
+    type_1 = _find_similarity_type(type_1)
+    type_2 = _find_similarity_type(type_2)
 
     size_list = _create_size_list(
         definition_or_instance_1,
@@ -762,11 +785,8 @@ def is_similar_except_in_size(
         color_2 = definition_or_instance_2.color or []
 
     # Special cases for specific object types.
-    for type_prefix in ['apple', 'crayon']:
-        if type_1.startswith(type_prefix):
-            type_1 = type_prefix
-        if type_2.startswith(type_prefix):
-            type_2 = type_prefix
+    type_1 = _find_similarity_type(type_1)
+    type_2 = _find_similarity_type(type_2)
 
     size_list = _create_size_list(
         definition_or_instance_1,
@@ -832,6 +852,128 @@ ImmutableObjectDefinition = namedtuple(
 )
 
 
+def _expand_definition_list(
+    definition_list: List[List[ObjectDefinition]]
+) -> List[List[List[Tuple[ImmutableObjectDefinition]]]]:
+    """Return each possible choice (including materials) of each definition
+    in the given list, unshuffled and immutable, like
+    retrieve_complete_definition_list, but still grouped by definition."""
+    output_list = []
+    for definition_selections in definition_list:
+        output_selections = []
+        for definition in definition_selections:
+            output_choices = []
+            for intermediate_definition in finalize_each_definition_choice(
+                definition,
+                unshuffled=True
+            ):
+                output_choices.append(tuple(
+                    # Convert the object definition to an immutable namedtuple.
+                    ImmutableObjectDefinition(**vars(definition_variation))
+                    for definition_variation in (
+                        finalize_object_materials_and_colors(
+                            intermediate_definition,
+                            unshuffled=True
+                        )
+                    )
+                ))
+            output_selections.append(output_choices)
+        output_list.append(output_selections)
+    return output_list
+
+
+def _is_expansion_random(definition_list: List[List[ObjectDefinition]]):
+    """Return whether expanding the given definition list would randomly
+    choose a material or size (from a list set by a type choice) rather than
+    use each possible choice, so its expansion can't be cached."""
+    return any(
+        (choice.chooseMaterialList and not definition.chooseMaterialList) or
+        (choice.chooseSizeList and not definition.chooseSizeList)
+        for definition_selections in definition_list
+        for definition in definition_selections
+        for choice in definition.chooseTypeList
+    )
+
+
+def _to_cache_key_data(data: Any) -> Any:
+    """Return the given data, which isn't otherwise JSON serializable, as
+    plain data for a dataset cache key, the same in every process: sets are
+    sorted, and objects (like definitions and vectors) become dicts."""
+    if isinstance(data, (set, frozenset)):
+        return sorted(data, key=str)
+    if isinstance(data, Enum):
+        return data.value
+    if hasattr(data, 'dict'):
+        # A pydantic model, like a Vector3d.
+        return data.dict()
+    return {'__class__': type(data).__name__, **vars(data)}
+
+
+def _find_dataset_cache_key(
+    definition_list: List[List[ObjectDefinition]]
+) -> str:
+    """Return the cache key for the expansion of the given definition list,
+    which changes if the definitions, the materials, the code of this module
+    or the materials module, or the DATASET_CACHE_VERSION change. The key is
+    the same in every process, regardless of its hash seed."""
+    sources = []
+    for filename in [__file__, materials.__file__]:
+        with open(filename, 'rb') as source_file:
+            sources.append(source_file.read().decode())
+    # Some materials lists are made from sets, so sort them.
+    materials_lists = {
+        key: sorted(value, key=str) if isinstance(value, list) else value
+        for key, value in vars(materials).items() if key.isupper()
+    }
+    return hashlib.sha256(json.dumps([
+        DATASET_CACHE_VERSION,
+        definition_list,
+        materials_lists,
+        sources
+    ], default=_to_cache_key_data, sort_keys=True).encode()).hexdigest()
+
+
+def _load_expanded_definition_list(
+    definition_list: List[List[ObjectDefinition]]
+) -> List[List[List[Tuple[ImmutableObjectDefinition]]]]:
+    """Return the expansion of the given definition list (see
+    _expand_definition_list) from the dataset cache, if possible; otherwise
+    expand it and save it to the cache."""
+    if not DATASET_CACHE_FOLDER or _is_expansion_random(definition_list):
+        return _expand_definition_list(definition_list)
+    filename = os.path.join(
+        DATASET_CACHE_FOLDER,
+        f'dataset_{_find_dataset_cache_key(definition_list)}.pickle'
+    )
+    # Loading is much faster without the garbage collector.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(filename, 'rb') as cache_file:
+            return pickle.load(cache_file)
+    except Exception:
+        # The cache file is missing, incomplete, or otherwise unreadable.
+        pass
+    finally:
+        if gc_enabled:
+            gc.enable()
+    expanded = _expand_definition_list(definition_list)
+    try:
+        os.makedirs(DATASET_CACHE_FOLDER, exist_ok=True)
+        # Write to a temporary file first, so other processes never read an
+        # incomplete cache file.
+        with tempfile.NamedTemporaryFile(
+            dir=DATASET_CACHE_FOLDER,
+            delete=False
+        ) as cache_file:
+            pickle.dump(expanded, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_file.name, filename)
+    except OSError:
+        # The cache is only an optimization, so just skip saving it.
+        pass
+    return expanded
+
+
 def create_dataset(
     definition_list: List[List[ObjectDefinition]],
     # We should only ever set unshuffled to True in a unit test.
@@ -839,31 +981,254 @@ def create_dataset(
 ) -> DefinitionDataset:
     """Create and return a new DefinitionDataset for the given definition
     list by retrieving all choice and material combinations for all definitions
-    in the list and making them immutable."""
+    in the list and making them immutable. The unshuffled combinations are
+    saved in (and loaded from) the dataset cache, then shuffled in the same
+    order as retrieve_complete_definition_list would, so the dataset is the
+    same with or without the cache (given the same random seed)."""
 
-    complete_definition_list = retrieve_complete_definition_list(
-        definition_list,
-        unshuffled=unshuffled
-    )
+    expanded_definition_list = _load_expanded_definition_list(definition_list)
 
     immutable_groups = []
-    for definition_selections in complete_definition_list:
+    for definition_selections in expanded_definition_list:
         immutable_selections = []
-        for definition_variations in definition_selections:
-            immutable_variations = [
-                # Convert the object definition to an immutable namedtuple.
-                ImmutableObjectDefinition(**vars(definition))
-                for definition in definition_variations
-            ]
-            # Convert the list to a tuple so it will be immutable.
-            immutable_selections.append(tuple(immutable_variations))
+        for definition_choices in definition_selections:
+            definition_choices = list(definition_choices)
+            if not unshuffled:
+                random.shuffle(definition_choices)
+            for definition_variations in definition_choices:
+                definition_variations = list(definition_variations)
+                if not unshuffled:
+                    random.shuffle(definition_variations)
+                # Convert the list to a tuple so it will be immutable.
+                immutable_selections.append(tuple(definition_variations))
+        if not unshuffled:
+            random.shuffle(immutable_selections)
         # Convert the list to a tuple so it will be immutable.
         immutable_groups.append(tuple(immutable_selections))
 
+    if not unshuffled:
+        random.shuffle(immutable_groups)
     # Convert the list to a tuple so it will be immutable.
     return DefinitionDataset(tuple(immutable_groups))
 
 
+# The untrained tags, in the order of the untrained columns in
+# _DefinitionColumns.
+UNTRAINED_TAGS = [
+    tags.SCENE.UNTRAINED_CATEGORY,
+    tags.SCENE.UNTRAINED_COLOR,
+    tags.SCENE.UNTRAINED_COMBINATION,
+    tags.SCENE.UNTRAINED_SHAPE,
+    tags.SCENE.UNTRAINED_SIZE
+]
+
+
+class _DefinitionColumns():
+    """Columnar (NumPy) data of all the definitions in a DefinitionDataset,
+    flattened in order, so the common filters are vectorized masks. Types and
+    materials are stored as integer codes, and colors as a boolean column per
+    color, each with an inverted index from each type name, materials list, or
+    color to its code (shared by all subsets of the same columns)."""
+
+    def __init__(
+        self,
+        definition_groups: Tuple[Tuple[Tuple[ImmutableObjectDefinition]]]
+    ) -> None:
+        definitions = []
+        group_ids = []
+        selection_ids = []
+        selection_id = 0
+        for group_id, definition_selections in enumerate(definition_groups):
+            for definition_variations in definition_selections:
+                for definition in definition_variations:
+                    definitions.append(definition)
+                    group_ids.append(group_id)
+                    selection_ids.append(selection_id)
+                selection_id += 1
+        self.definitions = definitions
+        self.group_ids = np.array(group_ids, dtype=int)
+        self.selection_ids = np.array(selection_ids, dtype=int)
+        self.type_index: Dict[str, int] = {}
+        self.similarity_type_index: Dict[str, int] = {}
+        self.type_codes = np.array([
+            self.type_index.setdefault(definition.type, len(self.type_index))
+            for definition in definitions
+        ], dtype=int)
+        self.similarity_type_codes = np.array([
+            self.similarity_type_index.setdefault(
+                _find_similarity_type(definition.type or ''),
+                len(self.similarity_type_index)
+            ) for definition in definitions
+        ], dtype=int)
+        # Each definition without any materials has a material code of -1.
+        self.material_index: Dict[Tuple[str], int] = {}
+        self.material_codes = np.array([
+            self.material_index.setdefault(
+                tuple(definition.materials),
+                len(self.material_index)
+            ) if definition.materials else -1
+            for definition in definitions
+        ], dtype=int)
+        self.color_index: Dict[str, int] = {}
+        for definition in definitions:
+            for color in definition.color or []:
+                self.color_index.setdefault(color, len(self.color_index))
+        self.colors = np.zeros(
+            (len(definitions), len(self.color_index)),
+            dtype=bool
+        )
+        for index, definition in enumerate(definitions):
+            for color in definition.color or []:
+                self.colors[index, self.color_index[color]] = True
+        self.dimensions = np.array([
+            [
+                definition.dimensions.x,
+                definition.dimensions.y,
+                definition.dimensions.z
+            ] if definition.dimensions else [np.nan, np.nan, np.nan]
+            for definition in definitions
+        ], dtype=float).reshape((len(definitions), 3))
+        self.untrained = np.array([
+            [bool(getattr(definition, tag, False)) for tag in UNTRAINED_TAGS]
+            for definition in definitions
+        ], dtype=bool).reshape((len(definitions), len(UNTRAINED_TAGS)))
+        # The X/Y/Z dimensions of each definition's enclosed areas, padded
+        # with NaN to the most enclosed areas of any definition.
+        area_count = max([
+            len(definition.enclosedAreas or []) for definition in definitions
+        ], default=0)
+        self.enclosed_area_dimensions = np.full(
+            (len(definitions), area_count, 3),
+            np.nan
+        )
+        for index, definition in enumerate(definitions):
+            for area_index, area in enumerate(definition.enclosedAreas or []):
+                self.enclosed_area_dimensions[index, area_index] = [
+                    area['dimensions']['x'],
+                    area['dimensions']['y'],
+                    area['dimensions']['z']
+                ]
+
+    def subset(self, indexes: np.ndarray) -> _DefinitionColumns:
+        """Return new columns with only the definitions at the given (sorted)
+        indexes."""
+        columns = copy.copy(self)
+        columns.definitions = [self.definitions[index] for index in indexes]
+        for prop in [
+            'type_codes', 'similarity_type_codes', 'material_codes',
+            'colors', 'dimensions', 'untrained', 'enclosed_area_dimensions'
+        ]:
+            setattr(columns, prop, getattr(self, prop)[indexes])
+        # Renumber the groups and selections that still have definitions.
+        for prop in ['group_ids', 'selection_ids']:
+            ids = getattr(self, prop)[indexes]
+            changes = np.ones(len(ids), dtype=int)
+            changes[1:] = ids[1:] != ids[:-1]
+            setattr(columns, prop, np.cumsum(changes) - 1)
+        return columns
+
+    def groups(self) -> Tuple[Tuple[Tuple[ImmutableObjectDefinition]]]:
+        """Return the triple-nested definition tuples of these columns."""
+        groups = []
+        selection = None
+        for definition, group_id, selection_id in zip(
+            self.definitions,
+            self.group_ids,
+            self.selection_ids
+        ):
+            if group_id == len(groups):
+                groups.append([])
+            if selection is None or selection_id != selection[0]:
+                selection = (selection_id, [])
+                groups[-1].append(selection[1])
+            selection[1].append(definition)
+        return tuple(
+            tuple(tuple(variations) for variations in selections)
+            for selections in groups
+        )
+
+    def similarity_type_mask(self, type_name: str) -> np.ndarray:
+        """Return the mask of definitions with the same type as the given
+        type, as compared by the is_similar_except functions."""
+        return self.similarity_type_codes == self.similarity_type_index.get(
+            _find_similarity_type(type_name),
+            -1
+        )
+
+    def materials_match_mask(
+        self,
+        materials_list: List[str],
+        colors: List[str]
+    ) -> np.ndarray:
+        """Return the mask of definitions with materials that match the given
+        materials and colors, like do_materials_match."""
+        color_codes = [
+            self.color_index[color] for color in set(colors)
+            if color in self.color_index
+        ]
+        mask = self.colors[:, color_codes].any(axis=1)
+        if materials_list:
+            material_code = self.material_index.get(tuple(materials_list), -2)
+            mask = np.where(
+                self.material_codes >= 0,
+                self.material_codes == material_code,
+                mask
+            )
+        return mask
+
+    def similar_size_mask(
+        self,
+        dimensions: Dict[str, float],
+        only_diagonal_size: bool
+    ) -> np.ndarray:
+        """Return the mask of definitions (about) the same size as the given
+        dimensions, like is_similar_except_in_color, but with a tiny bit of
+        extra tolerance (for differences in floating point math)."""
+        size_1 = np.array([dimensions['x'], dimensions['y'], dimensions['z']])
+        size_2 = self.dimensions
+        if only_diagonal_size:
+            size_1 = np.sqrt(size_1[[0]] ** 2 + size_1[[2]] ** 2)
+            size_2 = np.sqrt(size_2[:, [0]] ** 2 + size_2[:, [2]] ** 2)
+        tolerance = MAX_SIZE_DIFF + 1e-9
+        return np.all(
+            ((size_1 + tolerance) >= size_2) &
+            ((size_1 - tolerance) <= size_2),
+            axis=1
+        )
+
+
+def _find_type_and_dimensions(
+    definition_or_instance: Union[ObjectDefinition, SceneObject]
+) -> Tuple[str, Dict[str, float]]:
+    """Return the type and the dimensions of the given object."""
+    # TODO MCS-697 Use dot notation for SceneObject
+    if isinstance(definition_or_instance, (SceneObject, dict)):
+        return (
+            definition_or_instance['type'],
+            definition_or_instance['debug']['dimensions']
+        )
+    return (
+        definition_or_instance.type,
+        vars(definition_or_instance.dimensions)
+    )
+
+
+def _find_materials_and_colors(
+    definition_or_instance: Union[ObjectDefinition, SceneObject]
+) -> Tuple[List[str], List[str]]:
+    """Return the materials and the colors of the given object."""
+    # TODO MCS-697 Use dot notation for SceneObject
+    if isinstance(definition_or_instance, (SceneObject, dict)):
+        return (
+            definition_or_instance['materials'] or [],
+            definition_or_instance['debug']['color'] or []
+        )
+    return (
+        definition_or_instance.materials or [],
+        definition_or_instance.color or []
+    )
+
+
 class DefinitionDataset():
     """Manages a collection of object definitions in a given triple-nested
     list. Can filter definitions on specific properties and choose a random
@@ -871,11 +1236,38 @@ class DefinitionDataset():
 
     def __init__(
         self,
-        definition_groups: Tuple[Tuple[Tuple[ImmutableObjectDefinition]]]
+        definition_groups: Tuple[Tuple[Tuple[ImmutableObjectDefinition]]],
+        columns: _DefinitionColumns = None
     ) -> None:
         """Please call the create_dataset function to create a new
         DatasetDefinition."""
         self._definition_groups = definition_groups
+        self._columns = columns
+
+    def _get_columns(self) -> _DefinitionColumns:
+        # Make the columns the first time they're needed.
+        if self._columns is None:
+            self._columns = _DefinitionColumns(self._definition_groups)
+        return self._columns
+
+    def _filter_on_mask(self, mask: np.ndarray) -> DefinitionDataset:
+        """Return a copy of this dataset containing only the definitions in
+        the given mask (of the columns)."""
+        columns = self._get_columns().subset(np.flatnonzero(mask))
+        return DefinitionDataset(columns.groups(), columns)
+
+    def _filter_on_candidates(
+        self,
+        mask: np.ndarray,
+        callback: Callable[[ImmutableObjectDefinition], bool]
+    ) -> DefinitionDataset:
+        """Return a copy of this dataset containing only the definitions in
+        the given mask (of candidates) that also pass the given callback."""
+        definitions = self._get_columns().definitions
+        mask = mask.copy()
+        for index in np.flatnonzero(mask):
+            mask[index] = callback(definitions[index])
+        return self._filter_on_mask(mask)
 
     def choose_random_definition(self) -> ObjectDefinition:
         """Choose and return a random object definition from this dataset."""
@@ -902,11 +1294,11 @@ class DefinitionDataset():
 
     def size(self) -> int:
         """Return the number of definitions in this dataset."""
-        return len([
-            definition for definition_selections in self._definition_groups
+        return sum(
+            len(definition_variations)
+            for definition_selections in self._definition_groups
             for definition_variations in definition_selections
-            for definition in definition_variations
-        ])
+        )
 
     def filter_on_custom(
         self,
@@ -914,19 +1306,25 @@ class DefinitionDataset():
     ) -> DefinitionDataset:
         """Return a copy of this dataset filtered using the given callback
         function."""
-        output_list = []
-        for definition_selections in self._definition_groups:
-            output_selections = []
-            for definition_variations in definition_selections:
-                output_variations = []
-                for definition in definition_variations:
-                    if callback(definition):
-                        output_variations.append(definition)
-                if len(output_variations) > 0:
-                    output_selections.append(output_variations)
-            if len(output_selections) > 0:
-                output_list.append(output_selections)
-        return DefinitionDataset(output_list)
+        definitions = self._get_columns().definitions
+        return self._filter_on_mask(np.fromiter(
+            (bool(callback(definition)) for definition in definitions),
+            dtype=bool,
+            count=len(definitions)
+        ))
+
+    def filter_on_enclosed_areas(
+        self,
+        callback: Callable[[np.ndarray], np.ndarray]
+    ) -> DefinitionDataset:
+        """Return a copy of this dataset filtered using the given callback
+        function, which is given the X/Y/Z dimensions of the enclosed areas of
+        all the definitions at once (as an array shaped by definition, area,
+        and axis, padded with NaN) and returns a mask of the definitions (see
+        containers.find_enclosable_mask)."""
+        return self._filter_on_mask(
+            callback(self._get_columns().enclosed_area_dimensions)
+        )
 
     def filter_on_similar_except_color(
         self,
@@ -943,7 +1341,20 @@ class DefinitionDataset():
                 only_diagonal_size=only_diagonal_size
             )
 
-        return self.filter_on_custom(_callback)
+        # Only check the definitions with the same type and size, but with
+        # different materials.
+        columns = self._get_columns()
+        target_type, target_dimensions = _find_type_and_dimensions(
+            target_definition
+        )
+        mask = (
+            columns.similarity_type_mask(target_type) &
+            ~columns.materials_match_mask(
+                *_find_materials_and_colors(target_definition)
+            ) &
+            columns.similar_size_mask(target_dimensions, only_diagonal_size)
+        )
+        return self._filter_on_candidates(mask, _callback)
 
     def filter_on_similar_except_shape(
         self,
@@ -960,7 +1371,20 @@ class DefinitionDataset():
                 only_diagonal_size=only_diagonal_size
             )
 
-        return self.filter_on_custom(_callback)
+        # Only check the definitions with a different type, but with the same
+        # materials and size.
+        columns = self._get_columns()
+        target_type, target_dimensions = _find_type_and_dimensions(
+            target_definition
+        )
+        mask = (
+            ~columns.similarity_type_mask(target_type) &
+            columns.materials_match_mask(
+                *_find_materials_and_colors(target_definition)
+            ) &
+            columns.similar_size_mask(target_dimensions, only_diagonal_size)
+        )
+        return self._filter_on_candidates(mask, _callback)
 
     def filter_on_similar_except_size(
         self,
@@ -977,23 +1401,23 @@ class DefinitionDataset():
                 only_diagonal_size=only_diagonal_size
             )
 
-        return self.filter_on_custom(_callback)
+        # Only check the definitions with the same type and materials.
+        columns = self._get_columns()
+        target_type, _ = _find_type_and_dimensions(target_definition)
+        mask = (
+            columns.similarity_type_mask(target_type) &
+            columns.materials_match_mask(
+                *_find_materials_and_colors(target_definition)
+            )
+        )
+        return self._filter_on_candidates(mask, _callback)
 
     def filter_on_trained(self) -> DefinitionDataset:
         """Return a copy of this dataset containing only definitions that are
         trained."""
-
-        def _callback(definition: ImmutableObjectDefinition) -> bool:
-            props = definition._asdict()
-            return not (
-                (props.get(tags.SCENE.UNTRAINED_CATEGORY, False)) or
-                (props.get(tags.SCENE.UNTRAINED_COLOR, False)) or
-                (props.get(tags.SCENE.UNTRAINED_COMBINATION, False)) or
-                (props.get(tags.SCENE.UNTRAINED_SHAPE, False)) or
-                (props.get(tags.SCENE.UNTRAINED_SIZE, False))
-            )
-
-        return self.filter_on_custom(_callback)
+        return self._filter_on_mask(
+            ~self._get_columns().untrained.any(axis=1)
+        )
 
     def filter_on_type(
         self,
@@ -1002,15 +1426,18 @@ class DefinitionDataset():
     ) -> DefinitionDataset:
         """Return a copy of this dataset containing only definitions that
         either are or are not the given type(s)."""
-
-        def _callback(definition: ImmutableObjectDefinition) -> bool:
-            if cannot_be:
-                return definition.type not in cannot_be
-            if must_be:
-                return definition.type in must_be
-            return True
-
-        return self.filter_on_custom(_callback)
+        columns = self._get_columns()
+        if cannot_be:
+            return self._filter_on_mask(~np.isin(columns.type_codes, [
+                columns.type_index[type_name] for type_name in cannot_be
+                if type_name in columns.type_index
+            ]))
+        if must_be:
+            return self._filter_on_mask(np.isin(columns.type_codes, [
+                columns.type_index[type_name] for type_name in must_be
+                if type_name in columns.type_index
+            ]))
+        return self._filter_on_mask(np.ones(len(columns.definitions), bool))
 
     def filter_on_untrained(
         self,
@@ -1019,24 +1446,24 @@ class DefinitionDataset():
         """Return a copy of this dataset containing only definitions that are
         untrained using the given tag."""
 
-        trained_tag_list = [tag for tag in [
-            tags.SCENE.UNTRAINED_CATEGORY,
-            tags.SCENE.UNTRAINED_COLOR,
-            tags.SCENE.UNTRAINED_COMBINATION,
-            tags.SCENE.UNTRAINED_SHAPE,
-            tags.SCENE.UNTRAINED_SIZE
-        ] if tag != untrained_tag]
+        if untrained_tag not in UNTRAINED_TAGS:
+            def _callback(definition: ImmutableObjectDefinition) -> bool:
+                props = definition._asdict()
+                if props.get(untrained_tag, False):
+                    # Return False if any other tag is marked untrained (True)
+                    return not any(
+                        [props.get(tag, False) for tag in UNTRAINED_TAGS]
+                    )
+                return False
+
+            return self.filter_on_custom(_callback)
 
-        def _callback(definition: ImmutableObjectDefinition) -> bool:
-            props = definition._asdict()
-            if props.get(untrained_tag, False):
-                # Return False if any other tag is marked untrained (True)
-                return not any(
-                    [props.get(tag, False) for tag in trained_tag_list]
-                )
-            return False
-
-        return self.filter_on_custom(_callback)
+        # Return only the definitions marked untrained with just this tag.
+        untrained = self._get_columns().untrained
+        tag_index = UNTRAINED_TAGS.index(untrained_tag)
+        return self._filter_on_mask(
+            untrained[:, tag_index] & (untrained.sum(axis=1) == 1)
+        )
 
     def dataset_unique_shape_scale(self, keep: int = 1) -> DefinitionDataset:
         """Function for unit tests: Return a new dataset containing all of the
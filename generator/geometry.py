@@ -2,6 +2,7 @@ import copy
 import logging
 import math
 import random
+from collections import UserList, defaultdict
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
@@ -15,7 +16,7 @@ from .definitions import (
     ObjectDefinition
 )
 from .objects import SceneObject
-from .separating_axis_theorem import sat_entry
+from .separating_axis_theorem import rects_to_array, sat_entry, sat_matrix
 
 MAX_TRIES = 50
 
@@ -24,6 +25,30 @@ MOVE_DISTANCE = 0.1
 
 FLOOR_FEATURE_BOUNDS_BUFFER = 0.001
 
+# The size of each cell in the ObjectBoundsIndex grid, equal to the size of a
+# floor area (a hole or lava), and the max number of cells that one bounds
+# may span before it's always checked instead (like a partition floor).
+BOUNDS_INDEX_CELL_SIZE = 1.0
+BOUNDS_INDEX_MAX_CELLS = 16
+
+# The number of random positions that calc_obj_pos validates in each batch.
+POSITION_BATCH_SIZE = 10
+
+# The bit flags for each cell in a FloorGrid.
+FLOOR_HOLE = 1
+FLOOR_LAVA = 2
+FLOOR_PARTITION = 4
+FLOOR_TEXTURE = 8
+# The FloorGrid flag for each list of floor areas in a scene.
+FLOOR_FLAGS = {
+    'floor_textures': FLOOR_TEXTURE,
+    'holes': FLOOR_HOLE,
+    'lava': FLOOR_LAVA
+}
+# The extra floor cells around the room in a FloorGrid, since some holes and
+# lava are expected to extend beyond the walls.
+FLOOR_GRID_MARGIN = 2
+
 PERFORMER_CAMERA_Y = 0.762
 PERFORMER_HALF_WIDTH = 0.25
 PERFORMER_HEIGHT = 1.25
@@ -74,14 +99,24 @@ ORIGIN_LOCATION = {
 @dataclass
 class ObjectBounds():
     """The bounds of a specific object, including its 2D bounding box, 2D
-    polygon, and Y range."""
+    polygon, and Y range. The polygon and the array of box corners are only
+    created when first used, since most bounds are only used in collision
+    checks, then discarded."""
     box_xz: List[Vector3d]
     max_y: float
     min_y: float
-    polygon_xz: geometry.Polygon = None
 
     def __post_init__(self):
-        self._update_poly()
+        for point in self.box_xz:
+            for attr in ['x', 'y', 'z']:
+                setattr(point, attr, round(getattr(point, attr), 6))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # Reset the polygon and array whenever the box is replaced.
+        if name == 'box_xz':
+            super().__setattr__('_polygon_xz', None)
+            super().__setattr__('_box_xz_array', None)
 
     def __eq__(self, other) -> bool:
         return (
@@ -89,23 +124,34 @@ class ObjectBounds():
             self.min_y == other.min_y
         )
 
-    def _update_poly(self) -> None:
-        for point in self.box_xz:
-            for attr in ['x', 'y', 'z']:
-                setattr(point, attr, round(getattr(point, attr), 6))
-        points = [(point.x, point.z) for point in self.box_xz]
-        self.polygon_xz = geometry.Polygon(points)
+    @property
+    def polygon_xz(self) -> geometry.Polygon:
+        """The 2D polygon of this bounds' box, created on first use."""
+        if self._polygon_xz is None:
+            self._polygon_xz = geometry.Polygon(self.box_xz_array)
+        return self._polygon_xz
+
+    @property
+    def box_xz_array(self) -> np.ndarray:
+        """The X/Z coordinates of this bounds' box corners as a compact
+        (N, 2) array, created on first use."""
+        if self._box_xz_array is None:
+            self._box_xz_array = np.array([
+                (point.x, point.z) for point in self.box_xz
+            ], dtype=float)
+        return self._box_xz_array
 
     def expand_by(self, amount: float) -> None:
         """Expand this bounds by the given amount on both the X and Z axes."""
-        self.polygon_xz = self.polygon_xz.buffer(
+        polygon = self.polygon_xz.buffer(
             amount,
             # Ensure the output polygon is also a rectangle.
             join_style=geometry.JOIN_STYLE.mitre
         )
+        # Replacing the box also resets the polygon and array.
         self.box_xz = [
             Vector3d(x=point[0], y=0, z=point[1]) for point in
-            self.polygon_xz.exterior.coords
+            polygon.exterior.coords
         ][:-1]
 
     def extend_bottom_to_ground(self) -> None:
@@ -124,6 +170,265 @@ class ObjectBounds():
         ) for point in self.box_xz)
 
 
+class ObjectBoundsIndex(UserList):
+    """A list of ObjectBounds that also maintains a uniform grid over the XZ
+    plane, so collision checks (see validate_location_rect) only need to test
+    the bounds near a location, rather than every bounds in the scene. Use it
+    anywhere a normal list of ObjectBounds is used; adding bounds (append,
+    extend, etc.) updates the grid incrementally. Each grid cell is centered
+    on a floor area (a hole or lava) so each floor area fills only one cell.
+    Copies (see copy) share their list and grid until either one is changed.
+    Please do not change the X/Z corners of a bounds while it's indexed."""
+
+    def __init__(self, bounds_list: List[ObjectBounds] = None):
+        self._cells = defaultdict(list)
+        self._large = []
+        self._shared = False
+        super().__init__(bounds_list or [])
+        for bounds in self.data:
+            self._add_to_grid(bounds)
+
+    def _find_cell_range(
+        self,
+        min_x: float,
+        min_z: float,
+        max_x: float,
+        max_z: float
+    ) -> Tuple[range, range]:
+        # Touching bounds collide, so include cells on their shared edges.
+        return tuple(
+            range(
+                math.floor(min_value / BOUNDS_INDEX_CELL_SIZE + 0.5),
+                math.floor(max_value / BOUNDS_INDEX_CELL_SIZE + 0.5) + 1
+            ) for min_value, max_value in ((min_x, max_x), (min_z, max_z))
+        )
+
+    def _find_bounds_cell_range(
+        self,
+        bounds: ObjectBounds
+    ) -> Tuple[range, range]:
+        xs = [point.x for point in bounds.box_xz]
+        zs = [point.z for point in bounds.box_xz]
+        return self._find_cell_range(min(xs), min(zs), max(xs), max(zs))
+
+    def _add_to_grid(self, bounds: ObjectBounds) -> None:
+        x_range, z_range = self._find_bounds_cell_range(bounds)
+        if len(x_range) * len(z_range) > BOUNDS_INDEX_MAX_CELLS:
+            self._large.append(bounds)
+            return
+        for cell_x in x_range:
+            for cell_z in z_range:
+                self._cells[(cell_x, cell_z)].append(bounds)
+
+    def _remove_from_grid(self, bounds: ObjectBounds) -> None:
+        x_range, z_range = self._find_bounds_cell_range(bounds)
+        if len(x_range) * len(z_range) > BOUNDS_INDEX_MAX_CELLS:
+            self._large = [item for item in self._large if item is not bounds]
+            return
+        for cell_x in x_range:
+            for cell_z in z_range:
+                cell = self._cells[(cell_x, cell_z)]
+                cell[:] = [item for item in cell if item is not bounds]
+
+    def _unshare(self) -> None:
+        # Copy the list and grid before changing them, if they're shared.
+        if not self._shared:
+            return
+        self.data = list(self.data)
+        self._cells = defaultdict(list, {
+            cell: list(items) for cell, items in self._cells.items()
+        })
+        self._large = list(self._large)
+        self._shared = False
+
+    def _rebuild_grid(self) -> None:
+        self._cells = defaultdict(list)
+        self._large = []
+        for bounds in self.data:
+            self._add_to_grid(bounds)
+
+    def find_nearby(self, bounds: ObjectBounds) -> List[ObjectBounds]:
+        """Return each indexed bounds that may collide with the given bounds
+        because their grid cells overlap (a broad-phase collision check)."""
+        return self.find_nearby_rects(bounds.box_xz_array[np.newaxis])
+
+    def find_nearby_rects(self, rects: np.ndarray) -> List[ObjectBounds]:
+        """Return each indexed bounds that may collide with any rectangle in
+        the given (N, 4, 2) array of X/Z corners (see rects_to_array)."""
+        nearby = {id(item): item for item in self._large}
+        for min_xz, max_xz in zip(rects.min(axis=1), rects.max(axis=1)):
+            x_range, z_range = self._find_cell_range(*min_xz, *max_xz)
+            if len(x_range) * len(z_range) > BOUNDS_INDEX_MAX_CELLS:
+                return list(self.data)
+            for cell_x in x_range:
+                for cell_z in z_range:
+                    for item in self._cells.get((cell_x, cell_z), []):
+                        nearby[id(item)] = item
+        return list(nearby.values())
+
+    def copy(self) -> 'ObjectBoundsIndex':
+        """Return a copy of this index in constant time. The copy shares this
+        index's list and grid until either one is changed."""
+        index = self.__class__.__new__(self.__class__)
+        index.data = self.data
+        index._cells = self._cells
+        index._large = self._large
+        index._shared = self._shared = True
+        return index
+
+    def append(self, bounds: ObjectBounds) -> None:
+        self._unshare()
+        super().append(bounds)
+        self._add_to_grid(bounds)
+
+    def extend(self, bounds_list: List[ObjectBounds]) -> None:
+        bounds_list = list(bounds_list)
+        self._unshare()
+        super().extend(bounds_list)
+        for bounds in bounds_list:
+            self._add_to_grid(bounds)
+
+    def __iadd__(self, bounds_list: List[ObjectBounds]) -> 'ObjectBoundsIndex':
+        self.extend(bounds_list)
+        return self
+
+    def insert(self, i: int, bounds: ObjectBounds) -> None:
+        self._unshare()
+        super().insert(i, bounds)
+        self._add_to_grid(bounds)
+
+    def pop(self, i: int = -1) -> ObjectBounds:
+        self._unshare()
+        bounds = super().pop(i)
+        self._remove_from_grid(bounds)
+        return bounds
+
+    def remove(self, bounds: ObjectBounds) -> None:
+        self.pop(self.index(bounds))
+
+    def clear(self) -> None:
+        self._unshare()
+        super().clear()
+        self._rebuild_grid()
+
+    def reverse(self) -> None:
+        self._unshare()
+        super().reverse()
+
+    def sort(self, *args, **kwargs) -> None:
+        self._unshare()
+        super().sort(*args, **kwargs)
+
+    def __setitem__(self, i, bounds) -> None:
+        self._unshare()
+        super().__setitem__(i, bounds)
+        self._rebuild_grid()
+
+    def __delitem__(self, i) -> None:
+        self._unshare()
+        super().__delitem__(i)
+        self._rebuild_grid()
+
+
+class FloorGrid():
+    """An occupancy grid of a room's floor areas (each 1x1 cell centered on
+    integer X/Z coordinates) with bit flags for the holes, lava, partition
+    floor, and floor textures in each cell, for constant time lookups. Also
+    caches the bounds of each floor area. Usually created and updated by the
+    scene itself (see Scene.get_floor_grid)."""
+
+    def __init__(self, room_dimensions: Vector3d):
+        self._min_x = -math.floor(room_dimensions.x / 2) - FLOOR_GRID_MARGIN
+        self._min_z = -math.floor(room_dimensions.z / 2) - FLOOR_GRID_MARGIN
+        self._cells = np.zeros((
+            1 - (2 * self._min_x),
+            1 - (2 * self._min_z)
+        ), dtype=np.uint8)
+        self._bounds = {}
+
+    def _find_index(self, x: int, z: int) -> Optional[Tuple[int, int]]:
+        index_x = int(x) - self._min_x
+        index_z = int(z) - self._min_z
+        if (
+            index_x < 0 or index_x >= self._cells.shape[0] or
+            index_z < 0 or index_z >= self._cells.shape[1]
+        ):
+            return None
+        return index_x, index_z
+
+    def _resize(self, x: int, z: int) -> None:
+        min_x = min(self._min_x, int(x))
+        min_z = min(self._min_z, int(z))
+        max_x = max(self._min_x + self._cells.shape[0] - 1, int(x))
+        max_z = max(self._min_z + self._cells.shape[1] - 1, int(z))
+        cells = np.zeros((max_x - min_x + 1, max_z - min_z + 1), np.uint8)
+        offset_x = self._min_x - min_x
+        offset_z = self._min_z - min_z
+        cells[
+            offset_x:(offset_x + self._cells.shape[0]),
+            offset_z:(offset_z + self._cells.shape[1])
+        ] = self._cells
+        self._cells = cells
+        self._min_x = min_x
+        self._min_z = min_z
+
+    def add(self, x: int, z: int, flag: int) -> None:
+        """Add the given flag to the floor cell at the given X/Z."""
+        index = self._find_index(x, z)
+        if not index:
+            self._resize(x, z)
+            index = self._find_index(x, z)
+        self._cells[index] |= flag
+
+    def add_partition_floor(
+        self,
+        room_dimensions: Vector3d,
+        partition_floor: Any
+    ) -> None:
+        """Add the partition floor flag to each floor cell that overlaps with
+        the given partition floor."""
+        for bounds in find_partition_floor_bounds(
+            room_dimensions,
+            partition_floor
+        ):
+            min_xz = bounds.box_xz_array.min(axis=0)
+            max_xz = bounds.box_xz_array.max(axis=0)
+            for x in range(
+                math.floor(min_xz[0] + 0.5),
+                math.ceil(max_xz[0] - 0.5) + 1
+            ):
+                for z in range(
+                    math.floor(min_xz[1] + 0.5),
+                    math.ceil(max_xz[1] - 0.5) + 1
+                ):
+                    self.add(x, z, FLOOR_PARTITION)
+
+    def clear(self, flag: int) -> None:
+        """Remove the given flag from all the floor cells."""
+        self._cells &= ~np.uint8(flag)
+
+    def find_bounds(self, x: int, z: int) -> ObjectBounds:
+        """Return the bounds for a floor area (a hole or lava) at the given
+        X/Z, creating it only once. Please do not modify the bounds."""
+        key = (x, z)
+        if key not in self._bounds:
+            self._bounds[key] = generate_floor_area_bounds(x, z)
+        return self._bounds[key]
+
+    def find_cells(self, flags: int) -> List[Tuple[int, int]]:
+        """Return the X/Z of each floor cell with any of the given flags."""
+        return [
+            (int(index_x) + self._min_x, int(index_z) + self._min_z)
+            for index_x, index_z in np.argwhere(self._cells & flags)
+        ]
+
+    def has(self, x: int, z: int, flags: int) -> bool:
+        """Return whether the floor cell at the given X/Z has any of the given
+        flags."""
+        index = self._find_index(x, z)
+        return bool(index and self._cells[index] & flags)
+
+
 def __dict_to_vector(data: Dict[str, float]) -> Vector3d:
     return Vector3d(x=data['x'], y=data['y'], z=data['z'])
 
@@ -212,10 +517,15 @@ def calc_obj_pos(
     z_func: Callable[[Dict[str, float]], float] = random_position_z,
     rotation_func: Callable[[], float] = None,
     xz_func: Callable[[], Tuple[float, float]] = None,
-    room_dimensions: Dict[str, float] = None
+    room_dimensions: Dict[str, float] = None,
+    batch_size: int = POSITION_BATCH_SIZE
 ) -> Optional[Dict[str, Any]]:
     """Returns new object with rotation & position if we can place the
-    object in the frame, None otherwise."""
+    object in the frame, None otherwise. Randomly chooses and validates
+    locations in batches, up to MAX_TRIES in total: first a single location
+    (so a location that's valid on the first try uses the same random numbers
+    as choosing and validating each location on its own), then batches that
+    double in size, up to the given batch size."""
 
     # TODO MCS-697 Use dot notation for SceneObject
     if isinstance(definition_or_instance, (SceneObject, dict)):
@@ -230,48 +540,80 @@ def calc_obj_pos(
         position_y = definition_or_instance.positionY
         rotation = vars(definition_or_instance.rotation)
 
+    # Index the bounds once, rather than checking every bounds on each try.
+    bounds_index = (
+        bounds_list if isinstance(bounds_list, ObjectBoundsIndex) else
+        ObjectBoundsIndex(bounds_list)
+    )
+    room_dimensions = room_dimensions or DEFAULT_ROOM_DIMENSIONS
+    # The min and max Y of each bounds, since standing_y equals position_y.
+    y_range = [0, dimensions['y']]
+
     tries = 0
+    next_batch_size = 1
     while tries < MAX_TRIES:
-        rotation_x = rotation['x']
-        rotation_y = rotation['y'] + (
-            rotation_func() if rotation_func else random_rotation()
+        # Randomly choose a batch of locations, then validate all of them at
+        # once, and only create the full bounds for the first valid location.
+        locations = []
+        for _ in range(min(next_batch_size, MAX_TRIES - tries)):
+            rotation_y = rotation['y'] + (
+                rotation_func() if rotation_func else random_rotation()
+            )
+            if xz_func is not None:
+                new_x, new_z = xz_func(room_dimensions)
+            else:
+                new_x = x_func(room_dimensions)
+                new_z = z_func(room_dimensions)
+            tries += 1
+            if new_x is not None and new_z is not None:
+                locations.append((new_x, new_z, rotation_y))
+        next_batch_size = min(next_batch_size * 2, batch_size)
+        if not locations:
+            continue
+        location_array = np.array(locations, dtype=float)
+        valid_list = _validate_location_rects(
+            _create_rects(
+                dimensions,
+                offset,
+                location_array[:, 0:2],
+                location_array[:, 2]
+            ),
+            np.array([y_range] * len(locations), dtype=float),
+            performer_position,
+            bounds_index,
+            room_dimensions
         )
-        rotation_z = rotation['z']
-        if xz_func is not None:
-            new_x, new_z = xz_func(room_dimensions or DEFAULT_ROOM_DIMENSIONS)
-        else:
-            new_x = x_func(room_dimensions or DEFAULT_ROOM_DIMENSIONS)
-            new_z = z_func(room_dimensions or DEFAULT_ROOM_DIMENSIONS)
-
-        if new_x is not None and new_z is not None:
+        for (new_x, new_z, rotation_y), valid in zip(locations, valid_list):
+            if not valid:
+                continue
+            object_rotation = {
+                'x': rotation['x'],
+                'y': rotation_y,
+                'z': rotation['z']
+            }
+            object_position = {'x': new_x, 'y': position_y, 'z': new_z}
             bounds = create_bounds(
                 dimensions=dimensions,
                 offset=offset,
-                position={'x': new_x, 'y': position_y, 'z': new_z},
-                rotation={'x': rotation_x, 'y': rotation_y, 'z': rotation_z},
+                position=object_position,
+                rotation=object_rotation,
                 standing_y=position_y
             )
-            if validate_location_rect(
+            # Verify the final bounds, in case of any rounding differences.
+            if not validate_location_rect(
                 bounds,
                 performer_position,
-                bounds_list,
-                room_dimensions or DEFAULT_ROOM_DIMENSIONS
+                bounds_index,
+                room_dimensions
             ):
-                break
-        tries += 1
-
-    if tries < MAX_TRIES:
-        object_location = {
-            'rotation': {'x': rotation_x, 'y': rotation_y, 'z': rotation_z},
-            'position': {
-                'x': new_x,
-                'y': position_y,
-                'z': new_z
-            },
-            'boundingBox': bounds
-        }
-        bounds_list.append(bounds)
-        return object_location
+                continue
+            object_location = {
+                'rotation': object_rotation,
+                'position': object_position,
+                'boundingBox': bounds
+            }
+            bounds_list.append(bounds)
+            return object_location
 
     logging.debug(f'could not place object: {definition_or_instance}')
     return None
@@ -1236,20 +1578,114 @@ def validate_location_rect(
 ) -> bool:
     """Returns if the given location rect is valid using the given performer
     start position and rect list corresponding to other positioned objects."""
-    if not location_bounds.is_within_room(room_dimensions):
-        return False
-    performer_agent_bounds = find_performer_bounds(performer_start_position)
-    for bounds in [performer_agent_bounds] + bounds_list:
-        # If one bounds is completely above/below another: no collision.
-        if (
-            location_bounds.min_y >= bounds.max_y or
-            location_bounds.max_y <= bounds.min_y
-        ):
-            continue
-        # If one bounds intersects with another: collision! Invalid.
-        if sat_entry(location_bounds.box_xz, bounds.box_xz):
-            return False
-    return True
+    return validate_location_rects(
+        [location_bounds],
+        performer_start_position,
+        bounds_list,
+        room_dimensions
+    )[0]
+
+
+def validate_location_rects(
+    location_bounds_list: List[ObjectBounds],
+    performer_start_position: Dict[str, float],
+    bounds_list: List[ObjectBounds],
+    room_dimensions: Dict[str, float]
+) -> List[bool]:
+    """Returns if each of the given location rects is valid using the given
+    performer start position and rect list corresponding to other positioned
+    objects, testing every location rect against every other rect in a single
+    batch (see validate_location_rect)."""
+    if not location_bounds_list:
+        return []
+    return _validate_location_rects(
+        _bounds_to_rects(location_bounds_list),
+        np.array([
+            [bounds.min_y, bounds.max_y] for bounds in location_bounds_list
+        ], dtype=float),
+        performer_start_position,
+        bounds_list,
+        room_dimensions
+    ).tolist()
+
+
+def _bounds_to_rects(bounds_list: List[ObjectBounds]) -> np.ndarray:
+    """Returns the box corners of each of the given bounds as an (N, 4, 2)
+    array of X/Z corners."""
+    if not bounds_list:
+        return rects_to_array([])
+    return np.stack([bounds.box_xz_array for bounds in bounds_list])
+
+
+def _validate_location_rects(
+    rects: np.ndarray,
+    y_ranges: np.ndarray,
+    performer_start_position: Dict[str, float],
+    bounds_list: List[ObjectBounds],
+    room_dimensions: Dict[str, float]
+) -> np.ndarray:
+    """Returns if each location rect in the given (M, 4, 2) array of X/Z
+    corners, with the given (M, 2) array of Y ranges (min, max), is valid
+    (see validate_location_rects) as an (M,) boolean array."""
+    room_max_x = room_dimensions['x'] / 2.0
+    room_max_z = room_dimensions['z'] / 2.0
+    output = (
+        (np.abs(rects[..., 0]) <= room_max_x) &
+        (np.abs(rects[..., 1]) <= room_max_z)
+    ).all(axis=1)
+    if not output.any():
+        return output
+    rects = rects[output]
+    y_ranges = y_ranges[output]
+    other_bounds_list = [find_performer_bounds(performer_start_position)]
+    # If the bounds are indexed, only check the bounds near each location.
+    if isinstance(bounds_list, ObjectBoundsIndex):
+        other_bounds_list.extend(bounds_list.find_nearby_rects(rects))
+    else:
+        other_bounds_list.extend(bounds_list)
+
+    other_y = np.array([
+        [bounds.min_y, bounds.max_y] for bounds in other_bounds_list
+    ], dtype=float)
+    # If one bounds is completely above/below another: no collision.
+    overlapping_y = ~(
+        (y_ranges[:, np.newaxis, 0] >= other_y[np.newaxis, :, 1]) |
+        (y_ranges[:, np.newaxis, 1] <= other_y[np.newaxis, :, 0])
+    )
+    # If one bounds intersects with another: collision! Invalid.
+    colliding = overlapping_y & sat_matrix(
+        rects,
+        _bounds_to_rects(other_bounds_list)
+    )
+    output[output] = ~colliding.any(axis=1)
+    return output
+
+
+def _create_rects(
+    dimensions: Dict[str, float],
+    offset: Dict[str, float],
+    positions: np.ndarray,
+    rotations: np.ndarray
+) -> np.ndarray:
+    """Creates and returns the X/Z corners of the bounds for the object with
+    the given size properties at each of the given (N, 2) X/Z positions with
+    each of the given (N,) Y rotations, as an (N, 4, 2) array in the same
+    order as create_bounds."""
+    radian_amount = np.pi * (2 - (rotations % 360) / 180.0)
+    rotate_sin = np.sin(radian_amount)[:, np.newaxis]
+    rotate_cos = np.cos(radian_amount)[:, np.newaxis]
+    x_plus = (dimensions['x'] / 2.0) + offset['x']
+    x_minus = -(dimensions['x'] / 2.0) + offset['x']
+    z_plus = (dimensions['z'] / 2.0) + offset['z']
+    z_minus = -(dimensions['z'] / 2.0) + offset['z']
+    corner_x = np.array([x_plus, x_plus, x_minus, x_minus])
+    corner_z = np.array([z_plus, z_minus, z_minus, z_plus])
+    rects = np.stack((
+        positions[:, 0:1] + corner_x * rotate_cos - corner_z * rotate_sin,
+        positions[:, 1:2] + corner_x * rotate_sin + corner_z * rotate_cos
+    ), axis=-1)
+    # Round like the ObjectBounds does.
+    return np.round(rects, 6)
 
 
 def move_to_location(
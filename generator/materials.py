@@ -1,4 +1,4 @@
-from typing import List, NamedTuple
+from typing import Dict, List, NamedTuple
 
 
 class MaterialTuple(NamedTuple):
@@ -1079,8 +1079,16 @@ def filter_used_colors(
     return filtered_material_list
 
 
+# Map each material to the colors of its first configurable material tuple.
+_MATERIAL_TO_COLORS: Dict[str, List[str]] = {}
+for _material_tuple in ALL_CONFIGURABLE_MATERIAL_TUPLES:
+    _MATERIAL_TO_COLORS.setdefault(
+        _material_tuple.material,
+        _material_tuple.color
+    )
+
+
 def find_colors(material_name: str, default_value: str = None) -> List[str]:
-    for item in ALL_CONFIGURABLE_MATERIAL_TUPLES:
-        if item.material == material_name:
-            return item.color
-    return default_value
+    if not isinstance(material_name, str):
+        return default_value
+    return _MATERIAL_TO_COLORS.get(material_name, default_value)
@@ -2,7 +2,6 @@ import logging
 import math
 from typing import Any, Dict, List, Optional, Tuple
 
-from extremitypathfinder import plotting
 from extremitypathfinder.extremitypathfinder import (
     PolygonEnvironment as Environment
 )
@@ -19,11 +18,13 @@ from .geometry import (
 )
 from .objects import SceneObject
 
-plotting.EXPORT_SIZE_X = plotting.EXPORT_SIZE_Y
-
 
 VARIANCE = 0.01
 
+# The number of decimal places used to compare positions and rotations in the
+# bounded path search (see _generate_path_list_bounded).
+PATH_SEARCH_DIGITS = 2
+
 
 class ShortestPath():
     def __init__(
@@ -181,6 +182,80 @@ def _generate_path_list(
     return output_path_list
 
 
+def _generate_path_list_bounded(
+    base_path: ShortestPath,
+    position_list: List[Tuple[float, float]],
+    target_position: Tuple[float, float],
+    pathfinding_environment: Environment,
+    beam_width: int
+) -> List[ShortestPath]:
+    """Generate and return lists of MCS actions that each may be the shortest
+    path to the given target position, like _generate_path_list, but search
+    one waypoint at a time across all the paths, so the search runs in bounded
+    time. Drop each path that reaches the same position and rotation as a path
+    with fewer actions, keep only the beam_width paths with the fewest actions
+    after each waypoint, and find the shortest path from each position once."""
+    shortest_path_cache = {}
+
+    def _find_position_list(
+        position: Tuple[float, float]
+    ) -> Optional[List[Tuple[float, float]]]:
+        key = _round_position(position)
+        if key not in shortest_path_cache:
+            shortest_path_cache[key] = _generate_shortest_path_position_list(
+                position,
+                target_position,
+                pathfinding_environment
+            )
+        return shortest_path_cache[key]
+
+    output_path_list = []
+    visited = set()
+    frontier = [(base_path, position_list)]
+    while frontier:
+        logging.debug('----------------------------------------')
+        logging.debug(f'frontier length {len(frontier)}')
+        next_frontier = {}
+        for previous_path, next_position_list in frontier:
+            if len(next_position_list) == 0:
+                output_path_list.append(previous_path)
+                continue
+            # If the next position was near enough to the target position...
+            at_target = (
+                math.isclose(target_position[0], next_position_list[0][0]) and
+                math.isclose(target_position[1], next_position_list[0][1])
+            )
+            for path in _rotate_then_move(
+                previous_path,
+                next_position_list[0]
+            ):
+                if previous_path.position == path.position or at_target:
+                    output_path_list.append(path)
+                    continue
+                key = (
+                    _round_position(path.position),
+                    round(path.rotation % 360, PATH_SEARCH_DIGITS)
+                )
+                if key in visited:
+                    continue
+                if (
+                    key in next_frontier and
+                    len(next_frontier[key][0].action_list) <=
+                    len(path.action_list)
+                ):
+                    continue
+                # Else generate the path to the NEXT position.
+                position_list = _find_position_list(path.position)
+                if position_list:
+                    next_frontier[key] = (path, position_list[1:])
+        visited.update(next_frontier.keys())
+        frontier = sorted(
+            next_frontier.values(),
+            key=lambda item: len(item[0].action_list)
+        )[:beam_width]
+    return output_path_list
+
+
 def _generate_pathfinding_environment(
     room_dimensions: Dict[str, float],
     object_bounds_list: List[List[Dict[str, float]]],
@@ -199,10 +274,16 @@ def _generate_pathfinding_environment(
     )
     logging.debug(f'poly coords list {poly_coords_list}')
 
-    pathfinding_environment = (
-        plotting.PlottingEnvironment(plotting_dir=save_path_plot_with_name)
-        if save_path_plot_with_name else Environment()
-    )
+    if save_path_plot_with_name:
+        # Import the plotting module (and matplotlib) only when needed, since
+        # it's slow to load.
+        from extremitypathfinder import plotting
+        plotting.EXPORT_SIZE_X = plotting.EXPORT_SIZE_Y
+        pathfinding_environment = plotting.PlottingEnvironment(
+            plotting_dir=save_path_plot_with_name
+        )
+    else:
+        pathfinding_environment = Environment()
     room_max_x = (room_dimensions['x'] / 2.0) - PERFORMER_HALF_WIDTH
     room_max_z = (room_dimensions['z'] / 2.0) - PERFORMER_HALF_WIDTH
     room_bounds = [
@@ -251,6 +332,13 @@ def _generate_shortest_path_position_list(
     return path if len(path) > 0 else None
 
 
+def _round_position(position: Tuple[float, float]) -> Tuple[float, float]:
+    return (
+        round(position[0], PATH_SEARCH_DIGITS),
+        round(position[1], PATH_SEARCH_DIGITS)
+    )
+
+
 def _remove_duplicate_paths(
     path_list: List[ShortestPath]
 ) -> List[ShortestPath]:
@@ -357,12 +445,15 @@ def find_possible_best_path_list(
     performer_start: Dict[str, Any],
     target_dict: SceneObject,
     object_list: List[SceneObject],
-    save_path_plot_with_name: str = None
+    save_path_plot_with_name: str = None,
+    beam_width: int = None
 ) -> Tuple[List[ShortestPath]]:
     """Find and return lists of MCS actions that each may be the shortest path
     to the target object with the given ID. Because rotate and move actions
     are rounded, try many paths with rotations and movements of varying
-    amounts."""
+    amounts. If beam_width is set, search for at most that many paths at a
+    time (see _generate_path_list_bounded), which is faster in large rooms but
+    may not find every path."""
     target_or_parent_dict = _find_target_or_parent_dict(
         target_dict,
         object_list
@@ -413,7 +504,13 @@ def find_possible_best_path_list(
             logging.debug(f'Cannot find path to target corner {target}')
             continue
         # Generate a path of MCS actions for the shortest path's position list.
-        path_list = _generate_path_list(
+        path_list = _generate_path_list_bounded(
+            base_path,
+            position_list[1:],
+            target,
+            pathfinding_environment,
+            beam_width
+        ) if beam_width else _generate_path_list(
             base_path,
             position_list[1:],
             target,
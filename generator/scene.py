@@ -1,5 +1,6 @@
+import copy
 from dataclasses import asdict, dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from machine_common_sense.config_manager import (
     FloorTexturesConfig,
@@ -100,6 +101,26 @@ class Scene:
     def set_performer_start_rotation(self, x: int, y: int):
         self.performer_start.rotation = Vector3d(x=x, y=y, z=0)
 
+    def create_draft(self) -> 'Scene':
+        """Return a lightweight copy of this scene for speculative edits to
+        its holes, lava, floor textures, and objects, without a deep copy.
+        Adding or removing holes, lava, floor textures, or objects in the
+        draft (or replacing any other property, like the room dimensions)
+        will not change this scene; please replace (rather than modify) any
+        existing objects or vectors. Call commit_draft to keep the changes,
+        or just discard the draft to drop them."""
+        draft = copy.copy(self)
+        draft.floor_textures = self.floor_textures.copy()
+        draft.holes = self.holes.copy()
+        draft.lava = self.lava.copy()
+        draft.objects = self.objects.copy()
+        return draft
+
+    def commit_draft(self, draft: 'Scene') -> None:
+        """Keep all the changes made to the given draft of this scene (see
+        create_draft)."""
+        self.__dict__.update(draft.__dict__)
+
     def get_targets(self) -> List[SceneObject]:
         """Returns the list of all targets for this scene's goal, or an empty
         list if this scene has no goal or targets."""
@@ -116,6 +137,58 @@ class Scene:
                     break
         return targets
 
+    def get_floor_grid(self) -> geometry.FloorGrid:
+        """Returns the FloorGrid of this scene's holes, lava, partition floor,
+        and floor textures, updated with any changes made since it was last
+        returned. Assumes holes and lava are only ever added to the end of
+        their lists (or the lists are replaced)."""
+        holes = [] if self.holes is None else self.holes
+        lava = [] if self.lava is None else self.lava
+        textures = self.floor_textures
+        if not isinstance(textures, list):
+            textures = [] if textures is None else [textures]
+        room = (self.room_dimensions.x, self.room_dimensions.z)
+        partition = (self.partition_floor.leftHalf, (
+            self.partition_floor.rightHalf
+        )) if self.partition_floor else None
+        texture_count = sum(len(item.positions or []) for item in textures)
+        grid = getattr(self, '_floor_grid', None)
+        (
+            old_room, old_partition, old_holes, old_lava, old_textures,
+            hole_count, lava_count, old_texture_count
+        ) = getattr(self, '_floor_grid_state', None) or ((None,) * 8)
+        # Rebuild the grid if any list was replaced or shortened, or if the
+        # room or partition floor was changed.
+        if (
+            not grid or old_room != room or old_partition != partition or
+            old_holes is not holes or old_lava is not lava or
+            old_textures is not textures or len(holes) < hole_count or
+            len(lava) < lava_count
+        ):
+            grid = geometry.FloorGrid(self.room_dimensions)
+            if self.partition_floor:
+                grid.add_partition_floor(
+                    self.room_dimensions,
+                    self.partition_floor
+                )
+            hole_count = lava_count = 0
+            old_texture_count = None
+        for area in holes[hole_count:]:
+            grid.add(area.x, area.z, geometry.FLOOR_HOLE)
+        for area in lava[lava_count:]:
+            grid.add(area.x, area.z, geometry.FLOOR_LAVA)
+        if texture_count != old_texture_count:
+            grid.clear(geometry.FLOOR_TEXTURE)
+            for item in textures:
+                for area in (item.positions or []):
+                    grid.add(area.x, area.z, geometry.FLOOR_TEXTURE)
+        self._floor_grid = grid
+        self._floor_grid_state = (
+            room, partition, holes, lava, textures, len(holes), len(lava),
+            texture_count
+        )
+        return grid
+
     def get_object_by_id(self, object_id: str) -> Optional[SceneObject]:
         """Returns the object in this scene with the given ID, or None if such
         an object does not currently exist."""
@@ -126,26 +199,82 @@ class Scene:
         ignore_ground: bool = False,
         ignore_ids: List[str] = None
     ) -> List[ObjectBounds]:
-        """Calculate and return the bounds for all the given objects."""
-        # Create a bounding box for each hole/lava and add it to the list.
-        bounds = [] if ignore_ground else [
-            geometry.generate_floor_area_bounds(area.x, area.z)
-            for area in (self.holes + self.lava)
-        ]
-
-        if self.partition_floor and not ignore_ground:
-            bounds += geometry.find_partition_floor_bounds(
-                self.room_dimensions, self.partition_floor)
-
-        # Add each object's bounding box to the list.
+        """Return the bounds for all the objects in this scene (and its holes,
+        lava, and partition floor, unless ignore_ground is set) except those
+        with the given IDs, indexed for fast collision checks. The index is
+        kept and updated between calls, so this only returns a copy of it."""
+        bounds, object_ids = self._update_bounds_index(ignore_ground)
+        bounds = bounds.copy()
+        if ignore_ids:
+            offset = len(bounds) - len(object_ids)
+            for index in reversed(range(len(object_ids))):
+                if object_ids[index] in ignore_ids:
+                    bounds.pop(offset + index)
+        return bounds
+
+    def _update_bounds_index(
+        self,
+        ignore_ground: bool
+    ) -> Tuple[geometry.ObjectBoundsIndex, List[str]]:
+        holes = [] if self.holes is None else self.holes
+        lava = [] if self.lava is None else self.lava
+        floor_state = None if ignore_ground else (holes, lava, (
+            len(holes),
+            len(lava),
+            (self.room_dimensions.x, self.room_dimensions.z),
+            (self.partition_floor.leftHalf, self.partition_floor.rightHalf)
+            if self.partition_floor else None
+        ))
+        object_ids = []
+        object_bounds = []
         for instance in self.objects:
-            if instance.get('id') in (ignore_ids or []):
-                continue
             try:
-                bounds.append(instance['shows'][0]['boundingBox'])
+                object_bounds.append(instance['shows'][0]['boundingBox'])
+                object_ids.append(instance.get('id'))
             except (KeyError):
                 ...
-        return bounds
+
+        # Reuse the previous index if the holes, lava, and partition floor
+        # are the same and objects were only added to the end of the list.
+        bounds_cache = getattr(self, '_bounds_cache', {})
+        (old_floor_state, bounds, old_ids, old_bounds) = bounds_cache.get(
+            ignore_ground,
+            (None, None, [], [])
+        )
+        count = len(old_bounds)
+        if (
+            bounds is not None and
+            (floor_state is None) == (old_floor_state is None) and (
+                floor_state is None or (
+                    old_floor_state[0] is holes and
+                    old_floor_state[1] is lava and
+                    old_floor_state[2] == floor_state[2]
+                )
+            ) and
+            old_ids == object_ids[:count] and
+            all(a is b for a, b in zip(old_bounds, object_bounds))
+        ):
+            if count < len(object_bounds):
+                # Never change a previously returned index in place.
+                bounds = bounds.copy()
+                bounds.extend(object_bounds[count:])
+        else:
+            # Add the (cached) bounding box for each hole/lava to the list.
+            floor_grid = None if ignore_ground else self.get_floor_grid()
+            bounds = geometry.ObjectBoundsIndex([] if ignore_ground else [
+                floor_grid.find_bounds(area.x, area.z)
+                for area in (holes + lava)
+            ])
+            if self.partition_floor and not ignore_ground:
+                bounds += geometry.find_partition_floor_bounds(
+                    self.room_dimensions, self.partition_floor)
+            bounds += object_bounds
+
+        # Replace (rather than modify) the cache, since drafts share it.
+        self._bounds_cache = {**bounds_cache, ignore_ground: (
+            floor_state, bounds, object_ids, object_bounds
+        )}
+        return bounds, object_ids
 
 # TODO MCS-1234
 # Wanted to use Pydantic, but need MCS to use it and release it first.
@@ -1,24 +1,42 @@
 #!/usr/bin/env python3
 
-import copy
+import gzip
 import json
 import logging
 import os
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 sys.path.insert(1, '../pretty_json')
-from pretty_json import PrettyJsonEncoder, PrettyJsonNoIndent
+from pretty_json import (
+    PrettyJsonNoIndent,
+    PrettyJsonStreamEncoder,
+    dump_with_subset
+)
 
 from .objects import SceneObject
 from .scene import Scene
 
+# The file formats (and file extensions) in which scenes can be saved. The
+# json.gz format is gzip-compressed JSON.
+SCENE_FILE_FORMATS = ['json', 'json.gz']
+
+# The size (in bytes) after which a SceneArchive starts a new shard file.
+ARCHIVE_SHARD_SIZE = 256 * 1024 * 1024
+
 
 def _convert_non_serializable_data(scene: Scene) -> None:
     """Convert all non-JSON-serializable data from the given scene."""
+    _convert_non_serializable_objects(scene.objects)
+
+
+def _convert_non_serializable_objects(objects: List[SceneObject]) -> None:
+    """Convert all non-JSON-serializable data from the given objects."""
     # Convert the boundingBox from an ObjectBounds into a serializable dict.
-    for instance in scene.objects:
+    for instance in objects:
         if 'boundsAtStep' in instance['debug']:
             del instance['debug']['boundsAtStep']
         for show in instance['shows']:
@@ -47,24 +65,68 @@ def _json_no_indent(data: Dict[str, Any], prop_list: List[str]) -> None:
             data[prop] = PrettyJsonNoIndent(data[prop])
 
 
+# The path (a tuple of dict keys, with None for any list index) of all the
+# internal debug data in a scene dict that should only be in debug files.
+DEBUG_DATA_PATHS = [
+    ('debug',),
+    ('objects', None, 'debug'),
+    ('objects', None, 'shows', None, 'boundingBox')
+] + [
+    ('goal', goal_key)
+    for goal_key in ['answer', 'domainsInfo', 'objectsInfo', 'sceneInfo']
+] + [
+    ('goal', 'metadata', target_key, 'info')
+    for target_key in ['target', 'target_1', 'target_2']
+]
+
+
+def _remove_data_at_path(
+    data: Union[Dict[str, Any], List[Any]],
+    path: Tuple[Optional[str], ...]
+) -> None:
+    """Remove the data at the given path (see DEBUG_DATA_PATHS), relative to
+    the given data, if it exists."""
+    key = path[0]
+    if key is None:
+        children = data if isinstance(data, list) else []
+    elif isinstance(data, (SceneObject, dict)) and data.get(key) is not None:
+        if len(path) == 1:
+            del data[key]
+            return
+        children = [data[key]]
+    else:
+        return
+    for child in children:
+        _remove_data_at_path(child, path[1:])
+
+
 def _strip_debug_data(scene_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Remove internal debug data that should only be in debug files."""
-    del scene_dict['debug']
-    for instance in scene_dict['objects']:
-        _strip_debug_object_data(instance)
-    for goal_key in ('answer', 'domainsInfo', 'objectsInfo', 'sceneInfo'):
-        if goal_key in scene_dict['goal']:
-            del scene_dict['goal'][goal_key]
-    if scene_dict['goal']['metadata']:
-        for target_key in ['target', 'target_1', 'target_2']:
-            if scene_dict['goal']['metadata'].get(target_key, None):
-                scene_dict['goal']['metadata'][target_key].pop('info', None)
+    for path in DEBUG_DATA_PATHS:
+        _remove_data_at_path(scene_dict, path)
     return scene_dict
 
 
+def _is_debug_data_path(path: Tuple[Union[str, int], ...]) -> bool:
+    """Return whether the scene dict data at the given path (a tuple of dict
+    keys and list indexes) is internal debug data that should only be in debug
+    files (the same data removed by _strip_debug_data)."""
+    return any(
+        len(path) == len(debug_path) and all(
+            isinstance(key, int) if debug_key is None else key == debug_key
+            for key, debug_key in zip(path, debug_path)
+        ) for debug_path in DEBUG_DATA_PATHS
+    )
+
+
 def _strip_debug_misleading_data(scene: Scene) -> None:
     """Remove misleading internal debug data not needed in debug files."""
-    for instance in scene.objects:
+    _strip_debug_misleading_objects(scene.objects)
+
+
+def _strip_debug_misleading_objects(objects: List[SceneObject]) -> None:
+    """Remove misleading internal debug data from the given objects."""
+    for instance in objects:
         if 'movement' in instance['debug']:
             for movement_property in [
                 'moveExit', 'deepExit', 'tossExit',
@@ -81,10 +143,9 @@ def _strip_debug_misleading_data(scene: Scene) -> None:
 
 def _strip_debug_object_data(instance: SceneObject) -> None:
     """Remove internal debug data from the given object."""
-    instance.pop('debug', None)
-    if 'shows' in instance:
-        for show in instance['shows']:
-            show.pop('boundingBox', None)
+    for path in DEBUG_DATA_PATHS:
+        if path[:2] == ('objects', None):
+            _remove_data_at_path(instance, path[2:])
 
 
 def _truncate_floats_in_dict(data: Dict[str, Any]) -> None:
@@ -110,9 +171,11 @@ def _truncate_floats_in_list(data: List[Any]) -> None:
 
 
 def _ready_scene_for_writing(scene: Scene) -> Dict[str, Any]:
-    _strip_debug_misleading_data(scene)
-    _convert_non_serializable_data(scene)
+    # The scene's to_dict function makes a deep copy of the scene's data, so
+    # modify the copied objects rather than the original scene.
     scene_dict = scene.to_dict()
+    _strip_debug_misleading_objects(scene_dict['objects'])
+    _convert_non_serializable_objects(scene_dict['objects'])
     _truncate_floats_in_dict(scene_dict)
 
     # Use PrettyJsonNoIndent on some of the lists and dicts in the
@@ -135,19 +198,45 @@ def _ready_scene_for_writing(scene: Scene) -> Dict[str, Any]:
     return scene_dict
 
 
+def _open_scene_file(filename: str, mode: str, encoding: str = None):
+    """Open the given scene file as a text file in the given mode, with gzip
+    compression if the filename ends in .gz."""
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode + 't', encoding=encoding)
+    return open(filename, mode, encoding=encoding)
+
+
 def _write_scene_file(filename: str, scene_dict: Dict[str, Any]) -> None:
     # If the filename contains a directory, ensure that directory exists.
     path = Path(filename)
     path.parents[0].mkdir(parents=True, exist_ok=True)
 
-    with open(filename, 'w') as out:
-        # PrettyJsonEncoder doesn't work with json.dump so use json.dumps
+    with _open_scene_file(filename, 'w') as out:
+        # Write the JSON straight to the file in a single pass.
         try:
-            out.write(
-                json.dumps(
-                    scene_dict,
-                    cls=PrettyJsonEncoder,
-                    indent=2))
+            json.dump(scene_dict, out, cls=PrettyJsonStreamEncoder, indent=2)
+        except Exception as e:
+            logging.error(scene_dict, e)
+            raise e from e
+
+
+def _write_scene_files(
+    debug_filename: str,
+    filename: str,
+    scene_dict: Dict[str, Any]
+) -> None:
+    """Write the given scene dict to the given debug file and, at the same
+    time, without its debug data to the other given file, so the data shared
+    by both files is only encoded once."""
+    # If the filenames contain a directory, ensure that directory exists.
+    for path in [Path(debug_filename), Path(filename)]:
+        path.parents[0].mkdir(parents=True, exist_ok=True)
+
+    with _open_scene_file(debug_filename, 'w') as debug_out, (
+        _open_scene_file(filename, 'w')
+    ) as out:
+        try:
+            dump_with_subset(scene_dict, debug_out, out, _is_debug_data_path)
         except Exception as e:
             logging.error(scene_dict, e)
             raise e from e
@@ -157,27 +246,55 @@ def find_next_filename(
     prefix: str,
     index: int,
     indent: str,
-    suffix: str = '.json'
+    suffix: str = '.json',
+    existing: Set[str] = None
 ) -> Tuple[int, str]:
     """Find the next available filename with the given prefix, indented index,
     and and suffix (file extension), then return the filename without the
-    suffix (file extension) and the next available index."""
+    suffix (file extension) and the next available index. If given a set of
+    existing filenames (see list_existing_filenames), check it rather than
+    probing the filesystem for each filename."""
     while True:
         filename = f'{prefix}{index:{indent}}'
-        if not os.path.exists(f'{filename}{suffix}'):
+        if existing is not None:
+            if f'{filename}{suffix}' not in existing:
+                break
+        elif not os.path.exists(f'{filename}{suffix}'):
             break
         index += 1
     return filename, index
 
 
-def save_scene_files(
+def list_existing_filenames(prefix: str) -> Set[str]:
+    """Return the set of existing filenames in the folder of the given
+    filename prefix, formatted like the filenames from find_next_filename."""
+    folder_name = os.path.dirname(prefix)
+    try:
+        names = os.listdir(folder_name or '.')
+    except (FileNotFoundError, NotADirectoryError):
+        names = []
+    return set(os.path.join(folder_name, name) for name in names)
+
+
+def load_scene_file(filename: str) -> Dict[str, Any]:
+    """Load and return the scene data from the given scene file, saved in any
+    of the SCENE_FILE_FORMATS (identified by its file extension)."""
+    with _open_scene_file(filename, 'r', encoding='utf-8-sig') as scene_file:
+        return json.load(scene_file)
+
+
+def _ready_scene_files(
     scene: Scene,
     scene_filename: str,
-    no_scene_id: bool = False,
-    no_debug_file: bool = False,
-    only_debug_file: bool = False
-) -> int:
-    """Save the given scene as a normal JSON file and a debug JSON file."""
+    no_scene_id: bool,
+    no_debug_file: bool,
+    only_debug_file: bool,
+    file_format: str
+) -> Tuple[Optional[str], Optional[str], Dict[str, Any]]:
+    """Return the debug filename (or None), the normal filename (or None),
+    and the scene dict ready to write for the given scene."""
+    if file_format not in SCENE_FILE_FORMATS:
+        raise ValueError(f'Unsupported scene file format: {file_format}')
 
     # The debug scene filename has the scene ID for debugging.
     scene_id = (scene.goal.scene_info or {}).get('id', [None])[0]
@@ -187,13 +304,320 @@ def save_scene_files(
     )
 
     # Ensure that the scene's 'name' property doesn't have a directory.
-    scene_copy = copy.deepcopy(scene)
-    scene_copy.name = Path(scene_filename).name
-    scene_dict = _ready_scene_for_writing(scene_copy)
+    # Use a draft so the original scene's name isn't changed.
+    scene_draft = scene.create_draft()
+    scene_draft.name = Path(scene_filename).name
+    scene_dict = _ready_scene_for_writing(scene_draft)
 
+    return (
+        None if no_debug_file else f'{debug_filename}_debug.{file_format}',
+        None if only_debug_file else f'{scene_filename}.{file_format}',
+        scene_dict
+    )
+
+
+def _write_ready_scene_files(
+    debug_filename: Optional[str],
+    filename: Optional[str],
+    scene_dict: Dict[str, Any]
+) -> None:
+    """Write the given scene dict to the given debug and normal files."""
     # Save the scene as both normal and debug JSON files.
-    if not no_debug_file:
-        _write_scene_file(debug_filename + '_debug.json', scene_dict)
-    scene_dict = _strip_debug_data(scene_dict)
-    if not only_debug_file:
-        _write_scene_file(scene_filename + '.json', scene_dict)
+    if debug_filename and filename:
+        _write_scene_files(debug_filename, filename, scene_dict)
+    elif debug_filename:
+        _write_scene_file(debug_filename, scene_dict)
+    elif filename:
+        _write_scene_file(filename, _strip_debug_data(scene_dict))
+
+
+def save_scene_files(
+    scene: Scene,
+    scene_filename: str,
+    no_scene_id: bool = False,
+    no_debug_file: bool = False,
+    only_debug_file: bool = False,
+    file_format: str = 'json'
+) -> int:
+    """Save the given scene as a normal JSON file and a debug JSON file, in
+    the given file format (one of the SCENE_FILE_FORMATS)."""
+    _write_ready_scene_files(*_ready_scene_files(
+        scene,
+        scene_filename,
+        no_scene_id,
+        no_debug_file,
+        only_debug_file,
+        file_format
+    ))
+
+
+class SceneArchive():
+    """Saves scene files by appending them to rolling shard files, rather than
+    writing each scene file on its own. Each shard file (named like
+    <prefix>shard_0001.jsonl) has one scene file per line as compact JSON;
+    a new shard is started once a shard reaches max_shard_size bytes. The
+    index file (named <prefix>index.jsonl) has one line per scene file with
+    its filename, scene name, scene ID, shard filename, byte offset, and byte
+    length. An existing archive with the same prefix is appended to. Use
+    load_archived_scene_file to read a scene file from an archive."""
+
+    def __init__(
+        self,
+        prefix: str,
+        max_shard_size: int = ARCHIVE_SHARD_SIZE
+    ) -> None:
+        self.prefix = prefix
+        self.max_shard_size = max_shard_size
+        self._lock = threading.Lock()
+        self._shard_file = None
+        self._shard_number = 1
+        self.filenames: Set[str] = set()
+        entries = read_scene_archive_index(prefix)
+        for entry in entries:
+            self.filenames.add(entry['filename'])
+        if entries:
+            # Continue appending to the last shard of the existing archive.
+            last_shard = Path(entries[-1]['shard']).stem
+            self._shard_number = int(last_shard.split('_')[-1])
+        Path(prefix).parents[0].mkdir(parents=True, exist_ok=True)
+        self._index_file = open(f'{prefix}index.jsonl', 'a')
+
+    def __enter__(self) -> 'SceneArchive':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _find_shard_file(self, size: int):
+        # Start a new shard if the current shard would be too big.
+        if (
+            self._shard_file is None or (
+                self._shard_file.tell() and
+                self._shard_file.tell() + size > self.max_shard_size
+            )
+        ):
+            if self._shard_file is not None:
+                self._shard_file.close()
+                self._shard_number += 1
+            self._shard_file = open(
+                f'{self.prefix}shard_{self._shard_number:04}.jsonl',
+                'ab'
+            )
+        return self._shard_file
+
+    def add_scene_files(
+        self,
+        debug_filename: Optional[str],
+        filename: Optional[str],
+        scene_dict: Dict[str, Any]
+    ) -> None:
+        """Append the given scene dict to the archive as the given debug file
+        and, without its debug data, the other given file (like
+        _write_ready_scene_files). Safe to call from multiple threads."""
+        scene_id = scene_dict['goal'].get('sceneInfo', {}).get('id', [None])
+        records = []
+        if debug_filename:
+            records.append((debug_filename, _encode_compact(scene_dict)))
+        if filename:
+            records.append((
+                filename,
+                _encode_compact(_strip_debug_data(scene_dict))
+            ))
+        with self._lock:
+            for record_filename, data in records:
+                shard_file = self._find_shard_file(len(data) + 1)
+                offset = shard_file.tell()
+                shard_file.write(data + b'\n')
+                self._index_file.write(json.dumps({
+                    'filename': record_filename,
+                    'name': scene_dict.get('name'),
+                    'sceneId': scene_id[0] if scene_id else None,
+                    'shard': Path(shard_file.name).name,
+                    'offset': offset,
+                    'length': len(data)
+                }) + '\n')
+                self.filenames.add(record_filename)
+
+    def close(self) -> None:
+        """Close the current shard file and the index file."""
+        with self._lock:
+            if self._shard_file is not None:
+                self._shard_file.close()
+                self._shard_file = None
+            self._index_file.close()
+
+
+def _encode_compact(scene_dict: Dict[str, Any]) -> bytes:
+    """Return the given scene dict as compact JSON on a single line."""
+    return ''.join(PrettyJsonStreamEncoder(
+        separators=(',', ':')
+    ).iterencode(scene_dict)).encode()
+
+
+def read_scene_archive_index(prefix: str) -> List[Dict[str, Any]]:
+    """Return the index entries of the SceneArchive with the given prefix, or
+    an empty list if the archive doesn't exist."""
+    try:
+        with open(f'{prefix}index.jsonl') as index_file:
+            return [json.loads(line) for line in index_file if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def load_archived_scene_file(
+    prefix: str,
+    entry: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Load and return the scene data of the given index entry (see
+    read_scene_archive_index) from the SceneArchive with the given prefix."""
+    folder_name = os.path.dirname(prefix)
+    with open(os.path.join(folder_name, entry['shard']), 'rb') as shard_file:
+        shard_file.seek(entry['offset'])
+        return json.loads(shard_file.read(entry['length']))
+
+
+class SceneWriter():
+    """Saves scene files on background writer threads, so the next scene can
+    be generated while the previous scene is encoded and written to disk. At
+    most max_pending scenes wait to be written at a time: save_scene_files
+    blocks until a writer is free. Any writer error is raised by the next
+    call to save_scene_files or flush. Use as a context manager to ensure
+    all pending scenes are written on exit.
+
+    The filenames found with find_next_filename are checked against the
+    existing files (listed once per folder) and the files already saved by
+    this writer, rather than probing the filesystem for each filename.
+
+    If given a SceneArchive, the scene files are added to the archive rather
+    than written as separate files, and the archive is closed along with
+    this writer."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_pending: int = None,
+        archive: SceneArchive = None
+    ) -> None:
+        self._archive = archive
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='scene_writer'
+        )
+        self._slots = threading.BoundedSemaphore(max_pending or (workers * 2))
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+        self._error: Exception = None
+        self._filenames: Dict[str, Set[str]] = {}
+
+    def __enter__(self) -> 'SceneWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type:
+            # Still write all the pending scenes, but don't hide the error.
+            self._shutdown()
+        else:
+            self.close()
+
+    def _existing_filenames(self, prefix: str) -> Set[str]:
+        folder_name = os.path.dirname(prefix)
+        if folder_name not in self._filenames:
+            self._filenames[folder_name] = list_existing_filenames(prefix)
+            if self._archive:
+                self._filenames[folder_name].update(
+                    filename for filename in self._archive.filenames
+                    if os.path.dirname(filename) == folder_name
+                )
+        return self._filenames[folder_name]
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            if not future.cancelled() and future.exception():
+                self._error = self._error or future.exception()
+        self._slots.release()
+
+    def _raise_error(self) -> None:
+        with self._lock:
+            error, self._error = self._error, None
+        if error:
+            raise error
+
+    def _shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._archive:
+            self._archive.close()
+
+    def close(self) -> None:
+        """Write all the pending scenes and stop the writer threads. Raise
+        the first writer error, if any."""
+        self._shutdown()
+        self._raise_error()
+
+    def find_next_filename(
+        self,
+        prefix: str,
+        index: int,
+        indent: str,
+        suffix: str = '.json'
+    ) -> Tuple[int, str]:
+        """Like find_next_filename, but also skips the filenames of the
+        scenes already saved (or waiting to be saved) by this writer."""
+        return find_next_filename(
+            prefix,
+            index,
+            indent,
+            suffix=suffix,
+            existing=self._existing_filenames(prefix)
+        )
+
+    def flush(self) -> None:
+        """Wait for all the pending scenes to be written. Raise the first
+        writer error, if any."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            # Errors are recorded by _on_done.
+            future.exception()
+        self._raise_error()
+
+    def save_scene_files(
+        self,
+        scene: Scene,
+        scene_filename: str,
+        no_scene_id: bool = False,
+        no_debug_file: bool = False,
+        only_debug_file: bool = False,
+        file_format: str = 'json'
+    ) -> None:
+        """Save the given scene like save_scene_files, but write its files on
+        a background writer thread. The scene is copied before this returns,
+        so it's safe to modify afterward."""
+        self._raise_error()
+        # Copy the scene data now, on the calling thread.
+        ready = _ready_scene_files(
+            scene,
+            scene_filename,
+            no_scene_id,
+            no_debug_file,
+            only_debug_file,
+            file_format
+        )
+        for filename in ready[:2]:
+            if filename:
+                self._existing_filenames(filename).add(filename)
+        # Wait for a free slot, then raise any error from a previous scene.
+        self._slots.acquire()
+        try:
+            self._raise_error()
+            future = self._executor.submit(
+                self._archive.add_scene_files if self._archive else
+                _write_ready_scene_files,
+                *ready
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
@@ -26,6 +26,7 @@
 # Rewriting things to handle our dict format
 from typing import Dict, List, Union
 
+import numpy as np
 from machine_common_sense.config_manager import Vector3d
 
 
@@ -109,3 +110,65 @@ def sat_entry(
         (corner_b['x'], corner_b['z']) for corner_b in rect_b
     ]
     return separating_axis_theorem(vertices_a, vertices_b)
+
+
+def rects_to_array(
+    rects: List[List[Union[Dict[str, float], Vector3d]]]
+) -> np.ndarray:
+    """Convert the given list of rectangles (each a list of four dict or
+    Vector3d corners) into an array of shape (N, 4, 2) of X/Z corners."""
+    return np.array([[
+        (corner.x, corner.z) if isinstance(corner, Vector3d) else
+        (corner['x'], corner['z']) for corner in rect
+    ] for rect in rects], dtype=float).reshape(-1, 4, 2)
+
+
+def _find_normal_axes(rects: np.ndarray) -> np.ndarray:
+    """Return the normalized axis orthogonal to each edge of each rectangle
+    in the given (N, 4, 2) array, as an (N, 4, 2) array. The axis of each
+    zero-length edge (from a repeated corner) is (0, 0), on which all
+    projections overlap, so it's effectively skipped."""
+    edges = np.roll(rects, -1, axis=1) - rects
+    axes = np.stack((edges[..., 1], -edges[..., 0]), axis=-1)
+    norms = np.sqrt(axes[..., 0] ** 2 + axes[..., 1] ** 2)[..., np.newaxis]
+    return np.divide(axes, norms, out=np.zeros_like(axes), where=(norms > 0))
+
+
+def _project(rects: np.ndarray, axes: np.ndarray) -> np.ndarray:
+    """Project the corners of each rectangle in the given (M, 1, 1, 4, 2) or
+    (1, N, 1, 4, 2) array onto each axis in the given (M, N, A, 1, 2) array,
+    and return the (M, N, A, 4) projections."""
+    return rects[..., 0] * axes[..., 0] + rects[..., 1] * axes[..., 1]
+
+
+def sat_matrix(rects_a: np.ndarray, rects_b: np.ndarray) -> np.ndarray:
+    """Test each rectangle in the given (M, 4, 2) array against each
+    rectangle in the given (N, 4, 2) array (see rects_to_array) in a single
+    batch, and return an (M, N) boolean array that is True where the two
+    rectangles collide. Like separating_axis_theorem, touching rectangles
+    collide."""
+    rects_a = np.asarray(rects_a, dtype=float).reshape(-1, 4, 2)
+    rects_b = np.asarray(rects_b, dtype=float).reshape(-1, 4, 2)
+    count_a = len(rects_a)
+    count_b = len(rects_b)
+    if not count_a or not count_b:
+        return np.zeros((count_a, count_b), dtype=bool)
+    # Test each pair of rectangles on the normals of all eight of its edges.
+    axes = np.concatenate((
+        np.broadcast_to(
+            _find_normal_axes(rects_a)[:, np.newaxis],
+            (count_a, count_b, 4, 2)
+        ),
+        np.broadcast_to(
+            _find_normal_axes(rects_b)[np.newaxis, :],
+            (count_a, count_b, 4, 2)
+        )
+    ), axis=2)[:, :, :, np.newaxis, :]
+    projection_a = _project(rects_a[:, np.newaxis, np.newaxis], axes)
+    projection_b = _project(rects_b[np.newaxis, :, np.newaxis], axes)
+    # The rectangles collide if their projections overlap on every axis.
+    overlapping = (
+        (projection_a.min(axis=-1) <= projection_b.max(axis=-1)) &
+        (projection_b.min(axis=-1) <= projection_a.max(axis=-1))
+    )
+    return overlapping.all(axis=-1)
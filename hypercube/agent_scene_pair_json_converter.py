@@ -1,12 +1,25 @@
+import bisect
 import copy
 import logging
 import math
 import random
 import uuid
+from collections.abc import MutableSequence
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple
+)
 
+import numpy as np
 import shapely
+import shapely.prepared
 from machine_common_sense.config_manager import Goal, Vector3d
 
 from generator import (
@@ -132,6 +145,222 @@ class TrueObjectBounds(ObjectBounds):
         ]
 
 
+class StepTimeline(MutableSequence):
+    """A list of values (like an object's bounds) at each step, stored as
+    run-length segments of the same value (compared by identity), so it only
+    takes memory for each change, and the value at a step is found in
+    O(log n) time. Supports the list operations used on "boundsAtStep"."""
+
+    def __init__(self, values: Iterable[Any] = ()):
+        # The exclusive end step of each segment, and its value.
+        self._stops: List[int] = []
+        self._values: List[Any] = []
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return self._stops[-1] if self._stops else 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for start, stop, value in self.runs():
+            for _ in range(start, stop):
+                yield value
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, StepTimeline)):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __add__(self, other: Iterable[Any]) -> 'StepTimeline':
+        timeline = StepTimeline(self)
+        timeline.extend(other)
+        return timeline
+
+    def __radd__(self, other: Iterable[Any]) -> 'StepTimeline':
+        timeline = StepTimeline(other)
+        timeline.extend(self)
+        return timeline
+
+    def __repr__(self) -> str:
+        return f'StepTimeline({list(self)!r})'
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return StepTimeline(list(self)[index])
+            timeline = StepTimeline()
+            for run_start, run_stop, value in self.runs():
+                timeline.append_repeated(
+                    value,
+                    min(run_stop, stop) - max(run_start, start)
+                )
+            return timeline
+        return self._values[self._find_segment(self._validate_index(index))]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            values = list(self)
+            values[index] = value
+            self._reset(values)
+            return
+        index = self._validate_index(index)
+        segment = self._find_segment(index)
+        if self._values[segment] is value:
+            return
+        # Split the segment around the step, then merge any equal neighbors.
+        start = self._stops[segment - 1] if segment else 0
+        stop = self._stops[segment]
+        old = self._values[segment]
+        pieces = [
+            (piece_stop, piece_value) for piece_start, piece_stop, piece_value
+            in [(start, index, old), (index, index + 1, value), (
+                index + 1, stop, old
+            )] if piece_stop > piece_start
+        ]
+        self._stops[segment:segment + 1] = [piece[0] for piece in pieces]
+        self._values[segment:segment + 1] = [piece[1] for piece in pieces]
+        self._merge_segments(segment, segment + len(pieces))
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            values = list(self)
+            del values[index]
+            self._reset(values)
+            return
+        segment = self._find_segment(self._validate_index(index))
+        for i in range(segment, len(self._stops)):
+            self._stops[i] -= 1
+        start = self._stops[segment - 1] if segment else 0
+        if self._stops[segment] == start:
+            del self._stops[segment]
+            del self._values[segment]
+            self._merge_segments(segment, segment)
+
+    def insert(self, index: int, value: Any) -> None:
+        length = len(self)
+        index = min(max(index + length if index < 0 else index, 0), length)
+        if index == length:
+            self.append(value)
+            return
+        # Extend the segment at the step by one, then replace the step.
+        segment = self._find_segment(index)
+        for i in range(segment, len(self._stops)):
+            self._stops[i] += 1
+        self[index] = value
+
+    def append(self, value: Any) -> None:
+        self.append_repeated(value, 1)
+
+    def append_repeated(self, value: Any, count: int) -> None:
+        """Append the given value for the given number of steps."""
+        if count <= 0:
+            return
+        if self._values and self._values[-1] is value:
+            self._stops[-1] += count
+        else:
+            self._stops.append(len(self) + count)
+            self._values.append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        if isinstance(values, StepTimeline):
+            for start, stop, value in list(values.runs()):
+                self.append_repeated(value, stop - start)
+            return
+        for value in values:
+            self.append(value)
+
+    def runs(self) -> Iterator[Tuple[int, int, Any]]:
+        """Yield the start step, the (exclusive) stop step, and the value of
+        each run of the same value in this timeline."""
+        start = 0
+        for stop, value in zip(self._stops, self._values):
+            yield start, stop, value
+            start = stop
+
+    def _find_segment(self, index: int) -> int:
+        return bisect.bisect_right(self._stops, index)
+
+    def _merge_segments(self, first: int, last: int) -> None:
+        # Merge each segment from first to last (inclusive) into the previous
+        # segment if they have the same value.
+        last = min(last, len(self._stops) - 1)
+        for segment in range(last, max(first, 1) - 1, -1):
+            if self._values[segment] is self._values[segment - 1]:
+                del self._stops[segment - 1]
+                del self._values[segment]
+
+    def _reset(self, values: Iterable[Any]) -> None:
+        self._stops = []
+        self._values = []
+        self.extend(values)
+
+    def _validate_index(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('StepTimeline index out of range')
+        return index
+
+
+class TrueBoundsIndex():
+    """An index of the distinct "true bounds" in one or more "boundsAtStep"
+    lists (like each important object's bounds for the rest of a trial), so
+    another object's bounds can be checked for overlap against all of them
+    at once: their envelopes are compared with NumPy (a broad-phase check),
+    and only the nearby bounds are checked with _do_objects_overlap."""
+
+    def __init__(
+        self,
+        bounds_lists: Iterable[Iterable[Optional[TrueObjectBounds]]]
+    ):
+        self.bounds_list: List[TrueObjectBounds] = []
+        bounds_ids = set()
+        for bounds_at_step in bounds_lists:
+            # Skip the repeated bounds in each run of a timeline.
+            if isinstance(bounds_at_step, StepTimeline):
+                bounds_at_step = [run[2] for run in bounds_at_step.runs()]
+            for bounds in bounds_at_step:
+                if bounds and id(bounds) not in bounds_ids:
+                    bounds_ids.add(id(bounds))
+                    self.bounds_list.append(bounds)
+        # The min X, min Z, max X, and max Z of each bounds' true polygon.
+        self._envelopes = np.array([
+            bounds.true_poly.bounds for bounds in self.bounds_list
+        ], dtype=float).reshape((-1, 4))
+
+    def find_nearby(self, bounds: TrueObjectBounds) -> List[TrueObjectBounds]:
+        """Return each indexed bounds whose envelope intersects the envelope
+        of the given bounds."""
+        min_x, min_z, max_x, max_z = bounds.true_poly.bounds
+        mask = (
+            (self._envelopes[:, 0] <= max_x) &
+            (self._envelopes[:, 1] <= max_z) &
+            (self._envelopes[:, 2] >= min_x) &
+            (self._envelopes[:, 3] >= min_z)
+        )
+        return [self.bounds_list[index] for index in np.flatnonzero(mask)]
+
+    def overlaps(self, bounds: TrueObjectBounds) -> bool:
+        """Return whether the given bounds overlap any indexed bounds."""
+        return any(
+            _do_objects_overlap(indexed_bounds, bounds, -1)
+            for indexed_bounds in self.find_nearby(bounds)
+        )
+
+    def prepare_sight_lines(
+        self,
+        observer_center: Tuple[float, float]
+    ) -> shapely.prepared.PreparedGeometry:
+        """Return the lines of sight from the given observer position to the
+        center of each indexed bounds, combined and prepared so they can be
+        checked against many occluder positions."""
+        return shapely.prepared.prep(shapely.geometry.MultiLineString([
+            [observer_center, list(bounds.true_poly.centroid.coords)[0]]
+            for bounds in self.bounds_list
+        ]))
+
+
 # Debug logging
 SAVE_TRIALS_TO_FILE = False
 TRIALS_SUFFIX = '_trials.txt'
@@ -402,61 +631,100 @@ def _append_each_show_to_object(
     """Append a "shows" array element to the given moving object for each step
     in the given trial list."""
 
+    # Retrieve the object's JSON data on each frame. (Sometimes the key is not
+    # in some trials.)
+    json_object_list = []
+    for frame in trial:
+        json_object = frame.get(json_property)
+        if json_object and json_property not in [
+            'agent', 'door', 'other_agent', 'paddle'
+        ]:
+            json_object = json_object[json_index]
+        json_object_list.append(json_object or None)
+
+    # Convert the object's JSON coordinates on all the frames at once, and
+    # find the frames on which its position or rotation actually changes.
+    json_coords_list = []
+    json_size_list = []
+    json_rotation_list = []
+    for json_object in filter(None, json_object_list):
+        json_coords_list.append(json_object[0])
+        if json_property == 'paddle':
+            # The json_size isn't needed because the paddle's coordinates
+            # are already centered.
+            json_size_list.append([0, 0])
+            json_rotation_list.append(360 - json_object[2])
+        elif json_property == 'door':
+            json_size_list.append([20, 40])
+            json_rotation_list.append(0)
+        else:
+            json_radius = json_object[1]
+            json_size_list.append([json_radius * 2, json_radius * 2])
+            json_rotation_list.append(rotation_y)
+    position_list = _convert_json_coords_to_positions(
+        json_coords_list,
+        json_size_list,
+        unit_size
+    )
+    change_list = np.ones(len(position_list), dtype=bool)
+    change_list[1:] = (
+        np.any(position_list[1:] != position_list[:-1], axis=1) |
+        (np.diff(np.array(json_rotation_list, dtype=float)) != 0)
+    )
+    position_list = position_list.tolist()
+
     latest_bounds = None
+    # Whether the object's latest "shows" element may not match its position
+    # and rotation on the current frame.
+    needs_show = True
+    change_index = -1
 
     # Add data for the object's movement across the frames to each step.
     step = trial_start_step
-    for frame_index, frame in enumerate(trial):
+    for frame_index, json_object in enumerate(json_object_list):
         invoke_callback = False
-        json_object = frame.get(json_property)
-        # (Sometimes the key is not in some trials.)
         if json_object:
-            json_object = json_object if json_property in [
-                'agent', 'door', 'other_agent', 'paddle'
-            ] else json_object[json_index]
-            json_coords = json_object[0]
-            if json_property == 'paddle':
-                # The json_size isn't needed because the paddle's coordinates
-                # are already centered.
-                json_size = [0, 0]
-                json_rotation = 360 - json_object[2]
-            elif json_property == 'door':
-                json_size = [20, 40]
-                json_rotation = 0
-            else:
-                json_radius = json_object[1]
-                json_size = [json_radius * 2, json_radius * 2]
-                json_rotation = rotation_y
-            # Move the object to its new position for the step...
-            mcs_show = _create_show(
-                step,
-                mcs_object['type'],
-                mcs_object['debug']['configHeight'],
-                mcs_object['debug']['configSize'],
-                json_coords,
-                json_size,
-                unit_size,
-                json_rotation
-            )
-            latest_bounds = mcs_show['boundingBox']
-            # ...But only if it actually has a new position/rotation.
-            if (
-                not mcs_object['shows'] or
-                mcs_show['position'] != mcs_object['shows'][-1]['position'] or
-                mcs_show['rotation'] != mcs_object['shows'][-1]['rotation']
-            ):
-                mcs_object['shows'].append(mcs_show)
-                invoke_callback = True
+            change_index += 1
+            if change_list[change_index]:
+                latest_bounds = None
+                needs_show = True
+            if needs_show:
+                # Move the object to its new position for the step (reusing
+                # its bounds if only the latest "shows" element changed)...
+                mcs_show = _create_show_at_position(
+                    step,
+                    mcs_object['type'],
+                    mcs_object['debug']['configHeight'],
+                    mcs_object['debug']['configSize'],
+                    position_list[change_index],
+                    json_rotation_list[change_index],
+                    latest_bounds
+                )
+                latest_bounds = mcs_show['boundingBox']
+                # ...But only if it actually has a new position/rotation.
+                if (
+                    not mcs_object['shows'] or
+                    mcs_show['position'] !=
+                    mcs_object['shows'][-1]['position'] or
+                    mcs_show['rotation'] !=
+                    mcs_object['shows'][-1]['rotation']
+                ):
+                    mcs_object['shows'].append(mcs_show)
+                    invoke_callback = True
+                # The callback may change the latest "shows" element, so only
+                # skip this check again if it won't be invoked.
+                needs_show = bool(invoke_callback and on_step_callback)
 
         # If this object has appeared in this trial, update its bounds for the
         # step (overwriting any existing bounds); otherwise, just add None.
+        bounds_at_step = _get_bounds_at_step(mcs_object)
         if latest_bounds:
-            if step < len(mcs_object['debug']['boundsAtStep']):
-                mcs_object['debug']['boundsAtStep'][step] = latest_bounds
+            if step < len(bounds_at_step):
+                bounds_at_step[step] = latest_bounds
             else:
-                mcs_object['debug']['boundsAtStep'].append(latest_bounds)
+                bounds_at_step.append(latest_bounds)
         else:
-            mcs_object['debug']['boundsAtStep'].append(None)
+            bounds_at_step.append(None)
 
         # If this object moved on this specific step, invoke the callback func.
         if invoke_callback and on_step_callback:
@@ -470,7 +738,7 @@ def _append_each_show_to_object(
 
     # Add 1 for the EndHabituation action step at the end of the trial.
     step += 1
-    mcs_object['debug']['boundsAtStep'].append(
+    _get_bounds_at_step(mcs_object).append(
         mcs_object['shows'][-1]['boundingBox']
     )
 
@@ -682,7 +950,7 @@ def _create_agent_object_list(
 
         # Remove the object's first appearance (we will override it later).
         agent_object['shows'] = []
-        agent_object['debug']['boundsAtStep'] = []
+        agent_object['debug']['boundsAtStep'] = StepTimeline()
 
         # Save the agent in this function's output list.
         agent_object_list.append(agent_object)
@@ -737,8 +1005,10 @@ def _create_agent_object_list(
             mcs_agent['hides'].append({
                 'stepBegin': step
             })
-            for _ in range(hide_until_frame):
-                mcs_agent['debug']['boundsAtStep'].append(None)
+            _get_bounds_at_step(mcs_agent).append_repeated(
+                None,
+                hide_until_frame
+            )
 
     return agent_object_list
 
@@ -889,8 +1159,11 @@ def _create_goal_object_list(
                 goal_object['debug']['agentTouches'] = {}
                 for index in range(0, len(trial_list)):
                     goal_object['debug']['agentTouches'][index] = []
-                for _ in range(0, step):
-                    goal_object['debug']['boundsAtStep'].insert(0, None)
+                # Set its bounds as None for all the steps before it existed.
+                bounds_at_step = StepTimeline()
+                bounds_at_step.append_repeated(None, step)
+                bounds_at_step.extend(goal_object['debug']['boundsAtStep'])
+                goal_object['debug']['boundsAtStep'] = bounds_at_step
                 goal_object['debug'][
                     tags.SCENE.UNTRAINED_SHAPE
                 ] = config_with_material.untrained
@@ -913,10 +1186,10 @@ def _create_goal_object_list(
                 ))
 
             # Add the object's bounds for each frame of the trial.
-            for _ in range(0, len(trial) + (1 if already_existed else 0)):
-                goal_object['debug']['boundsAtStep'].append(
-                    goal_object['shows'][-1]['boundingBox']
-                )
+            _get_bounds_at_step(goal_object).append_repeated(
+                goal_object['shows'][-1]['boundingBox'],
+                len(trial) + (1 if already_existed else 0)
+            )
 
             # Mark each time the object's color changes to signal an agent
             # touches an object. We will change the object's color elsewhere.
@@ -939,8 +1212,10 @@ def _create_goal_object_list(
             goal_object['hides'].append({
                 'stepBegin': step
             })
-            for _ in range(0, len(trial) + 1):
-                goal_object['debug']['boundsAtStep'].append(None)
+            _get_bounds_at_step(goal_object).append_repeated(
+                None,
+                len(trial) + 1
+            )
 
         # Add 1 for the EndHabituation action step at the end of the trial.
         step += len(trial) + 1
@@ -1033,7 +1308,7 @@ def _create_key_object(
 
     # Remove the object's first appearance (we will override it later).
     key_object['shows'] = []
-    key_object['debug']['boundsAtStep'] = []
+    key_object['debug']['boundsAtStep'] = StepTimeline()
 
     def _callback(
         trial_start_step: int,
@@ -1145,9 +1420,10 @@ def _create_lock_wall_object_list(
                 'y': rotation_y,
                 'z': 0
             }
-            lock_object['debug']['boundsAtStep'] = (
-                ([None] * step) + [lock_object['shows'][0]['boundingBox']]
-            )
+            bounds_at_step = StepTimeline()
+            bounds_at_step.append_repeated(None, step)
+            bounds_at_step.append(lock_object['shows'][0]['boundingBox'])
+            lock_object['debug']['boundsAtStep'] = bounds_at_step
             # Adjust the show step to sync with the trial step.
             lock_object['shows'][0]['stepBegin'] = step
 
@@ -1177,11 +1453,8 @@ def _create_lock_wall_object_list(
         # this trial. Always do this even if no lock wall exists in this trial!
         for previous_lock_object in lock_wall_object_list:
             total = step + len(trial) + 1
-            previous_lock_object['debug']['boundsAtStep'] = (
-                previous_lock_object['debug']['boundsAtStep'] + ([None] * (
-                    total - len(previous_lock_object['debug']['boundsAtStep'])
-                ))
-            )
+            bounds_at_step = _get_bounds_at_step(previous_lock_object)
+            bounds_at_step.append_repeated(None, total - len(bounds_at_step))
 
     return lock_wall_object_list
 
@@ -1225,9 +1498,9 @@ def _create_object(
     scale = mcs_object['shows'][0]['scale']
     mcs_object['debug']['dimensions'] = dimensions.get_dict(scale)
     mcs_object['debug']['info'].append(' '.join(mcs_object['debug']['info']))
-    mcs_object['debug']['boundsAtStep'] = [
+    mcs_object['debug']['boundsAtStep'] = StepTimeline([
         mcs_object['shows'][0]['boundingBox']
-    ]
+    ])
     return mcs_object
 
 
@@ -1265,10 +1538,10 @@ def _create_nonagent_occluder_object(
     )
 
     # Add the occluder's bounds for each other frame of the first trial.
-    for _ in range(0, len(trial_list[0])):
-        occluder_object['debug']['boundsAtStep'].append(
-            occluder_object['shows'][-1]['boundingBox']
-        )
+    _get_bounds_at_step(occluder_object).append_repeated(
+        occluder_object['shows'][-1]['boundingBox'],
+        len(trial_list[0])
+    )
 
     # Find the step for the start of the second trial.
     # Assume scenes will have more than one trial.
@@ -1288,18 +1561,15 @@ def _create_nonagent_occluder_object(
         if is_final_trial and occluder_mode == OccluderMode.NONAGENT_TRAINING:
             observer_center = [4, -4]
 
-            # Gather the bounds for all the important objects.
-            agent_bounds_at_step = agent_object['debug']['boundsAtStep']
-            paddle_bounds_at_step = paddle_object['debug']['boundsAtStep']
-            unoccluded_data = []
-            for unoccluded_bounds in agent_bounds_at_step[step:] + [
-                instance['debug']['boundsAtStep'][step]
-                for instance in goal_object_list
-            ] + paddle_bounds_at_step[step:]:
-                poly = unoccluded_bounds.true_poly
-                center = list(poly.centroid.coords)[0]
-                view = shapely.geometry.LineString([observer_center, center])
-                unoccluded_data.append((unoccluded_bounds, view))
+            # Index the bounds for all the important objects for the rest of
+            # the trial, and their lines of sight from the observer.
+            unoccluded_index = TrueBoundsIndex(
+                [agent_object['debug']['boundsAtStep'][step:]] + [
+                    [instance['debug']['boundsAtStep'][step]]
+                    for instance in goal_object_list
+                ] + [paddle_object['debug']['boundsAtStep'][step:]]
+            )
+            views = unoccluded_index.prepare_sight_lines(observer_center)
 
             # Generate a random grid.
             grid = [(x / unit_size[0], z / unit_size[1]) for x, z in GRID]
@@ -1321,18 +1591,14 @@ def _create_nonagent_occluder_object(
                     rotation_y=45
                 )
                 occluder_bounds = occluder_show['boundingBox']
-                occluder_poly = occluder_bounds.true_poly
-                for bounds, view in unoccluded_data:
-                    # Ensure the occluder at this position will NOT obstruct
-                    # the observer's view of the other object.
-                    if view.intersects(occluder_poly):
-                        occluder_show = None
-                        break
-                    # Ensure the occluder at this position will NOT overlap the
-                    # other object.
-                    if _do_objects_overlap(bounds, occluder_bounds, -1):
-                        occluder_show = None
-                        break
+                # Ensure the occluder at this position will NOT obstruct the
+                # observer's view of the other objects, and will NOT overlap
+                # the other objects.
+                if (
+                    views.intersects(occluder_bounds.true_poly) or
+                    unoccluded_index.overlaps(occluder_bounds)
+                ):
+                    occluder_show = None
                 if occluder_show:
                     logger.debug(
                         f'Occluder location {json_coords=} '
@@ -1414,6 +1680,8 @@ def _create_nonagent_occluder_object(
             view_to_agent = shapely.geometry.LineString(
                 [observer_center, agent_center]
             )
+            # Index the agent's bounds for the rest of the trial.
+            agent_index = TrueBoundsIndex([agent_bounds_at_step[step:]])
 
             for z in range(0, 11):
                 for i in range(20, 41):
@@ -1453,22 +1721,14 @@ def _create_nonagent_occluder_object(
 
                     # Ensure the occluder does not intersect with the agent's
                     # movement.
-                    if occluder_show:
-                        for next_step, next_agent_bounds in enumerate(
-                            agent_bounds_at_step[step:]
-                        ):
-                            if _do_objects_overlap(
-                                next_agent_bounds,
-                                occluder_show['boundingBox'],
-                                step + next_step
-                            ):
-                                logger.debug(
-                                    f'Move back: in the way {json_coords=} '
-                                    f'occluder_position='
-                                    f'{occluder_show["position"]}'
-                                )
-                                occluder_show = None
-                                break
+                    if occluder_show and agent_index.overlaps(
+                        occluder_show['boundingBox']
+                    ):
+                        logger.debug(
+                            f'Move back: in the way {json_coords=} '
+                            f'occluder_position={occluder_show["position"]}'
+                        )
+                        occluder_show = None
 
                     if occluder_show:
                         logger.debug(
@@ -1500,10 +1760,10 @@ def _create_nonagent_occluder_object(
         # first, or it will really mess up the simulation.
         del occluder_object['shows'][-1]['scale']
         # Add the occluder's bounds for each frame of the trial.
-        for _ in range(0, len(trial) + 1):
-            occluder_object['debug']['boundsAtStep'].append(
-                occluder_object['shows'][-1]['boundingBox']
-            )
+        _get_bounds_at_step(occluder_object).append_repeated(
+            occluder_object['shows'][-1]['boundingBox'],
+            len(trial) + 1
+        )
 
         # Add 1 for the EndHabituation action step at the end of the trial.
         step += len(trial) + 1
@@ -1536,8 +1796,10 @@ def _create_helper_hinderer_occluder_object(
                 occluder_object['hides'].append({
                     'stepBegin': step
                 })
-                for _ in range(0, len(trial) + 1):
-                    occluder_object['debug']['boundsAtStep'].append(None)
+                _get_bounds_at_step(occluder_object).append_repeated(
+                    None,
+                    len(trial) + 1
+                )
         else:
             occluder_coords = occluder_json[0]
             occluder_size = occluder_json[1]
@@ -1562,11 +1824,13 @@ def _create_helper_hinderer_occluder_object(
                 occluder_object['structure'] = True
                 occluder_object['kinematic'] = True
                 occluder_object['physics'] = True
-                occluder_object['debug']['boundsAtStep'] = []
+                occluder_object['debug']['boundsAtStep'] = StepTimeline()
 
                 # Set its bounds as None for all the steps before it existed.
-                for _ in range(0, step):
-                    occluder_object['debug']['boundsAtStep'].append(None)
+                _get_bounds_at_step(occluder_object).append_repeated(
+                    None,
+                    step
+                )
 
             # Add any movement to the occluder for the current trial.
             _append_each_show_to_object(
@@ -1640,10 +1904,10 @@ def _create_true_false_belief_occluder_list(
                 del occluder_object['shows'][-1]['scale']
 
             # Add the occluder's bounds for each frame of the trial.
-            for _ in range(0, len(trial)):
-                occluder_object['debug']['boundsAtStep'].append(
-                    occluder_object['shows'][-1]['boundingBox']
-                )
+            _get_bounds_at_step(occluder_object).append_repeated(
+                occluder_object['shows'][-1]['boundingBox'],
+                len(trial)
+            )
 
         # Add 1 for the EndHabituation action step at the end of the trial.
         step += len(trial) + 1
@@ -1686,7 +1950,7 @@ def _create_paddle_object(
     # Remove the object's first appearance (we will override it later).
     paddle_object['shows'] = []
     paddle_object['hides'] = []
-    paddle_object['debug']['boundsAtStep'] = []
+    paddle_object['debug']['boundsAtStep'] = StepTimeline()
 
     # Move the paddle on each step as needed.
     for trial_index, trial in enumerate(trial_list):
@@ -1703,8 +1967,10 @@ def _create_paddle_object(
             paddle_object['hides'].append({
                 'stepBegin': step
             })
-            for _ in range(len(trial) + 1):
-                paddle_object['debug']['boundsAtStep'].append(None)
+            _get_bounds_at_step(paddle_object).append_repeated(
+                None,
+                len(trial) + 1
+            )
 
     # Set kinematic to avoid awkward shifting due to collision issues.
     paddle_object['kinematic'] = True
@@ -1960,6 +2226,20 @@ def _create_scene(
     return scene
 
 
+def _convert_json_coords_to_positions(
+    json_coords_list: List[Tuple[int, int]],
+    json_size_list: List[Tuple[int, int]],
+    unit_size: Tuple[float, float]
+) -> np.ndarray:
+    """Convert the given JSON coordinates and sizes (of an object on each
+    frame) into an array of its unrounded MCS X/Z positions, all at once."""
+    json_coords = np.array(json_coords_list, dtype=float).reshape((-1, 2))
+    json_size = np.array(json_size_list, dtype=float).reshape((-1, 2))
+    return np.array([GRID_MIN_X, GRID_MIN_Z]) + (
+        (json_coords + (json_size / 2)) * np.array(unit_size)
+    )
+
+
 def _create_show(
     begin_frame: int,
     object_type: str,
@@ -1972,17 +2252,42 @@ def _create_show(
 ) -> Dict[str, Any]:
     """Create and return an MCS object's 'shows' element using the given
     data."""
+    return _create_show_at_position(
+        begin_frame,
+        object_type,
+        object_height,
+        object_size,
+        (
+            GRID_MIN_X + (
+                (json_coords[0] + (json_size[0] / 2)) * unit_size[0]
+            ),
+            GRID_MIN_Z + (
+                (json_coords[1] + (json_size[1] / 2)) * unit_size[1]
+            )
+        ),
+        rotation_y
+    )
+
+
+def _create_show_at_position(
+    begin_frame: int,
+    object_type: str,
+    object_height: Tuple[float, float],
+    object_size: Tuple[float, float],
+    position_xz: Tuple[float, float],
+    rotation_y: int = 0,
+    bounding_box: TrueObjectBounds = None
+) -> Dict[str, Any]:
+    """Create and return an MCS object's 'shows' element at the given
+    (unrounded) X/Z position, using the given bounding box if it was already
+    made for the same position, rotation, and size."""
     dimensions = OBJECT_DIMENSIONS[object_type]
     mcs_show = {
         'stepBegin': begin_frame,
         'position': {
-            'x': round(GRID_MIN_X + (
-                (json_coords[0] + (json_size[0] / 2)) * unit_size[0]
-            ), 4),
+            'x': round(position_xz[0], 4),
             'y': round(object_height[0], 4),
-            'z': round(GRID_MIN_Z + (
-                (json_coords[1] + (json_size[1] / 2)) * unit_size[1]
-            ), 4)
+            'z': round(position_xz[1], 4)
         },
         'rotation': {'x': 0, 'y': rotation_y, 'z': 0},
         'scale': {
@@ -1991,7 +2296,7 @@ def _create_show(
             'z': round(object_size[1], 4)
         }
     }
-    mcs_show['boundingBox'] = _make_true_bounds(
+    mcs_show['boundingBox'] = bounding_box or _make_true_bounds(
         object_type=object_type,
         dimensions=dimensions.get_dict(mcs_show['scale']),
         offset={'x': 0, 'y': 0, 'z': 0},
@@ -2028,8 +2333,10 @@ def _create_static_wall_object_list(
                         'stepBegin': step
                     }]
                 # Add the wall's bounds for each frame of the trial.
-                for _ in range(0, len(trial) + 1):
-                    wall_object['debug']['boundsAtStep'].append(None)
+                _get_bounds_at_step(wall_object).append_repeated(
+                    None,
+                    len(trial) + 1
+                )
 
             for json_wall in json_wall_list:
                 json_coords = json_wall[0]
@@ -2060,21 +2367,20 @@ def _create_static_wall_object_list(
                 # Adjust the show step to sync with the trial step.
                 wall_object['shows'][0]['stepBegin'] = step
                 # Add the wall's bounds for each frame before the trial.
-                for _ in range(0, step):
-                    wall_object['debug']['boundsAtStep'].append(None)
+                _get_bounds_at_step(wall_object).append_repeated(None, step)
                 # Add the wall's bounds for each frame of the trial.
-                for _ in range(0, len(trial) + 1):
-                    wall_object['debug']['boundsAtStep'].append(
-                        wall_object['shows'][-1]['boundingBox']
-                    )
+                _get_bounds_at_step(wall_object).append_repeated(
+                    wall_object['shows'][-1]['boundingBox'],
+                    len(trial) + 1
+                )
                 static_wall_object_list.append(wall_object)
         else:
             for wall_object in static_wall_object_list:
                 # Add the wall's bounds for each frame of the trial.
-                for _ in range(0, len(trial) + 1):
-                    wall_object['debug']['boundsAtStep'].append(
-                        wall_object['shows'][-1]['boundingBox']
-                    )
+                _get_bounds_at_step(wall_object).append_repeated(
+                    wall_object['shows'][-1]['boundingBox'],
+                    len(trial) + 1
+                )
 
         # Add 1 for the EndHabituation action step at the end of the trial.
         step += len(trial) + 1
@@ -2341,13 +2647,13 @@ def _create_wall_object_list(
             rotation=wall_object['shows'][0]['rotation'],
             standing_y=(wall_object['shows'][0]['scale']['y'] / 2.0)
         )
-        wall_object['debug']['boundsAtStep'] = []
+        wall_object['debug']['boundsAtStep'] = StepTimeline()
         for trial in trial_list:
             # Add the wall's bounds for each frame of the trial.
-            for _ in range(0, len(trial) + 1):
-                wall_object['debug']['boundsAtStep'].append(
-                    wall_object['shows'][-1]['boundingBox']
-                )
+            _get_bounds_at_step(wall_object).append_repeated(
+                wall_object['shows'][-1]['boundingBox'],
+                len(trial) + 1
+            )
         static_wall_list.append(wall_object)
     return static_wall_list + fuse_wall_list
 
@@ -2512,6 +2818,16 @@ def _fix_key_triangle_rotation(
     return key_object
 
 
+def _get_bounds_at_step(mcs_object: SceneObject) -> StepTimeline:
+    """Return the given object's "boundsAtStep" timeline, first converting it
+    from a list if needed."""
+    bounds_at_step = mcs_object['debug'].get('boundsAtStep')
+    if not isinstance(bounds_at_step, StepTimeline):
+        bounds_at_step = StepTimeline(bounds_at_step or [])
+        mcs_object['debug']['boundsAtStep'] = bounds_at_step
+    return bounds_at_step
+
+
 def _identify_trial_index_starting_step(
     index: int,
     trial_list: List[List[Dict[str, Any]]]
@@ -3,6 +3,7 @@ import logging
 import random
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 from machine_common_sense.config_manager import Goal, PerformerStart, Vector3d
 
 from generator import (
@@ -999,87 +1000,77 @@ class InteractiveHypercube(Hypercube):
             sideways_definition.sideways = None
             target_definition_list.append(sideways_definition)
 
-        # Get the groups from the dataset so we can randomize them correctly.
-        definition_groups = definition_dataset.groups()
-        group_indexes = list(range(len(definition_groups)))
-        inner_indexes = [
-            list(range(len(definition_selections)))
-            for definition_selections in definition_groups
-        ]
+        # If needed, find an enclosable container that can hold both the
+        # target and the confusor together.
+        if target_data.containerize_with(confusor_data):
+            def find_mask(area_dimensions, target_definition):
+                return containers.find_enclosable_both_mask(
+                    area_dimensions,
+                    target_definition,
+                    confusor_definition
+                )
 
-        while any([len(indexes) for indexes in inner_indexes]):
-            # Choose a random group, then choose a random list in that group.
-            group_index = random.choice(group_indexes)
-            inner_index = random.choice(inner_indexes[group_index])
-            # Remove the chosen inner index from its list.
-            inner_indexes[group_index] = [
-                i for i in inner_indexes[group_index] if i != inner_index
-            ]
-            # If there are no more defs available for a group, remove it.
-            if not len(inner_indexes[group_index]):
-                group_indexes = [i for i in group_indexes if i != group_index]
-            # Choose a random material for the chosen definition.
-            definition = random.choice(
-                definition_groups[group_index][inner_index]
+            def find_containment(definition, target_definition):
+                return containers.can_contain_both(
+                    definition,
+                    target_definition,
+                    confusor_definition
+                )
+
+        # Else, find an enclosable container that can hold either the
+        # target or confusor individually.
+        else:
+            confusor_definition_or_none = (
+                confusor_definition if confusor_data and
+                confusor_data.is_inside() else None
             )
 
-            # If needed, find an enclosable container that can hold both the
-            # target and the confusor together.
-            if target_data.containerize_with(confusor_data):
-                for target_definition in target_definition_list:
-                    valid_containment = containers.can_contain_both(
-                        definition,
-                        target_definition,
-                        confusor_definition
-                    )
-                    if valid_containment and not find_invalid_container:
-                        target_data.trained_definition = target_definition
-                        container_definition = definition
-                        area_index, angles, orientation = valid_containment
-                        target_angle = angles[0]
-                        confusor_angle = angles[1]
-                        break
-                    elif not valid_containment and find_invalid_container:
-                        target_data.trained_definition = target_definition
-                        container_definition = definition
-                        break
+            if not target_data.is_inside():
+                target_definition_list = [None]
 
-            # Else, find an enclosable container that can hold either the
-            # target or confusor individually.
-            else:
-                confusor_definition_or_none = (
-                    confusor_definition if confusor_data and
-                    confusor_data.is_inside() else None
+            def find_mask(area_dimensions, target_definition):
+                return containers.find_enclosable_mask(
+                    area_dimensions,
+                    target_definition,
+                    confusor_definition_or_none
                 )
 
-                if not target_data.is_inside():
-                    target_definition_list = [None]
+            def find_containment(definition, target_definition):
+                return containers.can_contain(
+                    definition,
+                    target_definition,
+                    confusor_definition_or_none
+                )
 
-                for target_definition in target_definition_list:
-                    valid_containment = containers.can_contain(
-                        definition,
-                        target_definition,
-                        confusor_definition_or_none
-                    )
-                    if valid_containment and not find_invalid_container:
-                        if target_definition:
-                            target_data.trained_definition = (
-                                target_definition
-                            )
-                        container_definition = definition
-                        area_index, angles = valid_containment
-                        target_angle = angles[0]
-                        confusor_angle = angles[1]
-                        break
-                    elif not valid_containment and find_invalid_container:
-                        if target_definition:
-                            target_data.trained_definition = (
-                                target_definition
-                            )
-                        container_definition = definition
-                        break
+        # Filter the dataset on the enclosed areas of all its containers at
+        # once, then choose a random group, list, and material from only the
+        # valid (or invalid) containers.
+        valid_dataset = definition_dataset.filter_on_enclosed_areas(
+            lambda area_dimensions: np.any([
+                find_mask(area_dimensions, target_definition) != (
+                    find_invalid_container
+                ) for target_definition in target_definition_list
+            ], axis=0)
+        )
 
-            if container_definition:
+        if valid_dataset.size():
+            definition = valid_dataset.choose_random_definition()
+            for target_definition in target_definition_list:
+                valid_containment = find_containment(
+                    definition,
+                    target_definition
+                )
+                if bool(valid_containment) == find_invalid_container:
+                    continue
+                if target_definition:
+                    target_data.trained_definition = target_definition
+                container_definition = definition
+                if valid_containment:
+                    area_index, angles = valid_containment[:2]
+                    if len(valid_containment) > 2:
+                        orientation = valid_containment[2]
+                    target_angle = angles[0]
+                    confusor_angle = angles[1]
                 break
 
         if not container_definition:
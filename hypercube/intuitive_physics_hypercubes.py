@@ -1,9 +1,13 @@
 import copy
+import gc
 import itertools
 import json
 import logging
 import math
+import os
+import pickle
 import random
+import tempfile
 import uuid
 from abc import ABC, abstractmethod
 from types import SimpleNamespace
@@ -112,18 +116,19 @@ ROUND_TYPES = ['ball', 'sphere'] + mechanisms.CYLINDRICAL_SHAPES.copy()
 
 MOVEMENT_JSON_FILENAME = 'movements.json'
 
+# The compiled movement data is saved next to (and loaded instead of) its JSON
+# file, as long as the JSON file is unchanged.
+MOVEMENT_CACHE_FILENAME = 'movements.pickle'
 
-def load_movement_from_json_file():
-    """Load all of the movement data from its JSON file."""
-    data = None
-    with open(MOVEMENT_JSON_FILENAME) as movement_file:
-        data = json.load(movement_file)
-    if data is None:
-        raise SceneException(
-            f'Cannot load passive intuitive physics movement data from '
-            f'{MOVEMENT_JSON_FILENAME}')
-    # Convert the position and step keys in each option list to numbers.
-    for option_list_property in ['exitOnlyOptionList', 'exitStopOptionList']:
+# The option lists in each move-exit movement, which are never needed once a
+# specific movement is chosen.
+MOVEMENT_OPTION_LIST_PROPERTIES = ['exitOnlyOptionList', 'exitStopOptionList']
+
+
+def _compile_movement_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the position and step keys in each option list in the given
+    movement JSON data to numbers, and return the data."""
+    for option_list_property in MOVEMENT_OPTION_LIST_PROPERTIES:
         for movement in data['moveExit']:
             old_position_dict = movement[option_list_property]
             new_position_dict = {}
@@ -137,6 +142,49 @@ def load_movement_from_json_file():
                 new_position_dict[float_position] = new_step_dict
 
             movement[option_list_property] = new_position_dict
+    return data
+
+
+def load_movement_from_json_file():
+    """Load all of the movement data from its JSON file, or from its compiled
+    cache file if the JSON file has not changed since the cache was saved."""
+    json_stat = os.stat(MOVEMENT_JSON_FILENAME)
+    stamp = (json_stat.st_size, json_stat.st_mtime_ns)
+    data = None
+    # Loading is much faster without the garbage collector.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(MOVEMENT_CACHE_FILENAME, 'rb') as cache_file:
+            cache_stamp, cache_data = pickle.load(cache_file)
+        if cache_stamp == stamp:
+            data = cache_data
+    except Exception:
+        # The cache file is missing, incomplete, or otherwise unreadable.
+        pass
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if data is None:
+        with open(MOVEMENT_JSON_FILENAME) as movement_file:
+            data = json.load(movement_file)
+        if data is None:
+            raise SceneException(
+                f'Cannot load passive intuitive physics movement data from '
+                f'{MOVEMENT_JSON_FILENAME}')
+        data = _compile_movement_json(data)
+        try:
+            # Write to a temporary file first, so other processes never read
+            # an incomplete cache file.
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(os.path.abspath(MOVEMENT_CACHE_FILENAME)),
+                delete=False
+            ) as cache_file:
+                pickle.dump((stamp, data), cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_file.name, MOVEMENT_CACHE_FILENAME)
+        except OSError:
+            # The cache is only an optimization, so just skip saving it.
+            pass
     return SimpleNamespace(
         MOVE_EXIT_LIST=data['moveExit'],
         DEEP_EXIT_LIST=data['deepExit'],
@@ -147,7 +195,35 @@ def load_movement_from_json_file():
     )
 
 
-MOVEMENT = load_movement_from_json_file()
+_MOVEMENT = None
+
+
+def get_movement() -> SimpleNamespace:
+    """Return all of the movement data, loading it on first use. The data is
+    shared, so never modify it: use copy_movement to adjust a movement."""
+    # Save the movement data for future use once it's loaded.
+    global _MOVEMENT
+    if not _MOVEMENT:
+        _MOVEMENT = load_movement_from_json_file()
+    return _MOVEMENT
+
+
+def __getattr__(name: str) -> Any:
+    # Load the movement data only if (and when) MOVEMENT is first used, rather
+    # than on import, since most hypercubes never need it.
+    if name == 'MOVEMENT':
+        return get_movement()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def copy_movement(movement: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of the given movement without its option lists, which can
+    be adjusted with adjust_movement_to_position. Its nested lists are shared
+    with the original movement, so replace (rather than modify) them."""
+    return {
+        key: value for key, value in movement.items()
+        if key not in MOVEMENT_OPTION_LIST_PROPERTIES
+    }
 
 
 def adjust_movement_to_position(
@@ -481,11 +557,13 @@ class IntuitivePhysicsHypercube(Hypercube, ABC):
         # Round the Z position because we're using it as a dict key.
         position_z = round(position['z'], 2)
 
+        movement_data = get_movement()
+
         # Randomly try each available move-and-exit-the-screen movement.
-        move_exit_index_list = list(range(len(MOVEMENT.MOVE_EXIT_LIST)))
+        move_exit_index_list = list(range(len(movement_data.MOVE_EXIT_LIST)))
         random.shuffle(move_exit_index_list)
         for index in move_exit_index_list:
-            move_exit = MOVEMENT.MOVE_EXIT_LIST[index]
+            move_exit = movement_data.MOVE_EXIT_LIST[index]
             # If more than one movement is needed, and the Z position isn't in
             # the option list, then this movement won't work, so skip it.
             if (
@@ -514,11 +592,11 @@ class IntuitivePhysicsHypercube(Hypercube, ABC):
 
             # Ensure that both roll-across-linearly-in-depth movements have the
             # same direction as in the original movement.
-            deep_exit = copy.deepcopy(
-                MOVEMENT.DEEP_EXIT_LIST[option['deepExit']]
+            deep_exit = copy_movement(
+                movement_data.DEEP_EXIT_LIST[option['deepExit']]
             ) if self._does_have_deep_move() else None
-            deep_stop = copy.deepcopy(
-                MOVEMENT.DEEP_STOP_LIST[option['deepStop']]
+            deep_stop = copy_movement(
+                movement_data.DEEP_STOP_LIST[option['deepStop']]
             ) if (
                 self._does_have_stop_move() and
                 self._does_have_deep_move()
@@ -554,7 +632,9 @@ class IntuitivePhysicsHypercube(Hypercube, ABC):
             # camera's view. (This should already be done in the
             # generate_movement.py script but check again just in case!)
             toss_stop = adjust_movement_to_position(
-                copy.deepcopy(MOVEMENT.TOSS_STOP_LIST[option['tossStop']]),
+                copy_movement(
+                    movement_data.TOSS_STOP_LIST[option['tossStop']]
+                ),
                 position,
                 left_side
             ) if (
@@ -583,14 +663,10 @@ class IntuitivePhysicsHypercube(Hypercube, ABC):
                     )
                     continue
 
-            # Copy the movement so we can delete and/or adjust its properties.
-            # Do this here, and one-at-a-time, for better runtime performance.
-            move_exit = copy.deepcopy(move_exit)
-
-            # Delete each option list from the copy now for better performance
-            # and easier debugging (we shouldn't need them any more).
-            del move_exit['exitOnlyOptionList']
-            del move_exit['exitStopOptionList']
+            # Copy the movement so we can adjust its properties, without each
+            # option list for better performance and easier debugging (we
+            # shouldn't need them any more).
+            move_exit = copy_movement(move_exit)
 
             # Return the occluders' step list, occluders' position list, and
             # each movement with adjusted X and Z distances for the specific
@@ -606,12 +682,16 @@ class IntuitivePhysicsHypercube(Hypercube, ABC):
                 ),
                 'deepExit': deep_exit,
                 'tossExit': adjust_movement_to_position(
-                    copy.deepcopy(MOVEMENT.TOSS_EXIT_LIST[option['tossExit']]),
+                    copy_movement(
+                        movement_data.TOSS_EXIT_LIST[option['tossExit']]
+                    ),
                     position,
                     left_side
                 ) if self._does_have_toss_move() else None,
                 'moveStop': adjust_movement_to_position(
-                    copy.deepcopy(MOVEMENT.MOVE_STOP_LIST[option['moveStop']]),
+                    copy_movement(
+                        movement_data.MOVE_STOP_LIST[option['moveStop']]
+                    ),
                     position,
                     left_side
                 ) if self._does_have_stop_move() else None,
@@ -6,12 +6,28 @@ import logging
 import os
 import os.path
 import random
-from typing import Any, Dict
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from machine_common_sense.logging_config import LoggingConfig
 
 from generator import MAX_TRIES, Scene, SceneException, materials, tags
-from generator.scene_saver import find_next_filename, save_scene_files
+from generator.scene_saver import (
+    SCENE_FILE_FORMATS,
+    SceneArchive,
+    SceneWriter
+)
+
+# The errors that count as a failed attempt to generate a hypercube.
+HYPERCUBE_ERRORS = (
+    SceneException,
+    RuntimeError,
+    TypeError,
+    ValueError,
+    ZeroDivisionError
+)
 
 STARTER_SCENE = Scene(
     version=2,
@@ -25,6 +41,71 @@ STARTER_SCENE = Scene(
 )
 
 
+def _generate_hypercube_scenes(
+    hypercube: Any,
+    stop_on_error: bool,
+    seed: Optional[int] = None
+) -> Tuple[Optional[List[Scene]], List[str]]:
+    """Generate and return the scenes for the given hypercube (or None if it
+    failed on every try), and the traceback of each failed try. Seed the
+    random number generator first if given a seed (in a worker process)."""
+    if seed is not None:
+        random.seed(seed)
+    errors = []
+    for _ in range(MAX_TRIES + 1):
+        try:
+            return hypercube.generate_scenes(), errors
+        except HYPERCUBE_ERRORS as e:
+            if stop_on_error:
+                raise e from e
+            errors.append(traceback.format_exc())
+    return None, errors
+
+
+def _generate_each_hypercube(
+    hypercubes: List[Any],
+    stop_on_error: bool,
+    workers: int = 1
+) -> Iterator[Tuple[Any, Optional[List[Scene]], List[str]]]:
+    """Yield each of the given hypercubes, in order, with its scenes and
+    failures (see _generate_hypercube_scenes). If given more than one worker,
+    generate the next few hypercubes in parallel in that many processes (each
+    hypercube must be independent, like each agent hypercube's pair of JSON
+    files), seeding each from this process's random number generator. Stop
+    generating hypercubes once the caller stops iterating."""
+    if workers <= 1:
+        for hypercube in hypercubes:
+            yield (hypercube, *_generate_hypercube_scenes(
+                hypercube,
+                stop_on_error
+            ))
+        return
+
+    hypercube_iterator = iter(hypercubes)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                # Keep each worker busy, but don't get too far ahead.
+                while len(pending) < workers * 2:
+                    hypercube = next(hypercube_iterator, None)
+                    if hypercube is None:
+                        break
+                    pending.append((hypercube, executor.submit(
+                        _generate_hypercube_scenes,
+                        hypercube,
+                        stop_on_error,
+                        random.getrandbits(32)
+                    )))
+                if not pending:
+                    return
+                hypercube, future = pending.popleft()
+                yield (hypercube, *future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
 class SceneGenerator():
     excluded_materials = []
 
@@ -79,7 +160,10 @@ class SceneGenerator():
         eval_name: str,
         sort_hypercube: bool,
         stop_on_error: bool,
-        role_to_type: Dict[str, str]
+        role_to_type: Dict[str, str],
+        file_format: str = 'json',
+        archive: bool = False,
+        workers: int = 1
     ) -> None:
         logger = logging.getLogger(__name__)
 
@@ -110,68 +194,67 @@ class SceneGenerator():
         hypercube_index = 1
         failed_info = []
         count = 0
-        for index, hypercube in enumerate(hypercubes):
-            # Identify the next available file name index.
-            base_filename, hypercube_index = find_next_filename(
-                f'{prefix}_',
-                hypercube_index,
-                '04',
-                suffix='_01.json'
-            )
-
-            # Create and retrieve all of the scenes from this hypercubes.
-            scenes = None
-            for try_index in range(MAX_TRIES + 1):
-                try:
-                    scenes = hypercube.generate_scenes()
-                    break
-                except (
-                    SceneException,
-                    RuntimeError,
-                    TypeError,
-                    ValueError,
-                    ZeroDivisionError
-                ) as e:
-                    if stop_on_error:
-                        raise e from e
-                    logger.exception(f'Failed to make a {type_name} hypercube')
+        # Write each scene's files in the background while generating the next
+        # scenes; ensure all the files are written before finishing. Append
+        # them to a sharded archive, if requested, rather than separate files.
+        with SceneWriter(
+            archive=SceneArchive(f'{prefix}_') if archive else None
+        ) as writer:
+            for index, (hypercube, scenes, errors) in enumerate(
+                _generate_each_hypercube(hypercubes, stop_on_error, workers)
+            ):
+                # Identify the next available file name index.
+                base_filename, hypercube_index = writer.find_next_filename(
+                    f'{prefix}_',
+                    hypercube_index,
+                    '04',
+                    suffix=f'_01.{file_format}'
+                )
+
+                # Report each failure to create the scenes of this hypercube.
+                for error in errors:
+                    logger.error(
+                        f'Failed to make a {type_name} hypercube\n{error}'
+                    )
                     info = hypercube.get_info()
                     if info and info not in failed_info:
                         failed_info.append(info)
 
-            if not scenes:
-                logger.warn('Skipping hypercube...')
-                continue
-
-            # Randomly shuffle the scenes.
-            if not sort_hypercube:
-                random.shuffle(scenes)
-
-            for scene_index, scene in enumerate(scenes):
-                filename, scene_index = find_next_filename(
-                    f'{base_filename}_',
-                    scene_index + 1,
-                    '02'
+                if not scenes:
+                    logger.warn('Skipping hypercube...')
+                    continue
+
+                # Randomly shuffle the scenes.
+                if not sort_hypercube:
+                    random.shuffle(scenes)
+
+                for scene_index, scene in enumerate(scenes):
+                    filename, scene_index = writer.find_next_filename(
+                        f'{base_filename}_',
+                        scene_index + 1,
+                        '02',
+                        suffix=f'.{file_format}'
+                    )
+
+                    scene.debug['hypercubeNumber'] = hypercube_index
+                    scene.debug['sceneNumber'] = scene_index
+                    scene.debug['evaluation'] = eval_name
+                    scene.debug['training'] = hypercube_factory.training
+
+                    writer.save_scene_files(
+                        scene,
+                        filename,
+                        no_scene_id=bool(eval_name),
+                        file_format=file_format
+                    )
+
+                count += 1
+                logger.info(
+                    f'Saved {type_name} hypercube {count} / {total} '
+                    f'({len(scenes)} scenes): {base_filename}'
                 )
-
-                scene.debug['hypercubeNumber'] = hypercube_index
-                scene.debug['sceneNumber'] = scene_index
-                scene.debug['evaluation'] = eval_name
-                scene.debug['training'] = hypercube_factory.training
-
-                save_scene_files(
-                    scene,
-                    filename,
-                    no_scene_id=bool(eval_name)
-                )
-
-            count += 1
-            logger.info(
-                f'Saved {type_name} hypercube {count} / {total} '
-                f'({len(scenes)} scenes): {base_filename}'
-            )
-            if count == total:
-                break
+                if count == total:
+                    break
 
         logger.info(f'Finished {count} {type_name} hypercubes')
 
@@ -206,6 +289,31 @@ class SceneGenerator():
             type=int,
             default=1,
             help='Number of hypercubes to generate [default=1]')
+        parser.add_argument(
+            '-f',
+            '--format',
+            choices=SCENE_FILE_FORMATS,
+            default='json',
+            help='File format of output scene files; json.gz is '
+            'gzip-compressed JSON [default=json]')
+        parser.add_argument(
+            '--archive',
+            default=False,
+            action='store_true',
+            help='Append the scenes to rolling shard files (named like '
+            '<prefix>_shard_0001.jsonl) with an index file '
+            '(<prefix>_index.jsonl) rather than saving separate files for '
+            'each scene [default=False]')
+        parser.add_argument(
+            '-w',
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes with which to generate hypercubes in '
+            'parallel, like agent hypercubes from many pairs of JSON files. '
+            'Each hypercube is reseeded in its process, so more than one '
+            'worker makes different scenes than one worker, even with the '
+            'same seed [default=1]')
         parser.add_argument(
             '-s',
             '--seed',
@@ -280,6 +388,10 @@ class SceneGenerator():
             help='Specific asymmetric target type (gravity support scenes)')
 
         args = parser.parse_args(argv[1:])
+        if args.archive and args.format != 'json':
+            parser.error('--archive only supports the json --format')
+        if args.workers < 1:
+            parser.error('--workers must be at least 1')
         random.seed(args.seed)
 
         cfg = LoggingConfig.get_configurable_logging_config(
@@ -310,5 +422,8 @@ class SceneGenerator():
             args.eval,
             args.sort_hypercube,
             args.stop_on_error,
-            role_to_type
+            role_to_type,
+            args.format,
+            args.archive,
+            args.workers
         )
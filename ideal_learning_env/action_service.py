@@ -4,7 +4,6 @@ import random
 from dataclasses import dataclass
 from typing import List
 
-import matplotlib.pyplot as plt
 from machine_common_sense.config_manager import Goal, Vector3d
 
 from generator import Scene, geometry
@@ -501,6 +500,8 @@ class ActionService():
                     xs.append(position_x)
                     zs.append(position_z)
             if create_debug_graph:
+                # Import matplotlib only when needed, since it's slow to load.
+                import matplotlib.pyplot as plt
                 plt.gca().set_aspect('equal', adjustable='box')
                 plt.scatter(xs, zs)
                 plt.scatter(
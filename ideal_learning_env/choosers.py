@@ -1,10 +1,9 @@
 import random
-from typing import Any, List, Optional, Tuple, Type
+from typing import Any, List, Optional, Set, Tuple, Type
 
 from machine_common_sense.config_manager import Vector3d
 
 from generator import (
-    MAX_TRIES,
     MaterialTuple,
     base_objects,
     geometry,
@@ -224,20 +223,27 @@ def choose_rotation(rotation: RandomizableFloat) -> Vector3d:
 
 def choose_material_tuple_from_material(
     material_or_category: RandomizableString,
-    prohibited_material: str = None
+    prohibited_material: str = None,
+    valid_materials: Set[str] = None
 ) -> MaterialTuple:
     """Return a MaterialTuple chosen randomly from the given materials that can
-    either be specific materials or names of lists in materials.py."""
+    either be specific materials or names of lists in materials.py. If
+    valid_materials is given, only choose a material in that set."""
     material_or_category_list = return_list(material_or_category)
     # If only one material is set, ignore the excluded and prohibitied colors.
     if len(material_or_category_list) == 1:
-        if isinstance(material_or_category_list[0], MaterialTuple):
-            return material_or_category_list[0]
-        if isinstance(material_or_category_list[0], str) and (
-            not hasattr(materials, material_or_category_list[0])
-        ):
-            mat = material_or_category_list[0]
-            return MaterialTuple(mat, materials.find_colors(mat, []))
+        mat = material_or_category_list[0]
+        if isinstance(mat, str) and not hasattr(materials, mat):
+            mat = MaterialTuple(mat, materials.find_colors(mat, []))
+        if isinstance(mat, MaterialTuple):
+            if valid_materials is not None and (
+                mat.material not in valid_materials
+            ):
+                raise ILEException(
+                    f'Failed to find a valid material because {mat.material} '
+                    f'is not one of {len(valid_materials)} valid materials'
+                )
+            return mat
 
     # Cannot choose a material with an excluded color, or with a color in the
     # prohibited material.
@@ -279,6 +285,22 @@ def choose_material_tuple_from_material(
             f'Failed to find a valid material with prohibited material = '
             f'{prohibited_material} and excluded colors: {excluded_colors}'
         )
+
+    if valid_materials is not None:
+        # Retain only the valid materials, and only the non-empty arrays.
+        unprohibited_material_list = [nested_list for nested_list in [
+            [
+                material_tuple for material_tuple in nested_list
+                if material_tuple.material in valid_materials
+            ] for nested_list in unprohibited_material_list
+        ] if nested_list]
+        if not unprohibited_material_list:
+            raise ILEException(
+                f'Failed to find a valid material in {len(valid_materials)} '
+                f'valid materials with prohibited material = '
+                f'{prohibited_material} and excluded colors: {excluded_colors}'
+            )
+
     return random.choice(random.choice(unprohibited_material_list))
 
 
@@ -345,16 +367,16 @@ def choose_shape_material(
         if shape_list:
             shape = choose_random(shape_list)
         else:
-            for _ in range(MAX_TRIES):
-                shape = choose_random(base_objects.FULL_TYPE_LIST)
-                if shape not in excluded_shapes:
-                    break
-                shape = None
-            if not shape:
+            shapes = [
+                shape for shape in base_objects.FULL_TYPE_LIST
+                if shape not in excluded_shapes
+            ]
+            if not shapes:
                 raise ILEException(
                     f'Failed to find a valid shape with excluded shapes: '
                     f'{excluded_shapes}'
                 )
+            shape = random.choice(shapes)
         material_restriction = base_objects.get_material_restriction_strings(
             shape)
         mat = choose_material_tuple_from_material(
@@ -368,40 +390,28 @@ def choose_shape_material(
             material_or_category,
             prohibited_material
         )
-        for _ in range(MAX_TRIES):
-            shape = base_objects.get_type_from_material(mat[0])
-            if shape not in excluded_shapes:
-                break
-            shape = None
-        if shape is None:
+        shapes = [
+            shape for shape in base_objects.get_valid_types_for_material(
+                mat.material
+            ) if shape not in excluded_shapes
+        ]
+        if not shapes:
             raise ILEException(
                 f'Failed to find a valid shape for material {mat} with '
                 f'excluded shapes: {excluded_shapes}'
             )
-        return (shape, mat)
+        return (random.choice(shapes), mat)
     else:
         # Case 4
         shape = choose_random(shape_list)
-        if base_objects.has_material_restriction(shape):
-            material_restriction = \
-                base_objects.get_material_restriction_strings(shape)
-            if not material_restriction:
-                return (shape, None)
-            # Can we find a way to figure this out without guess and check?
-            # The color option somewhat creates an issue
-            for _ in range(MAX_TRIES):
-                mat = choose_material_tuple_from_material(
-                    material_or_category,
-                    prohibited_material
-                )
-                if mat[0] in material_restriction:
-                    return (shape, mat)
-            raise ILEException(
-                f'Failed to find a valid shape and material combination for '
-                f'shape {shape} and {len(material_restriction)} materials'
-            )
+        material_restriction = base_objects.get_material_restriction_set(
+            shape)
+        if material_restriction is not None and not material_restriction:
+            return (shape, None)
+        # Choose from only the materials that are valid for the shape.
         mat = choose_material_tuple_from_material(
             material_or_category,
-            prohibited_material
+            prohibited_material,
+            material_restriction
         )
         return (shape, mat)
@@ -409,7 +409,8 @@ def validate_floor_position(
     xmax = math.floor(room_dim.x / 2)
     zmax = math.floor(room_dim.z / 2)
     valid = not (x < -xmax or x > xmax or z < -zmax or z > zmax)
-    bb = geometry.generate_floor_area_bounds(x, z)
+    floor_grid = scene.get_floor_grid()
+    bb = floor_grid.find_bounds(x, z)
     # It is expected that some holes/lava will extend beyond the walls, so we
     # extend the room bounds.
     room_dim_extended = Vector3d(
@@ -421,7 +422,8 @@ def validate_floor_position(
         vars(scene.performer_start.position),
         bounds,
         vars(room_dim_extended))
-    valid = valid and floor_pos not in getattr(scene, key, '')
+    flag = geometry.FLOOR_FLAGS.get(key, 0)
+    valid = valid and not floor_grid.has(x, z, flag)
     restricted = restrict_under_user and x == perf_x and z == perf_z
     valid = valid and not restricted
     return valid, bb
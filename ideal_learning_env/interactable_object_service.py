@@ -1044,11 +1044,11 @@ def create_surrounding_lava_positions(scene, instance, lava_size=1,
     z_range = range(min_lava_z, max_lava_z + 1)
     lava_list = []
 
-    # Use copies of the scene and bounds for validation
+    # Use a draft of the scene and a copy of the bounds for validation
     # We're not actually putting the lava in the scene
     # until we determine that the object in the middle
     # is valid and can be placed in the scene
-    scene_copy = copy.deepcopy(scene)
+    scene_copy = scene.create_draft()
     bounds_copy = find_bounds(scene).copy()
     object_to_add = instance['shows'][0]['boundingBox']
     bounds_copy.append(object_to_add)
@@ -7,7 +7,7 @@ import random
 from dataclasses import dataclass
 from enum import Enum
 from itertools import combinations
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import shapely
 from machine_common_sense.config_manager import (
@@ -207,31 +207,36 @@ def _check_for_collisions(
     no valid locations."""
     if not positions and not rotations:
         return []
-    valid_locations = []
     all_positions = retrieve_all_vectors(
         positions or [VectorFloatConfig(0, 0, 0)]
     )
     all_rotations = retrieve_all_vectors(
         rotations or [VectorIntConfig(0, 0, 0)]
     )
+    all_locations = []
+    all_bounds = []
     for position in all_positions:
         position.y = position.y + definition.positionY
         for rotation in all_rotations:
-            bounds = geometry.create_bounds(
+            all_locations.append((position, rotation))
+            all_bounds.append(geometry.create_bounds(
                 vars(definition.dimensions),
                 vars(definition.offset),
                 vars(position),
                 vars(rotation),
                 definition.positionY
-            )
-            if geometry.validate_location_rect(
-                bounds,
-                vars(scene.performer_start.position),
-                bounds_list,
-                vars(scene.room_dimensions)
-            ):
-                valid_locations.append((position, rotation))
-    return valid_locations
+            ))
+    # Check every combination for collisions in a single batch.
+    valid_list = geometry.validate_location_rects(
+        all_bounds,
+        vars(scene.performer_start.position),
+        bounds_list,
+        vars(scene.room_dimensions)
+    )
+    return [
+        location for location, valid in zip(all_locations, valid_list)
+        if valid
+    ]
 
 
 def _retrieve_object_height_at_step(
@@ -286,26 +291,56 @@ def _retrieve_scaled_shapes_from_datasets(
     return output
 
 
-DROPPER_SHAPES_TO_SCALES = _retrieve_scaled_shapes_from_datasets({
-    **specific_objects.ROLLABLE_TYPES_TO_SIZES,
-    **intuitive_physics_objects.FALL_DOWN_TYPES_TO_SIZES,
-    **gravity_support_objects.TYPES_TO_SIZES
-})
-DROPPER_SHAPES = sorted(list(DROPPER_SHAPES_TO_SCALES.keys()))
+# The sizes used as the default scales for each device's projectile or placed
+# object shapes, in order of priority (later sizes override earlier ones).
+_DEVICE_TYPES_TO_SIZES = {
+    'DROPPER': [
+        specific_objects.ROLLABLE_TYPES_TO_SIZES,
+        intuitive_physics_objects.FALL_DOWN_TYPES_TO_SIZES,
+        gravity_support_objects.TYPES_TO_SIZES
+    ],
+    'PLACER': [
+        specific_objects.ROLLABLE_TYPES_TO_SIZES,
+        specific_objects.CONTAINER_TYPES_TO_SIZES,
+        intuitive_physics_objects.FALL_DOWN_TYPES_TO_SIZES,
+        gravity_support_objects.TYPES_TO_SIZES
+    ],
+    'THROWER': [
+        specific_objects.ROLLABLE_TYPES_TO_SIZES,
+        intuitive_physics_objects.MOVE_ACROSS_TYPES_TO_SIZES
+    ]
+}
+
+DROPPER_SHAPES = sorted(set().union(*_DEVICE_TYPES_TO_SIZES['DROPPER']))
+PLACER_SHAPES = sorted(set().union(*_DEVICE_TYPES_TO_SIZES['PLACER']))
+THROWER_SHAPES = sorted(set().union(*_DEVICE_TYPES_TO_SIZES['THROWER']))
+
+_DEVICE_SHAPES_TO_SCALES = {}
+
+
+def _get_shapes_to_scales(
+    device: str
+) -> Dict[str, List[Union[MinMaxFloat, VectorFloatConfig]]]:
+    """Return the dict mapping each projectile or placed object shape of the
+    given device (DROPPER, PLACER, or THROWER) to its default scale options,
+    retrieving them from the datasets only when first needed."""
+    if device not in _DEVICE_SHAPES_TO_SCALES:
+        shapes_to_scales = {}
+        for types_to_sizes in _DEVICE_TYPES_TO_SIZES[device]:
+            shapes_to_scales.update(types_to_sizes)
+        _DEVICE_SHAPES_TO_SCALES[device] = (
+            _retrieve_scaled_shapes_from_datasets(shapes_to_scales)
+        )
+    return _DEVICE_SHAPES_TO_SCALES[device]
 
-PLACER_SHAPES_TO_SCALES = _retrieve_scaled_shapes_from_datasets({
-    **specific_objects.ROLLABLE_TYPES_TO_SIZES,
-    **specific_objects.CONTAINER_TYPES_TO_SIZES,
-    **intuitive_physics_objects.FALL_DOWN_TYPES_TO_SIZES,
-    **gravity_support_objects.TYPES_TO_SIZES
-})
-PLACER_SHAPES = sorted(list(PLACER_SHAPES_TO_SCALES.keys()))
 
-THROWER_SHAPES_TO_SCALES = _retrieve_scaled_shapes_from_datasets({
-    **specific_objects.ROLLABLE_TYPES_TO_SIZES,
-    **intuitive_physics_objects.MOVE_ACROSS_TYPES_TO_SIZES
-})
-THROWER_SHAPES = sorted(list(THROWER_SHAPES_TO_SCALES.keys()))
+def __getattr__(name: str) -> Any:
+    # Retrieve the DROPPER_SHAPES_TO_SCALES, PLACER_SHAPES_TO_SCALES, and
+    # THROWER_SHAPES_TO_SCALES only if (and when) they're first used.
+    device = name[:-len('_SHAPES_TO_SCALES')]
+    if name.endswith('_SHAPES_TO_SCALES') and device in _DEVICE_TYPES_TO_SIZES:
+        return _get_shapes_to_scales(device)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class PassivePhysicsSetup(str, Enum):
@@ -704,7 +739,7 @@ class StructuralDropperCreationService(
                 reconciled,
                 scene,
                 self.bounds or [],
-                DROPPER_SHAPES_TO_SCALES
+                _get_shapes_to_scales('DROPPER')
             )
             projectile_dimensions = vars(self.target.definition.dimensions)
             args = {
@@ -840,7 +875,7 @@ class StructuralThrowerCreationService(
             y=room_dim.y,
             z=room_dim.z + 2
         )
-        scene_copy = copy.deepcopy(scene)
+        scene_copy = scene.create_draft()
         scene_copy.room_dimensions = room_dimensions_extended
         projectile_dimensions = None
 
@@ -858,7 +893,7 @@ class StructuralThrowerCreationService(
                 reconciled,
                 scene_copy,
                 self.bounds or [],
-                THROWER_SHAPES_TO_SCALES
+                _get_shapes_to_scales('THROWER')
             )
             projectile_dimensions = vars(self.target.definition.dimensions)
 
@@ -1110,9 +1145,12 @@ class StructuralThrowerCreationService(
 
     def is_valid(self, scene, new_obj, bounds, try_num, retries):
         # droppers are intentionally embedded in walls.
-        altered_scene: Scene = copy.deepcopy(scene)
-        altered_scene.room_dimensions.x += 2
-        altered_scene.room_dimensions.z += 2
+        altered_scene: Scene = scene.create_draft()
+        altered_scene.room_dimensions = Vector3d(
+            x=scene.room_dimensions.x + 2,
+            y=scene.room_dimensions.y,
+            z=scene.room_dimensions.z + 2
+        )
         # Throwers should ignore the holes and lava directly underneath them.
         bounds = find_bounds(scene, ignore_ground=True)
         return super().is_valid(
@@ -1712,17 +1750,12 @@ class StructuralFloorMaterialsCreationService(
         if not valid:
             return False
 
-        # make sure there is no lava here
-        lava = scene.lava or []
-        pos = Vector2dInt(x=template.position_x, z=template.position_z)
-        if pos in lava:
-            return False
-        for existing in scene.floor_textures:
-            for existing_pos in existing.positions:
-                if (existing_pos.x == template.position_x and
-                        existing_pos.z == template.position_z):
-                    return False
-        return True
+        # make sure there is no lava or other floor texture here
+        return not scene.get_floor_grid().has(
+            x,
+            z,
+            geometry.FLOOR_LAVA | geometry.FLOOR_TEXTURE
+        )
 
     def _on_valid_instances(
             self, scene: Scene, reconciled: FloorMaterialConfig,
@@ -2213,7 +2246,7 @@ class StructuralPlacersCreationService(
             # so throw an error.
             scale = (
                 reconciled.placed_object_scale or
-                PLACER_SHAPES_TO_SCALES[shape]
+                _get_shapes_to_scales('PLACER')[shape]
             )
             # Don't set position or rotation for now; it will be done soon.
             obj_cfg = InteractableObjectConfig(
@@ -4076,6 +4109,8 @@ def _create_contiguous_floor_features(
             f'invalid position: x={starting_x}, z={starting_z}'
         )
 
+    # Use a set of the X/Z coordinates for fast lookups.
+    area_set = {(area_list[0].x, area_list[0].z)}
     for _ in range((size or 1) - 1):
         area = None
         adjacent_options = area_list.copy()
@@ -4089,7 +4124,7 @@ def _create_contiguous_floor_features(
             ]
             random.shuffle(area_options)
             for area_option in area_options:
-                if area_option in area_list:
+                if (area_option.x, area_option.z) in area_set:
                     continue
                 valid, _ = validate_floor_position(
                     scene,
@@ -4109,6 +4144,7 @@ def _create_contiguous_floor_features(
                 f'to : {[(vector.x, vector.z) for vector in area_list]}'
             )
         area_list.append(area)
+        area_set.add((area.x, area.z))
 
     return area_list
 
@@ -1,9 +1,7 @@
 import logging
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Tuple, Union
 
 from extremitypathfinder import PolygonEnvironment
-from extremitypathfinder.plotting import PlottingEnvironment
-from machine_common_sense.config_manager import Vector2dInt
 from shapely.geometry import JOIN_STYLE, mapping
 
 from generator import ObjectBounds, Scene, geometry
@@ -130,8 +128,13 @@ class ValidPathComponent(ILEComponent):
 
         logger.info(f'Running path validation check on {label}...')
 
-        environ = PlottingEnvironment(
-            "./plots/") if self._debug_plot else PolygonEnvironment()
+        if self._debug_plot:
+            # Import the plotting module (and matplotlib) only when needed,
+            # since it's slow to load.
+            from extremitypathfinder.plotting import PlottingEnvironment
+            environ = PlottingEnvironment("./plots/")
+        else:
+            environ = PolygonEnvironment()
 
         blocked_area = []
         if self._delayed_target:
@@ -154,10 +157,18 @@ class ValidPathComponent(ILEComponent):
         # Add each different type
         # coordinates must be clockwise ordering
         self._add_objects_to_blocked(scene, targets, blocked_area)
-        self._add_blocked_areas(scene.lava, blocked_area)
+        floor_grid = scene.get_floor_grid()
+        self._add_blocked_areas(
+            floor_grid.find_cells(geometry.FLOOR_LAVA),
+            blocked_area
+        )
         # Buffer should be 0.5 to be exactly hole, but then path library
         # thinks it can go between holes.
-        self._add_blocked_areas(scene.holes, blocked_area, 0.6)
+        self._add_blocked_areas(
+            floor_grid.find_cells(geometry.FLOOR_HOLE),
+            blocked_area,
+            0.6
+        )
         # validate
 
         logger.trace("Setting pathfinding environment")
@@ -397,16 +408,16 @@ class ValidPathComponent(ILEComponent):
 
     def _add_blocked_areas(
         self,
-        areas: List[Vector2dInt],
+        areas: List[Tuple[int, int]],
         blocked_area: list,
         area_buffer: float = 0.5 + geometry.PERFORMER_HALF_WIDTH
     ) -> None:
-        for area in areas:
+        for x, z in areas:
             blocked_area.append([
-                (area.x - area_buffer, area.z - area_buffer),
-                (area.x - area_buffer, area.z + area_buffer),
-                (area.x + area_buffer, area.z + area_buffer),
-                (area.x + area_buffer, area.z - area_buffer)
+                (x - area_buffer, z - area_buffer),
+                (x - area_buffer, z + area_buffer),
+                (x + area_buffer, z + area_buffer),
+                (x + area_buffer, z - area_buffer)
             ])
 
     def is_object_path_blocking(self, obj, targets):
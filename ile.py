@@ -2,15 +2,24 @@
 
 import argparse
 import logging
+import random
 import sys
-from typing import List, Type
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import yaml
 from machine_common_sense.logging_config import LoggingConfig
 
 from generator import MAX_TRIES, SceneException
 from generator.scene import Scene
-from generator.scene_saver import find_next_filename, save_scene_files
+from generator.scene_saver import (
+    SCENE_FILE_FORMATS,
+    SceneArchive,
+    SceneWriter,
+    find_next_filename,
+    list_existing_filenames,
+    save_scene_files
+)
 from ideal_learning_env import (
     ActionRestrictionsComponent,
     GlobalSettingsComponent,
@@ -51,15 +60,19 @@ ILE_COMPONENTS: List[Type[ILEComponent]] = [
 
 def generate_ile_scene(
     component_list: List[ILEComponent],
-    scene_index: int
+    scene_index: int,
+    scene_seed: int = None
 ) -> Scene:
     """Generate and return an ILE scene using the given ILE components that
-    were initialized with the config data."""
+    were initialized with the config data. If given a seed, it's saved in the
+    scene's debug data so the scene can be regenerated on its own later."""
     # Create a scene template.
     scene = Scene()
     scene.version = 2
     scene.debug['sceneNumber'] = scene_index
     scene.debug['training'] = True
+    if scene_seed is not None:
+        scene.debug['seed'] = scene_seed
 
     ObjectRepository.get_instance().clear()
     # Each component will update the scene template based on the config data.
@@ -129,6 +142,197 @@ def _handle_actions_at_end_of_scene_generation(component_list, scene):
     return scene
 
 
+def _generate_scene_with_retries(
+    component_list: List[ILEComponent],
+    index: int,
+    total: int,
+    scene_filename: str,
+    scene_index: int,
+    scene_seed: int,
+    max_tries: int
+) -> Optional[Scene]:
+    """Try generating the scene multiple times, in case a randomized setup
+    doesn't work the first time. Return the scene, or None if each try
+    failed. The random number generator is seeded with the given seed only
+    once, before the first try, so all the tries are reproducible."""
+    suffix = '.json'
+    random.seed(scene_seed)
+    tries = 0
+    while tries < max_tries:
+        tries += 1
+        try:
+            if (tries > 1):
+                logger.info(
+                    f'Retrying generaton of scene {index + 1} of '
+                    f'{total} (try {tries} / {max_tries}), '
+                    f'filename: {scene_filename}{suffix}'
+                )
+            return generate_ile_scene(
+                component_list,
+                scene_index,
+                scene_seed
+            )
+        except (
+            ILEException,
+            SceneException,
+            RuntimeError,
+            TypeError,
+            ValueError,
+            ZeroDivisionError
+        ):
+            error_message = (
+                f'Failed to generate scene {index + 1} of '
+                f'{total} (try {tries} / {max_tries}), '
+                f'filename: {scene_filename}{suffix}'
+            )
+            if logger.isEnabledFor(logging.DEBUG) or (tries >= max_tries):
+                logging.exception(error_message)
+            else:
+                logger.info(error_message)
+    return None
+
+
+def _find_scene_seed(batch_seed: int, scene_index: int) -> int:
+    """Return the random seed for the scene with the given index, derived
+    from the given batch seed, so each scene is reproducible on its own."""
+    return random.Random(f'{batch_seed}_{scene_index}').getrandbits(32)
+
+
+def _reserve_scene_filenames(
+    prefix: str,
+    total: int,
+    suffix: str = '.json',
+    archive: SceneArchive = None
+) -> List[Tuple[str, int]]:
+    """Find the next available scene filenames and indexes for the given
+    number of scenes. For example, if name_1.json already exists (or is in
+    the given archive), then start with name_2.json. Filenames are reserved
+    in memory, so scenes that are generated out of order (by multiple
+    workers) never share a filename."""
+    reserved = []
+    next_index = 1
+    prefix = f'{prefix}{"_" if prefix else ""}'
+    existing = list_existing_filenames(prefix)
+    if archive:
+        existing.update(archive.filenames)
+    for _ in range(total):
+        scene_filename, scene_index = find_next_filename(
+            prefix,
+            next_index,
+            '06',
+            suffix=suffix,
+            existing=existing
+        )
+        reserved.append((scene_filename, scene_index))
+        next_index = scene_index + 1
+    return reserved
+
+
+# The ILE components for this worker process, initialized only once.
+_worker_component_list: List[ILEComponent] = None
+
+
+def _init_worker(config_data: Dict[str, Any]) -> None:
+    """Initialize a worker process: rebuild the ILE components using the
+    config data, and reset the worker's own object repository."""
+    global logger, _worker_component_list
+    logger = logging.getLogger('ideal_learning_env')
+    ObjectRepository.get_instance().clear()
+    _worker_component_list = [
+        component_class(config_data) for component_class in ILE_COMPONENTS
+    ]
+
+
+def _generate_and_save_scene_in_worker(
+    index: int,
+    total: int,
+    scene_filename: str,
+    scene_index: int,
+    scene_seed: int,
+    max_tries: int,
+    file_format: str,
+    save: bool = True
+) -> Union[bool, Scene]:
+    """Generate and save a single scene in a worker process. Return whether
+    the scene was generated successfully. If save is False, return the scene
+    itself (or False) instead, for the main process to save."""
+    logger.info(
+        f'[+] Generating scene {index + 1} of {total}, '
+        f'filename: {scene_filename}.{file_format}'
+    )
+    scene = _generate_scene_with_retries(
+        _worker_component_list,
+        index,
+        total,
+        scene_filename,
+        scene_index,
+        scene_seed,
+        max_tries
+    )
+    if not scene:
+        return False
+    if not save:
+        return scene
+    save_scene_files(scene, scene_filename, file_format=file_format)
+    logger.info(
+        f'Finished generating scene {index + 1} of {total}, '
+        f'filename: {scene_filename}.{file_format}'
+    )
+    return True
+
+
+def _generate_scenes_in_parallel(
+    args: argparse.Namespace,
+    config_data: Dict[str, Any],
+    reserved: List[Tuple[str, int]],
+    batch_seed: int,
+    max_tries: int,
+    archive: SceneArchive = None
+) -> bool:
+    """Generate and save the scenes with the given reserved filenames across
+    a pool of worker processes. Return whether all scenes were generated
+    successfully. If given an archive, the workers return their scenes to be
+    added to the archive by this process."""
+    logger.info(f'[*] Starting {args.workers} ILE worker processes')
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(config_data,)
+    ) as executor, SceneWriter(archive=archive) as writer:
+        futures = {
+            executor.submit(
+                _generate_and_save_scene_in_worker,
+                index,
+                len(reserved),
+                scene_filename,
+                scene_index,
+                _find_scene_seed(batch_seed, scene_index),
+                max_tries,
+                args.format,
+                save=(archive is None)
+            ): scene_filename
+            for index, (scene_filename, scene_index) in enumerate(reserved)
+        }
+        for future in as_completed(futures):
+            if future.exception():
+                logger.error(
+                    'ILE worker process failed',
+                    exc_info=future.exception()
+                )
+            if future.exception() or not future.result():
+                # Stop immediately, like the single process mode does.
+                for other_future in futures:
+                    other_future.cancel()
+                return False
+            if archive:
+                writer.save_scene_files(
+                    future.result(),
+                    futures[future],
+                    file_format=args.format
+                )
+    return True
+
+
 def main(args):
     """Generate and save one or more MCS JSON scenes using the given config
     for the Interactive Learning Environment (ILE)."""
@@ -141,69 +345,86 @@ def main(args):
         with open(args.config) as config_file:
             config_data = yaml.safe_load(config_file)
 
+    max_tries = 1 if args.throw_error else MAX_TRIES
+    suffix = f'.{args.format}'
+
+    # Each scene is seeded with its own seed, derived from the batch seed and
+    # its scene index, so any single scene can be regenerated later.
+    batch_seed = args.seed if args.seed is not None else random.getrandbits(32)
+    logger.info(f'[*] Using random seed: {batch_seed}')
+
+    # Append the scenes to a sharded archive, if requested, rather than
+    # saving each scene as its own files. The archive is closed along with
+    # the scene writer.
+    archive = SceneArchive(
+        f'{args.prefix}{"_" if args.prefix else ""}'
+    ) if args.archive else None
+
+    if args.replay_index is not None:
+        # Regenerate only the scene with the given index, using its filename.
+        reserved = [(
+            f'{args.prefix}{"_" if args.prefix else ""}'
+            f'{args.replay_index:06}',
+            args.replay_index
+        )]
+    else:
+        reserved = _reserve_scene_filenames(
+            args.prefix,
+            args.number,
+            suffix,
+            archive
+        )
+    total = len(reserved)
+
+    if args.workers > 1 and total > 1:
+        if not _generate_scenes_in_parallel(
+            args,
+            config_data,
+            reserved,
+            batch_seed,
+            max_tries,
+            archive
+        ):
+            sys.exit(1)
+        logger.info(f"[*] Generated {total} scenes successfully!")
+        return
+
     # Initialize each ILE component using the config data.
     component_list = [
         component_class(config_data) for component_class in ILE_COMPONENTS
     ]
 
-    max_tries = 1 if args.throw_error else MAX_TRIES
-    suffix = ".json"
-    for index in list(range(args.number)):
-        scene = None
-        # Find the next available scene filename and index. For example, if
-        # name_1.json already exists, then start with name_2.json.
-        scene_filename, scene_index = find_next_filename(
-            f'{args.prefix}{"_" if args.prefix else ""}',
-            index + 1,
-            '06', suffix=suffix
-        )
+    # Write each scene's files in the background while generating the next.
+    with SceneWriter(archive=archive) as writer:
+        for index, (scene_filename, scene_index) in enumerate(reserved):
+            logger.info(
+                f'[+] Generating scene {index + 1} of {total}, '
+                f'filename: {scene_filename}{suffix}'
+            )
 
-        logger.info(
-            f'[+] Generating scene {index + 1} of {args.number}, '
-            f'filename: {scene_filename}{suffix}'
-        )
+            scene = _generate_scene_with_retries(
+                component_list,
+                index,
+                total,
+                scene_filename,
+                scene_index,
+                _find_scene_seed(batch_seed, scene_index),
+                max_tries
+            )
+            if not scene:
+                sys.exit(1)
 
-        # Try creating the scene multiple times, in case a randomized setup
-        # doesn't work the first time.
-        tries = 0
-        while tries < max_tries:
-            tries += 1
-            try:
-                if (tries > 1):
-                    logger.info(
-                        f'Retrying generaton of scene {index + 1} of '
-                        f'{args.number} (try {tries} / {max_tries}), '
-                        f'filename: {scene_filename}{suffix}'
-                    )
-                scene = generate_ile_scene(component_list, scene_index)
-                break
-            except (
-                ILEException,
-                SceneException,
-                RuntimeError,
-                TypeError,
-                ValueError,
-                ZeroDivisionError
-            ):
-                error_message = (
-                    f'Failed to generate scene {index + 1} of '
-                    f'{args.number} (try {tries} / {max_tries}), '
-                    f'filename: {scene_filename}{suffix}'
-                )
-                if logger.isEnabledFor(logging.DEBUG) or (tries >= max_tries):
-                    logging.exception(error_message)
-                else:
-                    logger.info(error_message)
-                if tries >= max_tries:
-                    sys.exit(1)
-
-        # If successful, save the normal and debug JSON scene files.
-        save_scene_files(scene, scene_filename)
-        logger.info(
-            f'Finished generating scene {index + 1} of {args.number}, '
-            f'filename: {scene_filename}{suffix}'
-        )
-    logger.info(f"[*] Generated {args.number} scenes successfully!")
+            # If successful, save the normal and debug JSON scene files.
+            writer.save_scene_files(
+                scene,
+                scene_filename,
+                file_format=args.format
+            )
+            logger.info(
+                f'Finished generating scene {index + 1} of {total}, '
+                f'filename: {scene_filename}{suffix}'
+            )
+    logger.info(f"[*] Generated {total} scenes successfully!")
 
 
 if __name__ == '__main__':
@@ -247,8 +468,54 @@ if __name__ == '__main__':
         action='store_true',
         help='Stop immediately if errors are thrown [default=False]'
     )
+    parser.add_argument(
+        '-f',
+        '--format',
+        choices=SCENE_FILE_FORMATS,
+        default='json',
+        help='File format of output scene files; json.gz is gzip-compressed '
+        'JSON [default=json]'
+    )
+    parser.add_argument(
+        '--archive',
+        default=False,
+        action='store_true',
+        help='Append the scenes to rolling shard files (named like '
+        '<prefix>_shard_0001.jsonl) with an index file (<prefix>_index.jsonl) '
+        'rather than saving separate files for each scene [default=False]'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes generating scenes in parallel '
+        '[default=1]'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=None,
+        help='Random number seed for the whole batch of scenes; each scene '
+        'is given its own seed derived from this seed [default=None]'
+    )
+    parser.add_argument(
+        '--replay-index',
+        type=int,
+        default=None,
+        help='Regenerate only the scene with this index (the number in its '
+        'filename), using the same --seed as the original batch '
+        '[default=None]'
+    )
 
     args = parser.parse_args()
+    if args.replay_index is not None and args.seed is None:
+        parser.error('--replay-index requires the --seed of the batch')
+    if args.archive and args.format != 'json':
+        parser.error('--archive only supports the json --format')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
 
     if args.log_config == "dev":
         dev = LoggingConfig.get_configurable_logging_config(
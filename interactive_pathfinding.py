@@ -8,6 +8,7 @@ import shapely
 from shapely import affinity
 
 from generator import optimal_path
+from generator.scene_saver import SCENE_FILE_FORMATS, load_scene_file
 
 DEBUG_DIRECTORY = './'
 PERFORMER_AGENT_MAX_REACH = 1
@@ -47,7 +48,7 @@ def find_distance_to(step_metadata, object_metadata):
     return distance
 
 
-def find_path_list(scene_data, debug_plots):
+def find_path_list(scene_data, debug_plots, beam_width=None):
     """Find and return the list of each possible best path."""
     target_dict = find_target_dict(scene_data)
     path_list = optimal_path.find_possible_best_path_list(
@@ -62,7 +63,8 @@ def find_path_list(scene_data, debug_plots):
             # Ignore any object light enough that won't obstruct the performer.
             (object_dict['mass'] > PERFORMER_AGENT_MASS)
         )],
-        (DEBUG_DIRECTORY + scene_data['name']) if debug_plots else None
+        (DEBUG_DIRECTORY + scene_data['name']) if debug_plots else None,
+        beam_width
     )
     for path in path_list:
         if 'locationParent' in target_dict:
@@ -279,8 +281,13 @@ def try_early_pickup(controller, step_metadata, action_list, index):
 
 
 def main(args):
-    # Identify all the _debug.json MCS scene files.
-    filename_list = sorted(glob.glob(args.file_path_prefix + '*_debug.json'))
+    # Identify all the _debug.json (or compressed) MCS scene files.
+    filename_list = sorted(
+        filename for file_format in SCENE_FILE_FORMATS
+        for filename in glob.glob(
+            f'{args.file_path_prefix}*_debug.{file_format}'
+        )
+    )
 
     if len(filename_list) == 0:
         print(f'No files ending in _debug.json with prefix: '
@@ -298,22 +305,27 @@ def main(args):
         print(f'>>>>> {filename}')
         obstructed_path_text_list = []
         reward = None
-        # Load the scene data from its JSON file.
-        scene_data, status = mcs.load_config_json_file(filename)
-        if status is not None:
-            print(status)
+        # Load the scene data from its JSON (or compressed) file.
+        try:
+            scene_data = load_scene_file(filename)
+        except (OSError, ValueError) as e:
+            print(e)
             continue
         # Find each possible best path for the scene.
         path_list = (
-            read_path_file(args.action_file_folder, scene_data.name)
+            read_path_file(args.action_file_folder, scene_data['name'])
             if args.read_existing
-            else find_path_list(scene_data, args.debug_plots)
+            else find_path_list(
+                scene_data,
+                args.debug_plots,
+                args.beam_width
+            )
         )
         if args.debug_actions:
             for i, path in enumerate(path_list):
                 save_shortest_path(
-                    DEBUG_DIRECTORY + scene_data.name + '/',
-                    scene_data.name + '_' + str(i),
+                    DEBUG_DIRECTORY + scene_data['name'] + '/',
+                    scene_data['name'] + '_' + str(i),
                     path.action_list
                 )
         for i, path in enumerate(path_list):
@@ -405,6 +417,12 @@ if __name__ == "__main__":
         default=False,
         action='store_true',
         help='Save the plots of each possible path to image files')
+    parser.add_argument(
+        '--beam-width',
+        default=None,
+        type=int,
+        help='Search for at most this many paths at a time (faster in large '
+        'rooms, but may not find every path)')
     parser.add_argument(
         '-v',
         '--verbose',
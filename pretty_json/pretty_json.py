@@ -56,3 +56,172 @@ class PrettyJsonEncoder(json.JSONEncoder):
                 json_obj_repr)
 
         return json_repr
+
+
+class PrettyJsonStreamEncoder(json.JSONEncoder):
+    """ Encoder with the same output as the PrettyJsonEncoder, but in a single
+    pass over the data, so it works with json.dump to write straight to a
+    file. Each PrettyJsonNoIndent value is encoded (without indentation) when
+    it's reached, rather than replaced within the full output afterward. """
+    FORMAT_SPEC = PrettyJsonEncoder.FORMAT_SPEC
+
+    def __init__(self, **kwargs):
+        # Save copy of any keyword argument values needed for use here.
+        self.__sort_keys = kwargs.get('sort_keys', None)
+        self.__no_indent_values = {}
+        super(PrettyJsonStreamEncoder, self).__init__(**kwargs)
+
+    def default(self, obj):
+        if isinstance(obj, PrettyJsonNoIndent):
+            self.__no_indent_values[id(obj)] = obj
+            return self.FORMAT_SPEC.format(id(obj))
+        return super(PrettyJsonStreamEncoder, self).default(obj)
+
+    def iterencode(self, obj, _one_shot=False):
+        # Always use the pure Python encoder, which yields the marked-up id of
+        # each PrettyJsonNoIndent value (from default) as its own chunk.
+        for chunk in super(PrettyJsonStreamEncoder, self).iterencode(obj):
+            no_indent = None
+            if chunk.startswith('"') and chunk.endswith('"'):
+                match = PrettyJsonEncoder.regex.fullmatch(chunk[1:-1])
+                if match:
+                    no_indent = self.__no_indent_values.get(
+                        int(match.group(1))
+                    )
+            if no_indent is None:
+                yield chunk
+                continue
+            yield from PrettyJsonStreamEncoder(
+                sort_keys=self.__sort_keys,
+                separators=(',', ':')
+            ).iterencode(no_indent.value)
+
+
+def _float_to_json(value):
+    # Same as the float encoding in the json module.
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return 'Infinity'
+    if value == -float('inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+class _PrettyJsonSubsetWriter(object):
+    """ Writes data as pretty JSON to one file and, at the same time, a subset
+    of it (without excluded dict items) to another file. """
+
+    def __init__(self, out, subset_out, exclude, indent):
+        self.out = out
+        self.subset_out = subset_out
+        self.exclude = exclude
+        self.indent = ' ' * indent
+        self.no_indent_encoder = PrettyJsonStreamEncoder(separators=(',', ':'))
+
+    def write(self, text, in_subset):
+        self.out.write(text)
+        if in_subset:
+            self.subset_out.write(text)
+
+    def write_value(self, value, path, level, in_subset):
+        if isinstance(value, str):
+            self.write(json.encoder.encode_basestring_ascii(value), in_subset)
+        elif value is None:
+            self.write('null', in_subset)
+        elif value is True:
+            self.write('true', in_subset)
+        elif value is False:
+            self.write('false', in_subset)
+        elif isinstance(value, int):
+            self.write(int.__repr__(value), in_subset)
+        elif isinstance(value, float):
+            self.write(_float_to_json(value), in_subset)
+        elif isinstance(value, (list, tuple)):
+            self.write_list(value, path, level, in_subset)
+        elif isinstance(value, dict):
+            self.write_dict(value, path, level, in_subset)
+        elif isinstance(value, PrettyJsonNoIndent):
+            self.write(self.no_indent_encoder.encode(value.value), in_subset)
+        else:
+            raise TypeError(
+                f'Object of type {value.__class__.__name__} '
+                f'is not JSON serializable'
+            )
+
+    def write_list(self, data, path, level, in_subset):
+        if not data:
+            self.write('[]', in_subset)
+            return
+        newline_indent = '\n' + self.indent * (level + 1)
+        self.write('[' + newline_indent, in_subset)
+        for index, value in enumerate(data):
+            if index:
+                self.write(',' + newline_indent, in_subset)
+            self.write_value(value, path + (index,), level + 1, in_subset)
+        self.write('\n' + self.indent * level + ']', in_subset)
+
+    def write_dict(self, data, path, level, in_subset):
+        if not data:
+            self.write('{}', in_subset)
+            return
+        newline_indent = '\n' + self.indent * (level + 1)
+        self.write('{', in_subset)
+        count = 0
+        subset_count = 0
+        for key, value in data.items():
+            key = self.encode_key(key)
+            item_path = path + (key,)
+            item_in_subset = in_subset and not self.exclude(item_path)
+            # Dict items are only separated from any previous items.
+            self.out.write((',' if count else '') + newline_indent)
+            if item_in_subset:
+                self.subset_out.write(
+                    (',' if subset_count else '') + newline_indent
+                )
+            self.write(
+                json.encoder.encode_basestring_ascii(key) + ': ',
+                item_in_subset
+            )
+            self.write_value(value, item_path, level + 1, item_in_subset)
+            count += 1
+            subset_count += 1 if item_in_subset else 0
+        self.out.write('\n' + self.indent * level + '}')
+        if in_subset:
+            self.subset_out.write(
+                ('\n' + self.indent * level + '}') if subset_count else '}'
+            )
+
+    def encode_key(self, key):
+        # Same as the dict key conversions in the json module.
+        if isinstance(key, str):
+            return key
+        if isinstance(key, float):
+            return _float_to_json(key)
+        if key is True:
+            return 'true'
+        if key is False:
+            return 'false'
+        if key is None:
+            return 'null'
+        if isinstance(key, int):
+            return int.__repr__(key)
+        raise TypeError(
+            f'keys must be str, int, float, bool or None, '
+            f'not {key.__class__.__name__}'
+        )
+
+
+def dump_with_subset(obj, out, subset_out, exclude, indent=2):
+    """ Write the given data to the given file as pretty JSON, with the same
+    output as json.dump with the PrettyJsonStreamEncoder (without sort_keys),
+    and at the same time write it to the given subset file without each dict
+    item for which the given exclude function returns True. The function is
+    given the item's path: a tuple of the dict keys and list indexes from the
+    top of the data to the item. Each value is only encoded once. """
+    _PrettyJsonSubsetWriter(out, subset_out, exclude, indent).write_value(
+        obj,
+        (),
+        0,
+        True
+    )
@@ -20,6 +20,8 @@ from hypercube.agent_scene_pair_json_converter import (
     ObjectConfig,
     ObjectConfigWithMaterial,
     OccluderMode,
+    StepTimeline,
+    TrueBoundsIndex,
     TrueObjectBounds,
     _append_each_show_to_object,
     _choose_config_list,
@@ -715,6 +717,70 @@ def test_append_each_show_to_object_agent():
     assert result['shows'][3]['boundingBox']
 
 
+def test_append_each_show_to_object_unmoved_frames():
+    mcs_object = {
+        'type': 'cube',
+        'debug': {
+            'boundsAtStep': [],
+            'configHeight': [0.25, 0.5],
+            'configSize': [0.4, 0.4]
+        },
+        'shows': []
+    }
+
+    # Only the frames on which the object moves should have new shows.
+    trial = [{
+        'agent': [[5, 5], 5]
+    }, {
+        'agent': [[5, 5], 5]
+    }, {}, {
+        'agent': [[95, 95], 5]
+    }, {
+        'agent': [[95, 95], 5]
+    }, {
+        'agent': [[5, 5], 5]
+    }]
+    result = _append_each_show_to_object(
+        mcs_object,
+        trial,
+        0,
+        'agent',
+        UNIT_SIZE
+    )
+    assert result == mcs_object
+    assert len(result['debug']['boundsAtStep']) == 7
+    verify_bounds(result, 0, -2.05, -2.45, -2.05, -2.45)
+    verify_bounds(result, 1, -2.05, -2.45, -2.05, -2.45)
+    verify_bounds(result, 2, -2.05, -2.45, -2.05, -2.45)
+    verify_bounds(result, 3, 0.2, -0.2, 0.2, -0.2)
+    verify_bounds(result, 4, 0.2, -0.2, 0.2, -0.2)
+    verify_bounds(result, 5, -2.05, -2.45, -2.05, -2.45)
+    verify_bounds(result, 6, -2.05, -2.45, -2.05, -2.45)
+    assert len(result['shows']) == 3
+    assert result['shows'][0]['stepBegin'] == 0
+    assert result['shows'][0]['position'] == {
+        'x': -2.25, 'y': 0.25, 'z': -2.25
+    }
+    assert result['shows'][1]['stepBegin'] == 3
+    assert result['shows'][1]['position'] == {'x': 0, 'y': 0.25, 'z': 0}
+    assert result['shows'][2]['stepBegin'] == 5
+    assert result['shows'][2]['position'] == {
+        'x': -2.25, 'y': 0.25, 'z': -2.25
+    }
+    for index, step in enumerate([0, 3, 5]):
+        assert result['shows'][index]['boundingBox'] == (
+            _create_show(
+                step,
+                'cube',
+                [0.25, 0.5],
+                [0.4, 0.4],
+                trial[step]['agent'][0],
+                [10, 10],
+                UNIT_SIZE
+            )['boundingBox']
+        )
+
+
 def test_append_each_show_to_object_imitated_agent():
     object_1 = {
         'type': 'cube',
@@ -5573,6 +5639,86 @@ def test_reposition_agents_away_from_paddle_no_paddle():
         assert agent['shows'][i] == original[i]
 
 
+def test_step_timeline():
+    bounds_1 = create_simple_bounds(1, 0, 1, 0)
+    bounds_2 = create_simple_bounds(2, 1, 2, 1)
+    timeline = StepTimeline()
+    timeline.append_repeated(None, 3)
+    timeline.append(bounds_1)
+    timeline.append(bounds_1)
+    timeline.append_repeated(bounds_2, 5)
+    assert len(timeline) == 10
+    assert timeline == [None] * 3 + [bounds_1] * 2 + [bounds_2] * 5
+    assert timeline[2] is None
+    assert timeline[3] is bounds_1
+    assert timeline[-1] is bounds_2
+    assert list(timeline.runs()) == [
+        (0, 3, None),
+        (3, 5, bounds_1),
+        (5, 10, bounds_2)
+    ]
+    with pytest.raises(IndexError):
+        timeline[10]
+
+    # Replace a step in the middle of a run.
+    timeline[7] = bounds_1
+    assert timeline == (
+        [None] * 3 + [bounds_1] * 2 + [bounds_2] * 2 + [bounds_1] +
+        [bounds_2] * 2
+    )
+    assert len(list(timeline.runs())) == 5
+
+    # Replace the same step again to merge the runs.
+    timeline[7] = bounds_2
+    assert len(list(timeline.runs())) == 3
+
+    timeline.insert(0, bounds_2)
+    assert timeline[0] is bounds_2
+    assert timeline[1] is None
+    assert len(timeline) == 11
+    del timeline[0]
+    assert len(list(timeline.runs())) == 3
+
+    # Slices and concatenations are also timelines.
+    assert isinstance(timeline[4:], StepTimeline)
+    assert timeline[4:] == [bounds_1] + [bounds_2] * 5
+    assert isinstance(timeline + [None], StepTimeline)
+    assert timeline + [None] == list(timeline) + [None]
+    assert [None] + timeline == [None] + list(timeline)
+
+
+def test_true_bounds_index():
+    bounds_1 = create_simple_bounds(1, 0, 1, 0)
+    bounds_2 = create_simple_bounds(3, 2, 3, 2)
+    bounds_3 = create_ellipsoidal_bounds(-2, -2, 0.5, 0.5)
+    index = TrueBoundsIndex([
+        StepTimeline([None, bounds_1, bounds_1, bounds_2]),
+        [bounds_3, bounds_3]
+    ])
+    assert index.bounds_list == [bounds_1, bounds_2, bounds_3]
+
+    assert index.overlaps(create_simple_bounds(0.5, -0.5, 0.5, -0.5))
+    assert index.overlaps(create_simple_bounds(2.8, 2.2, 2.8, 2.2))
+    assert index.overlaps(create_simple_bounds(-1.6, -2.4, -1.6, -2.4))
+    # Touching bounds don't overlap.
+    assert not index.overlaps(create_simple_bounds(2, 1, 1, 0))
+    # Bounds near the corner of the circle's envelope don't overlap.
+    assert not index.overlaps(create_simple_bounds(-1.5, -1.6, -1.5, -1.6))
+    assert index.find_nearby(create_simple_bounds(-1.5, -1.6, -1.5, -1.6)) == [
+        bounds_3
+    ]
+    assert not index.overlaps(create_simple_bounds(5, 4, 5, 4))
+    assert index.find_nearby(create_simple_bounds(5, 4, 5, 4)) == []
+
+    views = index.prepare_sight_lines((4, -4))
+    assert views.intersects(
+        create_simple_bounds(3.6, 3.4, -3.4, -3.6).true_poly
+    )
+    assert not views.intersects(
+        create_simple_bounds(-3.4, -3.6, 3.6, 3.4).true_poly
+    )
+
+
 def test_retrieve_unit_size():
     assert _retrieve_unit_size([[{'size': [200, 200]}]]) == UNIT_SIZE
     assert _retrieve_unit_size([[{'size': [100, 400]}]]) == [0.05, 0.0125]
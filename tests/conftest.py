@@ -0,0 +1,10 @@
+import pytest
+
+from generator import definitions
+
+
+@pytest.fixture(autouse=True)
+def disable_dataset_cache(monkeypatch):
+    # Never read or write the real on-disk dataset cache in a unit test, even
+    # if the MCS_DATASET_CACHE_FOLDER environment variable is set.
+    monkeypatch.setattr(definitions, 'DATASET_CACHE_FOLDER', '')
@@ -1,5 +1,6 @@
 import copy
 
+import numpy as np
 import pytest
 from machine_common_sense.config_manager import Vector3d
 
@@ -15,6 +16,8 @@ from generator.containers import (
     can_contain,
     can_contain_both,
     can_enclose,
+    find_enclosable_both_mask,
+    find_enclosable_mask,
     put_object_in_container,
     put_objects_in_container,
     shift_lid_positions_based_on_movement
@@ -194,6 +197,99 @@ def test_can_contain_both():
     assert can_contain_both(container_def, small1, big) is None
 
 
+def test_can_contain_both_second_area():
+    small1 = ObjectDefinition(dimensions=Vector3d(x=0.5, y=0.5, z=0.5))
+    small2 = ObjectDefinition(dimensions=Vector3d(x=0.5, y=0.5, z=0.5))
+    container_def = copy.deepcopy(DEFAULT_CONTAINER)
+    container_def.enclosedAreas = [
+        {'dimensions': {'x': 0.5, 'y': 1, 'z': 0.5}},
+        {'dimensions': {'x': 1, 'y': 1, 'z': 0.5}}
+    ]
+    containment = can_contain_both(container_def, small1, small2)
+    assert containment is not None
+    assert containment[0] == 1
+
+
+def test_find_enclosable_mask():
+    small1 = ObjectDefinition(dimensions=Vector3d(x=0.01, y=0.01, z=0.01))
+    small2 = ObjectDefinition(dimensions=Vector3d(x=0.02, y=0.02, z=0.02))
+    long = ObjectDefinition(dimensions=Vector3d(x=0.1, y=0.01, z=0.9))
+    tall = ObjectDefinition(dimensions=Vector3d(x=0.1, y=2, z=0.1))
+    area_dimensions = np.array([
+        [[1, 1, 1], [np.nan, np.nan, np.nan]],
+        [[0.015, 1, 0.015], [np.nan, np.nan, np.nan]],
+        [[0.015, 1, 0.015], [0.5, 1, 0.5]],
+        [[1, 1, 0.2], [np.nan, np.nan, np.nan]],
+        [[np.nan, np.nan, np.nan], [np.nan, np.nan, np.nan]]
+    ])
+    assert find_enclosable_mask(area_dimensions, small1).tolist() == [
+        True, True, True, True, False
+    ]
+    assert find_enclosable_mask(area_dimensions, small1, small2).tolist() == [
+        True, False, True, True, False
+    ]
+    assert find_enclosable_mask(area_dimensions, long).tolist() == [
+        True, False, False, True, False
+    ]
+    assert find_enclosable_mask(area_dimensions, tall).tolist() == [
+        False, False, False, False, False
+    ]
+    assert find_enclosable_mask(area_dimensions, None).tolist() == [
+        True, True, True, True, False
+    ]
+
+
+def test_find_enclosable_both_mask():
+    small1 = ObjectDefinition(dimensions=Vector3d(x=0.01, y=0.01, z=0.01))
+    small2 = ObjectDefinition(dimensions=Vector3d(x=0.02, y=0.02, z=0.02))
+    long = ObjectDefinition(dimensions=Vector3d(x=0.1, y=0.01, z=0.9))
+    area_dimensions = np.array([
+        [[1, 1, 1], [np.nan, np.nan, np.nan]],
+        [[0.025, 1, 0.025], [0.03, 1, 0.02]],
+        [[0.02, 1, 0.03], [np.nan, np.nan, np.nan]],
+        [[0.025, 1, 0.025], [np.nan, np.nan, np.nan]],
+        [[1, 1, 0.2], [np.nan, np.nan, np.nan]]
+    ])
+    assert find_enclosable_both_mask(
+        area_dimensions,
+        small1,
+        small2
+    ).tolist() == [True, True, True, False, True]
+    assert find_enclosable_both_mask(
+        area_dimensions,
+        small1,
+        long
+    ).tolist() == [True, False, False, False, True]
+
+
+def test_find_enclosable_mask_matches_can_contain():
+    area_dimensions = CONTAINERS._get_columns().enclosed_area_dimensions
+    container_definitions = CONTAINERS.definitions(unshuffled=True)
+    assert len(area_dimensions) == len(container_definitions)
+    for object_a, object_b in [
+        (PICKUPABLE_DEFINITIONS[0], None),
+        (PICKUPABLE_DEFINITIONS[0], PICKUPABLE_DEFINITIONS[-1]),
+        (PICKUPABLE_DEFINITIONS[-1], PICKUPABLE_DEFINITIONS[1])
+    ]:
+        assert find_enclosable_mask(
+            area_dimensions,
+            object_a,
+            object_b
+        ).tolist() == [
+            can_contain(definition, object_a, object_b) is not None
+            for definition in container_definitions
+        ]
+        if object_b:
+            assert find_enclosable_both_mask(
+                area_dimensions,
+                object_a,
+                object_b
+            ).tolist() == [
+                can_contain_both(definition, object_a, object_b) is not None
+                for definition in container_definitions
+            ]
+
+
 def test_containers():
     assert len(CONTAINER_DEFINITIONS) > 0
     for container_definition in CONTAINER_DEFINITIONS:
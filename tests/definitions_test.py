@@ -1,3 +1,8 @@
+import os
+import random
+import subprocess
+import sys
+
 import pytest
 from machine_common_sense.config_manager import Vector3d
 
@@ -12,6 +17,7 @@ from generator import (
 )
 from generator.definitions import (
     create_dataset,
+    do_materials_match,
     finalize_each_definition_choice,
     finalize_object_definition,
     finalize_object_materials_and_colors,
@@ -19,8 +25,8 @@ from generator.definitions import (
 )
 
 
-def create_interesting_dataset():
-    return create_dataset([[
+def create_interesting_definition_list():
+    return [[
         ObjectDefinition(type='a'),
         ObjectDefinition(type='b', chooseMaterialList=[
             MaterialChoice(
@@ -50,7 +56,14 @@ def create_interesting_dataset():
             SizeChoice(dimensions=Vector3d(x=3, y=3, z=3), mass=3),
             SizeChoice(dimensions=Vector3d(x=4, y=4, z=4), mass=4)
         ])
-    ]], unshuffled=True)
+    ]]
+
+
+def create_interesting_dataset():
+    return create_dataset(
+        create_interesting_definition_list(),
+        unshuffled=True
+    )
 
 
 def test_object_definition_arguments():
@@ -139,6 +152,113 @@ def test_create_dataset():
         assert definition.mass == 4
 
 
+def test_create_dataset_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(definitions, 'DATASET_CACHE_FOLDER', '')
+    random.seed(1)
+    expected = create_dataset(create_interesting_definition_list())
+    expected_unshuffled = create_interesting_dataset()
+    assert not os.listdir(tmp_path)
+
+    monkeypatch.setattr(definitions, 'DATASET_CACHE_FOLDER', str(tmp_path))
+    random.seed(1)
+    dataset = create_dataset(create_interesting_definition_list())
+    assert len(os.listdir(tmp_path)) == 1
+    assert dataset._definition_groups == expected._definition_groups
+
+    # Load the same datasets from the cache.
+    random.seed(1)
+    dataset = create_dataset(create_interesting_definition_list())
+    assert len(os.listdir(tmp_path)) == 1
+    assert dataset._definition_groups == expected._definition_groups
+    dataset = create_interesting_dataset()
+    assert dataset._definition_groups == (
+        expected_unshuffled._definition_groups
+    )
+
+    # Changing a definition makes a new cache file.
+    definition_list = create_interesting_definition_list()
+    definition_list[0][0].mass = 2
+    dataset = create_dataset(definition_list, unshuffled=True)
+    assert len(os.listdir(tmp_path)) == 2
+    assert dataset._definition_groups[0][0][0].mass == 2
+
+    # Changing the cache version makes a new cache file.
+    monkeypatch.setattr(definitions, 'DATASET_CACHE_VERSION', -1)
+    create_dataset(create_interesting_definition_list())
+    assert len(os.listdir(tmp_path)) == 3
+
+    # Don't cache a dataset with a randomly chosen size.
+    create_dataset([[ObjectDefinition(type='e', chooseTypeList=[
+        TypeChoice(type='f', chooseSizeList=[
+            SizeChoice(dimensions=Vector3d(x=1, y=1, z=1), mass=1),
+            SizeChoice(dimensions=Vector3d(x=2, y=2, z=2), mass=2)
+        ]),
+        TypeChoice(type='g')
+    ])]])
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def _run_in_new_process(code: str, hash_seed: int, cache_folder: str = ''):
+    # Run the code in a new process, with its own hash seed, and return its
+    # output.
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={
+            **os.environ,
+            'MCS_DATASET_CACHE_FOLDER': cache_folder,
+            'PYTHONHASHSEED': str(hash_seed)
+        },
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.strip()
+
+
+def test_create_dataset_cache_key_in_each_process():
+    code = (
+        'from generator import definitions\n'
+        'from tests.definitions_test import '
+        'create_interesting_definition_list\n'
+        'print(definitions._find_dataset_cache_key([[]]))\n'
+        'print(definitions._find_dataset_cache_key('
+        'create_interesting_definition_list()))\n'
+    )
+    keys = [_run_in_new_process(code, hash_seed) for hash_seed in [1, 2, 3]]
+    assert len(keys[0].splitlines()) == 2
+    assert keys[0] == keys[1] == keys[2]
+
+
+def test_create_dataset_cache_in_each_process(tmp_path):
+    code = (
+        'from generator import definitions\n'
+        'from tests.definitions_test import '
+        'create_interesting_definition_list\n'
+        'definitions.create_dataset(create_interesting_definition_list())\n'
+    )
+    _run_in_new_process(code, 1, str(tmp_path))
+    filenames = os.listdir(tmp_path)
+    assert len(filenames) == 1
+    modified = os.path.getmtime(tmp_path / filenames[0])
+
+    # Another process must load the cache file rather than expand and save
+    # the definitions again.
+    code = (
+        'from generator import definitions\n'
+        'from tests.definitions_test import '
+        'create_interesting_definition_list\n'
+        'def expand(definition_list):\n'
+        '    raise AssertionError("cache miss")\n'
+        'definitions._expand_definition_list = expand\n'
+        'dataset = definitions.create_dataset('
+        'create_interesting_definition_list())\n'
+        'print(dataset.size())\n'
+    )
+    assert _run_in_new_process(code, 2, str(tmp_path)) == '108'
+    assert os.listdir(tmp_path) == filenames
+    assert os.path.getmtime(tmp_path / filenames[0]) == modified
+
+
 def test_create_dataset_definitions_are_immutable():
     dataset = create_interesting_dataset()
     with pytest.raises(AttributeError):
@@ -216,6 +336,122 @@ def test_definition_dataset_filter_on_untrained():
     assert actual_2[0].type == 'f'
 
 
+def test_definition_dataset_filter_on_type():
+    dataset = create_interesting_dataset()
+    assert dataset.size() == 108
+
+    actual_1 = dataset.filter_on_type(must_be=['b', 'd', 'z'])
+    assert actual_1.size() == 105
+    assert [len(group) for group in actual_1._definition_groups] == [2, 4]
+    assert {definition.type for definition in actual_1.definitions()} == {
+        'b', 'd'
+    }
+
+    actual_2 = dataset.filter_on_type(cannot_be=['b', 'd'])
+    assert actual_2.size() == 3
+    assert [len(group) for group in actual_2._definition_groups] == [3]
+    assert [
+        definition.type for definition in actual_2.definitions(unshuffled=True)
+    ] == ['a', 'c', 'c']
+
+    # Filter the filtered dataset.
+    actual_3 = actual_2.filter_on_type(must_be=['c'])
+    assert [
+        definition.dimensions.x
+        for definition in actual_3.definitions(unshuffled=True)
+    ] == [1, 2]
+    assert actual_3.filter_on_type(must_be=['a']).size() == 0
+
+    actual_4 = dataset.filter_on_type()
+    assert actual_4._definition_groups == dataset._definition_groups
+
+
+def test_definition_dataset_filter_on_similar():
+    dataset = create_dataset([[
+        ObjectDefinition(
+            type='apple_1',
+            dimensions=Vector3d(x=1, y=1, z=1),
+            materials=['red']
+        ),
+        ObjectDefinition(
+            type='apple_2',
+            dimensions=Vector3d(x=1.04, y=1, z=1),
+            materials=['green']
+        ),
+        ObjectDefinition(
+            type='ball',
+            dimensions=Vector3d(x=1, y=1, z=1),
+            materials=['red']
+        ),
+        ObjectDefinition(
+            type='apple_1',
+            dimensions=Vector3d(x=2, y=2, z=2),
+            materials=['red']
+        )
+    ]], unshuffled=True)
+    target = ObjectDefinition(
+        type='apple_1',
+        dimensions=Vector3d(x=1, y=1, z=1),
+        materials=['red']
+    )
+
+    actual_1 = dataset.filter_on_similar_except_color(target)
+    assert [
+        definition.type for definition in actual_1.definitions()
+    ] == ['apple_2']
+
+    actual_2 = dataset.filter_on_similar_except_shape(target)
+    assert [definition.type for definition in actual_2.definitions()] == [
+        'ball'
+    ]
+
+    actual_3 = dataset.filter_on_similar_except_size(target)
+    assert [
+        definition.dimensions.x for definition in actual_3.definitions()
+    ] == [2]
+
+
+def test_definition_dataset_columns_materials_match_mask():
+    dataset = create_dataset([[
+        ObjectDefinition(type='a', materials=['m1'], color=['red']),
+        ObjectDefinition(type='b', materials=['m2'], color=['red', 'blue']),
+        ObjectDefinition(type='c', materials=None, color=['blue']),
+        ObjectDefinition(type='d', materials=None, color=None)
+    ]], unshuffled=True)
+    columns = dataset._get_columns()
+    assert columns.color_index == {'red': 0, 'blue': 1}
+    assert columns.material_codes.tolist() == [0, 1, -1, -1]
+    # Materials must match exactly, unless either object has no materials.
+    assert columns.materials_match_mask(['m1'], ['blue']).tolist() == [
+        True, False, True, False
+    ]
+    assert columns.materials_match_mask(['m3'], ['red']).tolist() == [
+        False, False, False, False
+    ]
+    # Otherwise any color must match.
+    assert columns.materials_match_mask([], ['red']).tolist() == [
+        True, True, False, False
+    ]
+    assert columns.materials_match_mask([], ['green']).tolist() == [
+        False, False, False, False
+    ]
+    for target in [
+        ObjectDefinition(type='e', materials=['m1'], color=['blue']),
+        ObjectDefinition(type='e', materials=None, color=['red'])
+    ]:
+        assert columns.materials_match_mask(
+            target.materials or [],
+            target.color or []
+        ).tolist() == [
+            do_materials_match(
+                target.materials or [],
+                definition.materials or [],
+                target.color or [],
+                definition.color or []
+            ) for definition in dataset.definitions(unshuffled=True)
+        ]
+
+
 def test_finalize_each_definition_choice():
     definition = ObjectDefinition(
         type='test_type',
@@ -1,10 +1,16 @@
 import math
 
+import numpy as np
 import pytest
 import shapely
 from machine_common_sense.config_manager import Vector3d
 
-from generator import ObjectBounds, geometry, specific_objects
+from generator import (
+    ObjectBounds,
+    PartitionFloor,
+    geometry,
+    specific_objects
+)
 from generator.base_objects import create_soccer_ball
 from generator.geometry import (
     calculate_rotation_amount,
@@ -12,7 +18,11 @@ from generator.geometry import (
     rotate_point_around_origin
 )
 from generator.instances import instantiate_object
-from generator.separating_axis_theorem import sat_entry
+from generator.separating_axis_theorem import (
+    rects_to_array,
+    sat_entry,
+    sat_matrix
+)
 
 DEFAULT_ROOM_X_MAX = (geometry.DEFAULT_ROOM_DIMENSIONS['x'] / 2.0)
 DEFAULT_ROOM_Z_MAX = (geometry.DEFAULT_ROOM_DIMENSIONS['z'] / 2.0)
@@ -67,6 +77,26 @@ def test_expand_by():
     assert bounds.min_y == 3
 
 
+def test_object_bounds_lazy_polygon():
+    box_xz = [
+        Vector3d(x=1, y=0, z=1), Vector3d(x=1, y=0, z=2),
+        Vector3d(x=2, y=0, z=2), Vector3d(x=2, y=0, z=1)
+    ]
+    bounds = ObjectBounds(box_xz=box_xz, max_y=4, min_y=3)
+    assert bounds._polygon_xz is None
+    assert bounds._box_xz_array is None
+    assert bounds.box_xz_array.tolist() == [[1, 1], [1, 2], [2, 2], [2, 1]]
+    polygon = bounds.polygon_xz
+    assert polygon.bounds == (1, 1, 2, 2)
+    # The polygon is cached...
+    assert bounds.polygon_xz is polygon
+    # ...until the bounds is expanded.
+    bounds.expand_by(1)
+    assert bounds._polygon_xz is None
+    assert bounds.polygon_xz.bounds == (0, 0, 3, 3)
+    assert bounds.box_xz_array.tolist() == [[0, 0], [0, 3], [3, 3], [3, 0]]
+
+
 def test_expand_by_diagonal_fraction():
     box_xz = [
         Vector3d(x=0.2, y=0, z=0.6), Vector3d(x=0.4, y=0, z=0.8),
@@ -142,6 +172,56 @@ def test_rect_intersection():
     assert sat_entry(C, A) is True
 
 
+def test_rect_intersection_matrix():
+    A = [{'x': 0, 'y': 0, 'z': 0}, {'x': 1, 'y': 0, 'z': 0},
+         {'x': 1, 'y': 0, 'z': 1}, {'x': 0, 'y': 0, 'z': 1}]
+    B = [{'x': .25, 'y': 0, 'z': .25}, {'x': .75, 'y': 0, 'z': .25},
+         {'x': .75, 'y': 0, 'z': .75},
+         {'x': .25, 'y': 0, 'z': .75}]
+    C = [{'x': .8, 'y': 0, 'z': 1.2}, {'x': 1.1, 'y': 0, 'z': 1.8},
+         {'x': 2, 'y': 0, 'z': 1.5},
+         {'x': 1.1, 'y': 0, 'z': .3}]
+    D = [Vector3d(x=1, y=0, z=0), Vector3d(x=2, y=0, z=1.5),
+         Vector3d(x=3, y=0, z=0), Vector3d(x=2, y=0, z=-1.5)]
+    rects = rects_to_array([A, B, C, D])
+    assert rects.shape == (4, 4, 2)
+    matrix = sat_matrix(rects[:2], rects)
+    assert matrix.shape == (2, 4)
+    assert matrix.tolist() == [
+        [True, True, True, True],
+        [True, True, False, False]
+    ]
+    for i, rect_a in enumerate([A, B]):
+        for j, rect_b in enumerate([A, B, C, D]):
+            assert matrix[i][j] == sat_entry(rect_a, rect_b)
+    assert sat_matrix(rects, rects_to_array([])).shape == (4, 0)
+
+
+def test_rect_intersection_matrix_degenerate():
+    square = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    # Each rectangle with a repeated corner (zero-length edge) is tested on
+    # the axes of its other edges.
+    triangle_inside = [(0.5, 0.5), (0.5, 0.5), (2, 0.5), (2, 2)]
+    triangle_outside = [(1.5, 0), (1.5, 0), (3, 0), (3, 1)]
+    segment_inside = [(0.5, 0.5), (2, 2), (2, 2), (0.5, 0.5)]
+    segment_outside = [(3, 3), (4, 4), (4, 4), (3, 3)]
+    point_inside = [(0.5, 0.5)] * 4
+    point_outside = [(3, 3)] * 4
+    matrix = sat_matrix(np.array([square]), np.array([
+        triangle_inside,
+        triangle_outside,
+        segment_inside,
+        segment_outside,
+        point_inside,
+        point_outside
+    ], dtype=float))
+    assert matrix.tolist() == [[True, False, True, False, True, False]]
+    assert sat_matrix(
+        np.array([point_inside], dtype=float),
+        np.array([square])
+    ).tolist() == [[True]]
+
+
 def test_is_within_room():
     valid_1 = Vector3d(**{'x': 0, 'y': 0, 'z': 0})
     valid_2 = Vector3d(**{'x': 5, 'y': 0, 'z': 5})
@@ -2907,6 +2987,217 @@ def test_validate_location_rect_not_inside_room():
     )
 
 
+def test_object_bounds_index_find_nearby():
+    lava_bounds = geometry.generate_floor_area_bounds(2, 2)
+    far_bounds = geometry.generate_floor_area_bounds(-3, -3)
+    partition_bounds = ObjectBounds(box_xz=[
+        Vector3d(x=-5, y=0, z=-5), Vector3d(x=-1, y=0, z=-5),
+        Vector3d(x=-1, y=0, z=5), Vector3d(x=-5, y=0, z=5)
+    ], max_y=100, min_y=0)
+    index = geometry.ObjectBoundsIndex([lava_bounds, far_bounds])
+    index.append(partition_bounds)
+    assert index == [lava_bounds, far_bounds, partition_bounds]
+
+    object_bounds = ObjectBounds(box_xz=[
+        Vector3d(x=1, y=0, z=1), Vector3d(x=1, y=0, z=2),
+        Vector3d(x=2, y=0, z=2), Vector3d(x=2, y=0, z=1)
+    ], max_y=1, min_y=0)
+    nearby = index.find_nearby(object_bounds)
+    # Large bounds (like the partition floor) are always nearby.
+    assert len(nearby) == 2
+    assert lava_bounds in nearby
+    assert partition_bounds in nearby
+
+    index.remove(lava_bounds)
+    assert index == [far_bounds, partition_bounds]
+    assert index.find_nearby(object_bounds) == [partition_bounds]
+
+    index_copy = index.copy()
+    assert isinstance(index_copy, geometry.ObjectBoundsIndex)
+    index_copy.append(lava_bounds)
+    assert len(index_copy.find_nearby(object_bounds)) == 2
+    assert index.find_nearby(object_bounds) == [partition_bounds]
+
+
+def test_object_bounds_index_copy_on_write():
+    bounds_1 = geometry.generate_floor_area_bounds(1, 1)
+    bounds_2 = geometry.generate_floor_area_bounds(2, 2)
+    bounds_3 = geometry.generate_floor_area_bounds(3, 3)
+    index = geometry.ObjectBoundsIndex([bounds_1, bounds_2])
+    index_copy = index.copy()
+    assert index_copy.data is index.data
+
+    # Changing the original doesn't change the copy.
+    index.pop(0)
+    assert index == [bounds_2]
+    assert index_copy == [bounds_1, bounds_2]
+    assert index_copy.find_nearby(bounds_1) == [bounds_1]
+    assert index.find_nearby(bounds_1) == []
+
+    # Changing the copy doesn't change the original.
+    index_copy_2 = index.copy()
+    index_copy_2.append(bounds_3)
+    assert index == [bounds_2]
+    assert index_copy_2 == [bounds_2, bounds_3]
+    assert index.find_nearby(bounds_3) == []
+    assert index_copy_2.find_nearby(bounds_3) == [bounds_3]
+
+
+def test_validate_location_rect_with_object_bounds_index():
+    index = geometry.ObjectBoundsIndex([
+        geometry.generate_floor_area_bounds(x, z)
+        for x in range(-4, 5) for z in range(2, 5)
+    ])
+    valid_bounds = ObjectBounds(box_xz=[
+        Vector3d(x=1, y=0, z=0), Vector3d(x=1, y=0, z=1),
+        Vector3d(x=2, y=0, z=1), Vector3d(x=2, y=0, z=0)
+    ], max_y=1, min_y=0)
+    assert geometry.validate_location_rect(
+        valid_bounds,
+        {'x': 0, 'y': 0, 'z': 0},
+        index,
+        geometry.DEFAULT_ROOM_DIMENSIONS
+    )
+    invalid_bounds = ObjectBounds(box_xz=[
+        Vector3d(x=1, y=0, z=1), Vector3d(x=1, y=0, z=2),
+        Vector3d(x=2, y=0, z=2), Vector3d(x=2, y=0, z=1)
+    ], max_y=1, min_y=0)
+    assert not geometry.validate_location_rect(
+        invalid_bounds,
+        {'x': 0, 'y': 0, 'z': 0},
+        index,
+        geometry.DEFAULT_ROOM_DIMENSIONS
+    )
+
+
+def test_validate_location_rects():
+    bounds_list = [
+        geometry.generate_floor_area_bounds(2, 2),
+        ObjectBounds(box_xz=[
+            Vector3d(x=-2, y=0, z=-2), Vector3d(x=-2, y=0, z=-1),
+            Vector3d(x=-1, y=0, z=-1), Vector3d(x=-1, y=0, z=-2)
+        ], max_y=3, min_y=2)
+    ]
+    location_bounds_list = [
+        # Valid
+        ObjectBounds(box_xz=[
+            Vector3d(x=1, y=0, z=-1), Vector3d(x=1, y=0, z=-2),
+            Vector3d(x=2, y=0, z=-2), Vector3d(x=2, y=0, z=-1)
+        ], max_y=1, min_y=0),
+        # Overlaps the floor area
+        ObjectBounds(box_xz=[
+            Vector3d(x=1.5, y=0, z=1.5), Vector3d(x=1.5, y=0, z=2.5),
+            Vector3d(x=2.5, y=0, z=2.5), Vector3d(x=2.5, y=0, z=1.5)
+        ], max_y=1, min_y=0),
+        # Below the other bounds: valid
+        ObjectBounds(box_xz=[
+            Vector3d(x=-2, y=0, z=-2), Vector3d(x=-2, y=0, z=-1),
+            Vector3d(x=-1, y=0, z=-1), Vector3d(x=-1, y=0, z=-2)
+        ], max_y=1, min_y=0),
+        # Outside the room
+        ObjectBounds(box_xz=[
+            Vector3d(x=4, y=0, z=4), Vector3d(x=4, y=0, z=6),
+            Vector3d(x=6, y=0, z=6), Vector3d(x=6, y=0, z=4)
+        ], max_y=1, min_y=0),
+        # Overlaps the performer agent
+        ObjectBounds(box_xz=[
+            Vector3d(x=-0.5, y=0, z=-0.5), Vector3d(x=-0.5, y=0, z=0.5),
+            Vector3d(x=0.5, y=0, z=0.5), Vector3d(x=0.5, y=0, z=-0.5)
+        ], max_y=1, min_y=0)
+    ]
+    expected = [True, False, True, False, False]
+    for bounds in [bounds_list, geometry.ObjectBoundsIndex(bounds_list)]:
+        assert geometry.validate_location_rects(
+            location_bounds_list,
+            {'x': 0, 'y': 0, 'z': 0},
+            bounds,
+            geometry.DEFAULT_ROOM_DIMENSIONS
+        ) == expected
+    assert geometry.validate_location_rects(
+        [],
+        {'x': 0, 'y': 0, 'z': 0},
+        bounds_list,
+        geometry.DEFAULT_ROOM_DIMENSIONS
+    ) == []
+
+
+def test_calc_obj_pos_batches():
+    instance = {'debug': {
+        'dimensions': {'x': 1, 'y': 1, 'z': 1},
+        'offset': {'x': 0, 'y': 0, 'z': 0}
+    }}
+    # A valid location on the first try is the only location chosen.
+    positions = [(-2, -3), (3, 3)]
+    location = geometry.calc_obj_pos(
+        {'x': 0, 'y': 0, 'z': 0},
+        [],
+        instance,
+        rotation_func=lambda: 0,
+        xz_func=lambda room_dimensions: positions.pop(0)
+    )
+    assert location['position'] == {'x': -2, 'y': 0, 'z': -3}
+    assert positions == [(3, 3)]
+
+    # Then each batch doubles in size, up to the batch size.
+    positions = [(0, 0)] * 12 + [(3, 3)] * 8
+    location = geometry.calc_obj_pos(
+        {'x': 0, 'y': 0, 'z': 0},
+        [],
+        instance,
+        rotation_func=lambda: 0,
+        xz_func=lambda room_dimensions: positions.pop(0),
+        batch_size=5
+    )
+    assert location['position'] == {'x': 3, 'y': 0, 'z': 3}
+    # Batches of 1, 2, 4, 5, and 5 locations.
+    assert len(positions) == 3
+
+
+def test_calc_obj_pos_xz_func():
+    instance = {'debug': {
+        'dimensions': {'x': 1, 'y': 1, 'z': 1},
+        'offset': {'x': 0, 'y': 0, 'z': 0}
+    }}
+    for batch_size in [1, 4, geometry.POSITION_BATCH_SIZE]:
+        # The first two positions collide with the performer and the lava.
+        positions = iter([(0, 0), (2, 2), (-2, -3), (3, 3)])
+        bounds_list = [geometry.generate_floor_area_bounds(2, 2)]
+        location = geometry.calc_obj_pos(
+            {'x': 0, 'y': 0, 'z': 0},
+            bounds_list,
+            instance,
+            rotation_func=lambda: 0,
+            xz_func=lambda room_dimensions: next(positions, (None, None)),
+            batch_size=batch_size
+        )
+        assert location['position'] == {'x': -2, 'y': 0, 'z': -3}
+        assert location['rotation'] == {'x': 0, 'y': 0, 'z': 0}
+        assert location['boundingBox'] == geometry.create_bounds(
+            dimensions={'x': 1, 'y': 1, 'z': 1},
+            offset={'x': 0, 'y': 0, 'z': 0},
+            position={'x': -2, 'y': 0, 'z': -3},
+            rotation={'x': 0, 'y': 0, 'z': 0},
+            standing_y=0
+        )
+        assert len(bounds_list) == 2
+        assert bounds_list[1] is location['boundingBox']
+
+
+def test_calc_obj_pos_fails():
+    instance = {'debug': {
+        'dimensions': {'x': 1, 'y': 1, 'z': 1},
+        'offset': {'x': 0, 'y': 0, 'z': 0}
+    }}
+    bounds_list = []
+    assert geometry.calc_obj_pos(
+        {'x': 0, 'y': 0, 'z': 0},
+        bounds_list,
+        instance,
+        xz_func=lambda room_dimensions: (0, 0)
+    ) is None
+    assert bounds_list == []
+
+
 def test_validate_location_rect_overlaps_performer_agent():
     object_bounds = ObjectBounds(box_xz=[
         Vector3d(x=1, y=0, z=1), Vector3d(x=1, y=0, z=2),
@@ -3203,6 +3494,62 @@ def test_generate_floor_area_bounds():
     assert geometry.generate_floor_area_bounds(-3, -3) == bounds_2
 
 
+def test_floor_grid():
+    floor_grid = geometry.FloorGrid(Vector3d(x=10, y=3, z=10))
+    assert not floor_grid.has(1, 2, geometry.FLOOR_HOLE)
+    floor_grid.add(1, 2, geometry.FLOOR_HOLE)
+    floor_grid.add(-3, 4, geometry.FLOOR_LAVA)
+    floor_grid.add(-3, 4, geometry.FLOOR_TEXTURE)
+    assert floor_grid.has(1, 2, geometry.FLOOR_HOLE)
+    assert not floor_grid.has(1, 2, geometry.FLOOR_LAVA)
+    assert floor_grid.has(-3, 4, geometry.FLOOR_LAVA)
+    assert floor_grid.has(
+        -3,
+        4,
+        geometry.FLOOR_HOLE | geometry.FLOOR_TEXTURE
+    )
+    assert not floor_grid.has(2, 1, geometry.FLOOR_HOLE)
+    assert floor_grid.find_cells(geometry.FLOOR_HOLE) == [(1, 2)]
+    assert floor_grid.find_cells(
+        geometry.FLOOR_HOLE | geometry.FLOOR_LAVA
+    ) == [(-3, 4), (1, 2)]
+    floor_grid.clear(geometry.FLOOR_TEXTURE)
+    assert not floor_grid.has(-3, 4, geometry.FLOOR_TEXTURE)
+    assert floor_grid.has(-3, 4, geometry.FLOOR_LAVA)
+
+
+def test_floor_grid_outside_room():
+    floor_grid = geometry.FloorGrid(Vector3d(x=4, y=3, z=4))
+    assert not floor_grid.has(20, -20, geometry.FLOOR_LAVA)
+    floor_grid.add(20, -20, geometry.FLOOR_LAVA)
+    floor_grid.add(1, 1, geometry.FLOOR_HOLE)
+    floor_grid.add(-20, 20, geometry.FLOOR_HOLE)
+    assert floor_grid.has(20, -20, geometry.FLOOR_LAVA)
+    assert floor_grid.find_cells(geometry.FLOOR_HOLE) == [(-20, 20), (1, 1)]
+
+
+def test_floor_grid_add_partition_floor():
+    floor_grid = geometry.FloorGrid(Vector3d(x=10, y=3, z=10))
+    floor_grid.add_partition_floor(
+        Vector3d(x=10, y=3, z=10),
+        PartitionFloor(leftHalf=0.5)
+    )
+    assert floor_grid.find_cells(geometry.FLOOR_PARTITION) == [
+        (x, z) for x in [-5, -4, -3] for z in range(-5, 6)
+    ]
+
+
+def test_floor_grid_find_bounds():
+    floor_grid = geometry.FloorGrid(Vector3d(x=10, y=3, z=10))
+    bounds = floor_grid.find_bounds(1, 1)
+    assert bounds == geometry.generate_floor_area_bounds(1, 1)
+    # The bounds are cached.
+    assert floor_grid.find_bounds(1, 1) is bounds
+    assert floor_grid.find_bounds(-3, -3) == (
+        geometry.generate_floor_area_bounds(-3, -3)
+    )
+
+
 def test_object_x_to_occluder_x():
     result = geometry.object_x_to_occluder_x(0, 2, 1, 0, -4)
     assert result == 0
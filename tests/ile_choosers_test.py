@@ -586,6 +586,40 @@ def test_choose_shape_material_neither_none_invalid():
         choose_shape_material(shape_input, mat_input)
 
 
+def test_choose_shape_material_neither_none_restricted_mixed_categories():
+    shape_input = "sofa_1"
+    mat_input = ["WOOD_MATERIALS", "SOFA_1_MATERIALS", "METAL_MATERIALS"]
+    for _ in range(20):
+        shape, mat = choose_shape_material(shape_input, mat_input)
+        assert shape == "sofa_1"
+        assert mat.material.startswith("AI2-THOR/Materials/Fabrics/Sofa1_")
+
+
+def test_choose_shape_material_neither_none_restricted_invalid_categories():
+    shape_input = "sofa_1"
+    mat_input = ["WOOD_MATERIALS", "METAL_MATERIALS"]
+    with pytest.raises(ILEException):
+        choose_shape_material(shape_input, mat_input)
+
+
+def test_choose_shape_material_with_excluded_shapes():
+    shared_config = ILESharedConfiguration.get_instance()
+    shared_config.set_excluded_shapes([
+        shape for shape in base_objects.FULL_TYPE_LIST if shape != 'sofa_1'
+    ])
+    try:
+        shape, mat = choose_shape_material(None, None)
+        assert shape == 'sofa_1'
+        assert mat.material.startswith("AI2-THOR/Materials/Fabrics/Sofa1_")
+        shape, mat = choose_shape_material(None, "SOFA_1_MATERIALS")
+        assert shape == 'sofa_1'
+        with pytest.raises(ILEException):
+            mat_input = "AI2-THOR/Materials/Fabrics/Sofa2_Grey"
+            choose_shape_material(None, mat_input)
+    finally:
+        shared_config.set_excluded_shapes([])
+
+
 def test_choose_shape_material_both_none_with_prohibited():
     expected_shape = "car_1"
     expected_material = MaterialTuple(
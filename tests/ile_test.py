@@ -1,6 +1,24 @@
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import pytest
+
+from generator import MAX_TRIES, SceneException
+from generator.geometry import ObjectBounds
 from generator.scene import Scene
+from ideal_learning_env import ILEException
 from ideal_learning_env.mock_component import MockComponent
-from ile import generate_ile_scene
+from ile import (
+    ILE_COMPONENTS,
+    _find_scene_seed,
+    _reserve_scene_filenames,
+    generate_ile_scene
+)
 
 
 def test_generate_ile_scene():
@@ -31,3 +49,148 @@ def test_generate_ile_scene_with_mock_components():
         'str_prop': 'foobar'
     }
     )
+
+
+def test_generate_ile_scene_with_seed():
+    scene = generate_ile_scene([], 3, 1234)
+    assert scene == Scene(
+        version=2,
+        debug={
+            'sceneNumber': 3,
+            'training': True,
+            'seed': 1234})
+
+
+def test_reserve_scene_filenames():
+    reserved = _reserve_scene_filenames('', 3)
+    assert reserved == [('000001', 1), ('000002', 2), ('000003', 3)]
+
+
+def test_reserve_scene_filenames_skips_existing_files(tmp_path):
+    (tmp_path / 'scene_000002.json').touch()
+    prefix = str(tmp_path / 'scene')
+    reserved = _reserve_scene_filenames(prefix, 3)
+    assert reserved == [
+        (f'{prefix}_000001', 1),
+        (f'{prefix}_000003', 3),
+        (f'{prefix}_000004', 4)
+    ]
+
+
+def test_find_scene_seed():
+    assert _find_scene_seed(1234, 1) == _find_scene_seed(1234, 1)
+    assert _find_scene_seed(1234, 1) != _find_scene_seed(1234, 2)
+    assert _find_scene_seed(1234, 1) != _find_scene_seed(5678, 1)
+
+
+def _find_import_times(code: str) -> dict:
+    # Run the code in a new process, so each module is imported from scratch.
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            self_time, cumulative_time, module = line[12:].split('|')
+            if self_time.strip().isdigit():
+                import_times[module.strip()] = (
+                    int(self_time), int(cumulative_time)
+                )
+    return import_times
+
+
+def test_startup_imports():
+    # Benchmark the startup of ile.py (see the DEV_README). Modules that are
+    # slow to import, and only used for debugging, must be imported lazily.
+    import_times = _find_import_times('import ile')
+    assert 'ile' in import_times
+    assert 'matplotlib.pyplot' not in import_times
+    # Print the slowest project modules (use "pytest -s" to see them).
+    project_times = sorted([
+        (self_time, cumulative_time, module)
+        for module, (self_time, cumulative_time) in import_times.items()
+        if module.split('.')[0] in ['generator', 'hypercube', 'ile',
+                                    'ideal_learning_env']
+    ], reverse=True)
+    for self_time, cumulative_time, module in project_times[:10]:
+        print(f'{module}: {self_time / 1000:.1f} ms self, '
+              f'{cumulative_time / 1000:.1f} ms cumulative')
+
+
+def test_workers_must_be_positive():
+    result = subprocess.run(
+        [sys.executable, 'ile.py', '--workers', '0'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 2
+    assert '--workers must be at least 1' in result.stderr
+
+
+UUID_PATTERN = '[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+
+@pytest.mark.slow
+def test_object_bounds_lazy_polygon_benchmark(monkeypatch):
+    """Benchmark generating typical ILE scenes (from an empty config) with
+    lazy polygons in ObjectBounds, against also creating each polygon with
+    its bounds (run with -s to see output). Most bounds are only used in
+    collision checks (which use the corners), so most polygons are never
+    created, and the scenes are the same either way."""
+    component_list = [
+        component_class({}) for component_class in ILE_COMPONENTS
+    ]
+    created_bounds = []
+    post_init = ObjectBounds.__post_init__
+
+    def generate_scenes(eager):
+        def mock_post_init(self):
+            post_init(self)
+            if eager:
+                assert self.polygon_xz
+            created_bounds.append(self)
+        monkeypatch.setattr(ObjectBounds, '__post_init__', mock_post_init)
+        created_bounds.clear()
+        scenes = []
+        start = time.perf_counter()
+        for index in range(1, 11):
+            # Retry like ile.py does, in case a random setup doesn't work.
+            random.seed(index)
+            for _ in range(MAX_TRIES):
+                try:
+                    scenes.append(generate_ile_scene(
+                        component_list,
+                        index,
+                        index
+                    ))
+                    break
+                except (ILEException, SceneException):
+                    pass
+        seconds = time.perf_counter() - start
+        polygons = len([
+            bounds for bounds in created_bounds if bounds._polygon_xz
+        ])
+        print(
+            f'{"eager" if eager else "lazy"} polygons: {len(scenes)} scenes, '
+            f'{seconds:.4f} seconds, {len(created_bounds)} bounds, '
+            f'{polygons} polygons'
+        )
+        # Object IDs are random UUIDs, so ignore them in the comparison.
+        return [re.sub(UUID_PATTERN, '', json.dumps(
+            scene.to_dict(),
+            default=str,
+            sort_keys=True
+        )) for scene in scenes], polygons
+
+    # Load the object definitions and the like before timing anything.
+    generate_scenes(False)
+    lazy_scenes, lazy_polygons = generate_scenes(False)
+    eager_scenes, eager_polygons = generate_scenes(True)
+    assert lazy_scenes == eager_scenes
+    assert eager_polygons == len(created_bounds)
+    assert lazy_polygons < eager_polygons
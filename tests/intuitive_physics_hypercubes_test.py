@@ -1,3 +1,4 @@
+import json
 import random
 
 import pytest
@@ -1483,3 +1484,55 @@ def test_SpatioTemporalContinuityHypercubeEval4_scenes_move_across():
             verify_object_tags(scene_dict[j], target_list, 'target', 'target')
             verify_object_tags(scene_dict[j], non_target_list, 'non target',
                                'non_target')
+
+
+def test_load_movement_from_json_file(tmp_path, monkeypatch):
+    json_filename = tmp_path / 'movements.json'
+    cache_filename = tmp_path / 'movements.pickle'
+    monkeypatch.setattr(
+        intuitive_physics_hypercubes,
+        'MOVEMENT_JSON_FILENAME',
+        str(json_filename)
+    )
+    monkeypatch.setattr(
+        intuitive_physics_hypercubes,
+        'MOVEMENT_CACHE_FILENAME',
+        str(cache_filename)
+    )
+    data = {
+        'moveExit': [{
+            'forceX': 300,
+            'xDistanceByStep': [0.1, 0.2],
+            'exitOnlyOptionList': {'1.6': {'10': [{'tossExit': 0}]}},
+            'exitStopOptionList': {}
+        }],
+        'deepExit': [],
+        'tossExit': [{'forceX': 400, 'xDistanceByStep': [0.3]}],
+        'moveStop': [],
+        'deepStop': [],
+        'tossStop': []
+    }
+    json_filename.write_text(json.dumps(data))
+
+    movement = intuitive_physics_hypercubes.load_movement_from_json_file()
+    assert movement.MOVE_EXIT_LIST[0]['exitOnlyOptionList'] == {
+        1.6: {10: [{'tossExit': 0}]}
+    }
+    assert movement.TOSS_EXIT_LIST == data['tossExit']
+    assert cache_filename.exists()
+
+    # Load the same data from the cache file.
+    assert intuitive_physics_hypercubes.load_movement_from_json_file() == (
+        movement
+    )
+
+    # Ignore the cache file once the JSON file changes.
+    data['moveExit'][0]['forceX'] = 3000
+    json_filename.write_text(json.dumps(data))
+    movement = intuitive_physics_hypercubes.load_movement_from_json_file()
+    assert movement.MOVE_EXIT_LIST[0]['forceX'] == 3000
+
+    move_exit = intuitive_physics_hypercubes.copy_movement(
+        movement.MOVE_EXIT_LIST[0]
+    )
+    assert move_exit == {'forceX': 3000, 'xDistanceByStep': [0.1, 0.2]}
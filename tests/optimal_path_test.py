@@ -219,6 +219,46 @@ def test_find_target_or_parent_dict_with_parent():
     assert output == {'id': 'id_4', 'type': 'suitcase'}
 
 
+def test_generate_path_list_bounded():
+    bounds_1 = [
+        {'x': -1.0, 'z': 0.5}, {'x': -1.0, 'z': 1.0}, {'x': 0.5, 'z': 1.0},
+        {'x': 0.5, 'z': 0.5}
+    ]
+    bounds_2 = [
+        {'x': -0.5, 'z': 2.0}, {'x': -0.5, 'z': 2.5}, {'x': 2.0, 'z': 2.5},
+        {'x': 2.0, 'z': 2.0}
+    ]
+    environment = optimal_path._generate_pathfinding_environment(
+        geometry.DEFAULT_ROOM_DIMENSIONS,
+        [bounds_1, bounds_2]
+    )
+    assert environment
+    base_path = optimal_path.ShortestPath([], (0, 0), 90)
+    position_list = optimal_path._generate_shortest_path_position_list(
+        base_path.position,
+        (0, 4.5),
+        environment
+    )
+    path_list = optimal_path._generate_path_list(
+        base_path,
+        position_list[1:],
+        (0, 4.5),
+        environment
+    )
+    bounded_path_list = optimal_path._generate_path_list_bounded(
+        base_path,
+        position_list[1:],
+        (0, 4.5),
+        environment,
+        4
+    )
+    assert 0 < len(bounded_path_list) < len(path_list)
+    # The bounded search still finds a path with the fewest actions.
+    assert min(len(path.action_list) for path in bounded_path_list) == min(
+        len(path.action_list) for path in path_list
+    )
+
+
 def test_remove_duplicate_paths():
     path_1 = optimal_path.ShortestPath([{
         'action': 'MoveAhead',
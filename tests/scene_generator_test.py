@@ -0,0 +1,199 @@
+import logging
+import random
+from concurrent.futures import Future
+
+import pytest
+
+from generator import Scene, SceneException
+from hypercube import scene_generator
+from hypercube.hypercubes import HypercubeFactory
+from hypercube.scene_generator import SceneGenerator, _generate_each_hypercube
+
+
+class MockHypercube():
+    def __init__(self, index, fail_count=0):
+        self.index = index
+        self.fail_count = fail_count
+
+    def generate_scenes(self):
+        if self.fail_count:
+            self.fail_count -= 1
+            raise SceneException(f'mock failure {self.index}')
+        return [Scene(
+            name=f'mock_{self.index}',
+            debug={'random': random.random()}
+        )]
+
+    def get_info(self):
+        return f'mock hypercube {self.index}'
+
+
+class MockHypercubeFactory(HypercubeFactory):
+    def __init__(self, hypercubes):
+        super().__init__('Mock')
+        self.hypercubes = hypercubes
+
+    def _build(self, starter_scene):
+        pass
+
+    def generate_hypercubes(self, total, *args, **kwargs):
+        return self.hypercubes[:total]
+
+
+class MockExecutor():
+    """Finishes the first submitted task immediately and leaves each other
+    task pending (to test cancellation)."""
+    futures = []
+
+    def __init__(self, max_workers):
+        MockExecutor.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        if not MockExecutor.futures:
+            future.set_result(fn(*args))
+        MockExecutor.futures.append(future)
+        return future
+
+
+def run_generator(hypercubes, workers, stop_on_error=False):
+    return [
+        (hypercube.index, scenes, errors)
+        for hypercube, scenes, errors in _generate_each_hypercube(
+            hypercubes,
+            stop_on_error,
+            workers
+        )
+    ]
+
+
+def test_generate_each_hypercube():
+    random.seed(1)
+    results = run_generator([MockHypercube(i) for i in range(5)], 1)
+    assert [index for index, _, _ in results] == list(range(5))
+    assert [scenes[0].name for _, scenes, _ in results] == [
+        f'mock_{i}' for i in range(5)
+    ]
+    assert all(errors == [] for _, _, errors in results)
+
+
+def test_generate_each_hypercube_workers():
+    random.seed(1)
+    results = run_generator([MockHypercube(i) for i in range(7)], 2)
+    assert [index for index, _, _ in results] == list(range(7))
+    assert [scenes[0].name for _, scenes, _ in results] == [
+        f'mock_{i}' for i in range(7)
+    ]
+    assert all(errors == [] for _, _, errors in results)
+
+    # The same seed and number of workers make the same scenes.
+    random.seed(1)
+    assert [
+        scenes[0].debug for _, scenes, _ in results
+    ] == [
+        scenes[0].debug for _, scenes, _ in run_generator(
+            [MockHypercube(i) for i in range(7)],
+            2
+        )
+    ]
+
+
+def test_generate_each_hypercube_workers_errors():
+    results = run_generator([
+        MockHypercube(0),
+        MockHypercube(1, fail_count=2),
+        MockHypercube(2, fail_count=scene_generator.MAX_TRIES + 1)
+    ], 2)
+    assert [index for index, _, _ in results] == [0, 1, 2]
+    assert results[0][1] and results[0][2] == []
+    assert results[1][1] and len(results[1][2]) == 2
+    assert 'mock failure 1' in results[1][2][0]
+    assert results[2][1] is None
+    assert len(results[2][2]) == scene_generator.MAX_TRIES + 1
+
+
+def test_generate_each_hypercube_workers_stop_on_error():
+    with pytest.raises(SceneException, match='mock failure 1'):
+        run_generator(
+            [MockHypercube(0), MockHypercube(1, fail_count=1)],
+            2,
+            stop_on_error=True
+        )
+
+
+def test_generate_each_hypercube_workers_cancel(monkeypatch):
+    monkeypatch.setattr(scene_generator, 'ProcessPoolExecutor', MockExecutor)
+    iterator = _generate_each_hypercube(
+        [MockHypercube(i) for i in range(10)],
+        False,
+        2
+    )
+    hypercube, scenes, errors = next(iterator)
+    assert hypercube.index == 0
+    # Only submit a few hypercubes ahead of those already yielded.
+    assert len(MockExecutor.futures) == 4
+    iterator.close()
+    assert len(MockExecutor.futures) == 4
+    assert not MockExecutor.futures[0].cancelled()
+    assert all(future.cancelled() for future in MockExecutor.futures[1:])
+
+
+def test_scene_generator_generate_scenes_failed_info(tmp_path, caplog):
+    generator = SceneGenerator([MockHypercubeFactory([
+        MockHypercube(0),
+        MockHypercube(1, fail_count=1),
+        MockHypercube(2, fail_count=scene_generator.MAX_TRIES + 1),
+        MockHypercube(3)
+    ])])
+    with caplog.at_level(logging.DEBUG):
+        generator.generate_scenes(
+            str(tmp_path / 'mock'),
+            4,
+            'Mock',
+            None,
+            True,
+            False,
+            {},
+            workers=2
+        )
+    messages = [record.getMessage() for record in caplog.records]
+    assert len([
+        message for message in messages
+        if message.startswith('Failed to make a Mock hypercube')
+    ]) == scene_generator.MAX_TRIES + 2
+    failed_index = messages.index('The following hypercubes failed:')
+    assert messages[failed_index + 1:] == [
+        'mock hypercube 1',
+        'mock hypercube 2'
+    ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'mock_0001_01.json',
+        'mock_0001_01_debug.json',
+        'mock_0002_01.json',
+        'mock_0002_01_debug.json',
+        'mock_0003_01.json',
+        'mock_0003_01_debug.json'
+    ]
+
+
+def test_scene_generator_workers_must_be_positive(capsys):
+    generator = SceneGenerator([MockHypercubeFactory([])])
+    for workers in ['0', '-1']:
+        with pytest.raises(SystemExit) as error:
+            generator.generate_scenes_from_args([
+                'scene_generator.py',
+                '-p',
+                'mock',
+                '-t',
+                'Mock',
+                '--workers',
+                workers
+            ])
+        assert error.value.code == 2
+        assert '--workers must be at least 1' in capsys.readouterr().err
@@ -1,17 +1,33 @@
 import copy
+import gzip
+import json
+import os
+
+import pytest
 
 from machine_common_sense.config_manager import Goal, Vector3d
 
 from generator import ObjectBounds, Scene, SceneObject
 from generator.scene_saver import (
+    SceneArchive,
+    SceneWriter,
     _convert_non_serializable_data,
+    _is_debug_data_path,
+    _ready_scene_for_writing,
     _strip_debug_data,
     _strip_debug_misleading_data,
     _strip_debug_object_data,
     _truncate_floats_in_dict,
     _truncate_floats_in_list,
-    find_next_filename
+    _write_scene_file,
+    find_next_filename,
+    list_existing_filenames,
+    load_archived_scene_file,
+    load_scene_file,
+    read_scene_archive_index,
+    save_scene_files
 )
+from pretty_json import PrettyJsonEncoder, PrettyJsonNoIndent
 
 
 def create_test_object():
@@ -92,6 +108,33 @@ def test_find_next_filename():
     assert index == 2
 
 
+def test_find_next_filename_existing():
+    existing = list_existing_filenames('tests/file')
+    assert 'tests/file2.json' in existing
+    assert 'tests/file1_debug.json' in existing
+
+    filename, index = find_next_filename(
+        'tests/file',
+        2,
+        '01',
+        existing=existing
+    )
+    assert filename == 'tests/file3'
+    assert index == 3
+
+    existing.add('tests/file3.json')
+    filename, index = find_next_filename(
+        'tests/file',
+        2,
+        '01',
+        existing=existing
+    )
+    assert filename == 'tests/file4'
+    assert index == 4
+
+    assert list_existing_filenames('tests/no_such_folder/file') == set()
+
+
 def test_convert_non_serializable_data():
     scene = Scene(objects=[create_test_object()])
     expected_object = create_test_object().data
@@ -110,6 +153,115 @@ def test_convert_non_serializable_data():
     assert scene == Scene(objects=[expected_object])
 
 
+def test_ready_scene_for_writing():
+    scene = Scene(objects=[create_test_object()])
+    scene.objects[0]['debug']['movement'] = {
+        'moveExit': {'xDistanceByStep': [1], 'key': 'value'}
+    }
+    expected_object = copy.deepcopy(scene.objects[0].data)
+    scene_dict = _ready_scene_for_writing(scene)
+    assert scene_dict['objects'][0]['shows'][0]['boundingBox'] == [
+        {'x': 2, 'y': 0, 'z': 3},
+        {'x': 2.5, 'y': 0, 'z': 3},
+        {'x': 2.5, 'y': 0, 'z': 3.5},
+        {'x': 2, 'y': 0, 'z': 3.5},
+        {'x': 2, 'y': 1, 'z': 3},
+        {'x': 2.5, 'y': 1, 'z': 3},
+        {'x': 2.5, 'y': 1, 'z': 3.5},
+        {'x': 2, 'y': 1, 'z': 3.5}
+    ]
+    assert scene_dict['objects'][0]['debug']['movement'] == {
+        'moveExit': {'key': 'value'}
+    }
+    assert 'boundsAtStep' not in scene_dict['objects'][0]['debug']
+    # The original scene is unchanged.
+    assert scene.objects[0].data == expected_object
+
+
+def test_write_scene_file(tmp_path):
+    scene = Scene(objects=[create_test_object(), create_test_object()])
+    scene.objects[0]['debug']['movement'] = {
+        'moveExit': {'xDistanceByStep': [1], 'key': 'value'}
+    }
+    scene_dict = _ready_scene_for_writing(scene)
+    shared = PrettyJsonNoIndent({'a': [1.5, 'b', None, True]})
+    scene_dict['debug'] = {
+        'nested': PrettyJsonNoIndent([PrettyJsonNoIndent({'c': 2}), []]),
+        'shared_1': shared,
+        'shared_2': [shared, {}],
+        'text': '\u00e9'
+    }
+    filename = str(tmp_path / 'scene.json')
+    _write_scene_file(filename, scene_dict)
+    with open(filename) as scene_file:
+        output = scene_file.read()
+    # The output must be identical to that of the original PrettyJsonEncoder.
+    assert output == json.dumps(scene_dict, cls=PrettyJsonEncoder, indent=2)
+    assert json.loads(output)['debug']['shared_2'] == [
+        {'a': [1.5, 'b', None, True]},
+        {}
+    ]
+
+
+def test_save_scene_files(tmp_path):
+    scene = Scene(
+        debug={'key': 'value'},
+        goal=Goal(
+            category='retrieval',
+            answer={'choice': 'plausible'},
+            metadata={'target': {'id': 'thing1', 'info': ['a', 'b']}},
+            scene_info={'id': ['1234']}
+        ),
+        name='scene',
+        objects=[create_test_object(), create_test_object()]
+    )
+    save_scene_files(scene, str(tmp_path / 'scene'))
+    with open(tmp_path / 'scene_1234_debug.json') as scene_file:
+        debug_output = scene_file.read()
+    with open(tmp_path / 'scene.json') as scene_file:
+        output = scene_file.read()
+
+    # The output must be identical to writing each file separately.
+    scene_dict = _ready_scene_for_writing(scene)
+    assert debug_output == json.dumps(
+        scene_dict,
+        cls=PrettyJsonEncoder,
+        indent=2
+    )
+    assert output == json.dumps(
+        _strip_debug_data(scene_dict),
+        cls=PrettyJsonEncoder,
+        indent=2
+    )
+    assert 'debug' not in json.loads(output)
+    assert 'debug' in json.loads(debug_output)
+
+
+def test_save_scene_files_compressed(tmp_path):
+    scene = Scene(
+        goal=Goal(category='retrieval', scene_info={'id': ['1234']}),
+        objects=[create_test_object()]
+    )
+    save_scene_files(scene, str(tmp_path / 'scene'))
+    save_scene_files(scene, str(tmp_path / 'scene'), file_format='json.gz')
+    for filename in ['scene', 'scene_1234_debug']:
+        with gzip.open(tmp_path / f'{filename}.json.gz', 'rt') as scene_file:
+            output = scene_file.read()
+        # The decompressed output is identical to the normal JSON output.
+        with open(tmp_path / f'{filename}.json') as scene_file:
+            assert output == scene_file.read()
+        # Both formats are loaded the same way.
+        assert load_scene_file(str(tmp_path / f'{filename}.json.gz')) == (
+            load_scene_file(str(tmp_path / f'{filename}.json'))
+        )
+    assert load_scene_file(str(tmp_path / 'scene.json'))['objects'][0][
+        'id'
+    ] == 'thing1'
+
+    with pytest.raises(ValueError):
+        save_scene_files(scene, str(tmp_path / 'scene'), file_format='xml')
+
+
 def test_strip_debug_data():
     scene = Scene(
         debug={
@@ -158,6 +310,48 @@ def test_strip_debug_data():
     assert actual == expected
 
 
+def _remove_debug_data_paths(data, path=()):
+    # Remove all the data at each path matched by _is_debug_data_path.
+    if isinstance(data, dict):
+        for key in list(data.keys()):
+            if _is_debug_data_path(path + (key,)):
+                del data[key]
+            else:
+                _remove_debug_data_paths(data[key], path + (key,))
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            _remove_debug_data_paths(item, path + (index,))
+
+
+def test_is_debug_data_path_matches_strip_debug_data():
+    scene = Scene(
+        debug={'floorColors': ['grey']},
+        objects=[create_test_object(), create_test_object()],
+        goal=Goal(
+            answer={'choice': 'plausible'},
+            category='test',
+            domains_info={'domainsTag': True},
+            objects_info={'objectsTag': True},
+            scene_info={'sceneTag': True},
+            metadata={
+                'target': {'id': 'target', 'info': ['a']},
+                'target_1': {'id': 'target_1', 'info': ['b']},
+                'target_2': {'id': 'target_2', 'info': ['c']}
+            }
+        )
+    )
+    _convert_non_serializable_data(scene)
+    expected = _strip_debug_data(copy.deepcopy(scene.to_dict()))
+    actual = copy.deepcopy(scene.to_dict())
+    _remove_debug_data_paths(actual)
+    assert 'debug' not in expected
+    assert 'answer' not in expected['goal']
+    assert actual == expected
+    assert _is_debug_data_path(('objects', 1, 'debug'))
+    assert not _is_debug_data_path(('objects', 'debug'))
+    assert not _is_debug_data_path(('goal', 'metadata', 'target', 'id'))
+
+
 def test_strip_debug_misleading_data():
     obj = create_test_object()
     expected = copy.deepcopy(obj.data)
@@ -304,3 +498,98 @@ def test_truncate_floats_advanced():
         8.8889,
         {'number': 7.7778, 'nested': [6.6667, {'number': 5.5556}]}
     ]
+
+
+def test_scene_writer(tmp_path):
+    scene = Scene(name='scene', objects=[create_test_object()])
+    prefix = str(tmp_path / 'output' / 'scene_')
+    with SceneWriter(max_pending=1) as writer:
+        for _ in range(3):
+            filename, _ = writer.find_next_filename(prefix, 1, '02')
+            writer.save_scene_files(scene, filename)
+        # The scene can be modified after it's given to the writer.
+        scene.objects.clear()
+    for index in [1, 2, 3]:
+        with open(f'{prefix}{index:02}.json') as scene_file:
+            output = scene_file.read()
+        assert output == json.dumps(
+            _strip_debug_data(_ready_scene_for_writing(
+                Scene(name=f'scene_{index:02}', objects=[create_test_object()])
+            )),
+            cls=PrettyJsonEncoder,
+            indent=2
+        )
+        assert os.path.exists(f'{prefix}{index:02}_debug.json')
+    # The scene was not changed by the writer.
+    assert scene.name == 'scene'
+
+
+def test_scene_writer_error(tmp_path):
+    # A file in place of the output folder causes an error on write.
+    (tmp_path / 'output').write_text('')
+    scene = Scene(name='scene')
+    writer = SceneWriter()
+    writer.save_scene_files(scene, str(tmp_path / 'output' / 'scene'))
+    with pytest.raises(OSError):
+        writer.flush()
+    # The error is only raised once.
+    writer.close()
+
+
+def test_scene_archive(tmp_path):
+    scene = Scene(
+        goal=Goal(
+            category='retrieval',
+            metadata={},
+            scene_info={'id': ['1234']}
+        ),
+        objects=[create_test_object()]
+    )
+    save_scene_files(scene, str(tmp_path / 'expected'))
+    prefix = str(tmp_path / 'archive' / 'scene_')
+    # Use a small shard size so each scene file starts a new shard.
+    with SceneWriter(archive=SceneArchive(prefix, 100)) as writer:
+        for _ in range(2):
+            filename, _ = writer.find_next_filename(prefix, 1, '02')
+            writer.save_scene_files(scene, filename)
+    assert sorted(os.listdir(tmp_path / 'archive')) == [
+        'scene_index.jsonl',
+        'scene_shard_0001.jsonl',
+        'scene_shard_0002.jsonl',
+        'scene_shard_0003.jsonl',
+        'scene_shard_0004.jsonl'
+    ]
+
+    entries = read_scene_archive_index(prefix)
+    assert [entry['filename'] for entry in entries] == [
+        f'{prefix}01_1234_debug.json',
+        f'{prefix}01.json',
+        f'{prefix}02_1234_debug.json',
+        f'{prefix}02.json'
+    ]
+    assert [entry['name'] for entry in entries] == [
+        'scene_01', 'scene_01', 'scene_02', 'scene_02'
+    ]
+    assert all(entry['sceneId'] == '1234' for entry in entries)
+    for entry in entries:
+        data = load_archived_scene_file(prefix, entry)
+        expected = load_scene_file(str(tmp_path / (
+            'expected_1234_debug.json'
+            if entry['filename'].endswith('_debug.json') else 'expected.json'
+        )))
+        expected['name'] = entry['name']
+        assert data == expected
+
+    # A new archive with the same prefix appends to the existing archive.
+    archive = SceneArchive(prefix)
+    assert len(archive.filenames) == 4
+    with SceneWriter(archive=archive) as writer:
+        filename, index = writer.find_next_filename(prefix, 1, '02')
+        assert index == 3
+        writer.save_scene_files(scene, filename, no_debug_file=True)
+    entries = read_scene_archive_index(prefix)
+    assert len(entries) == 5
+    assert entries[-1]['shard'] == 'scene_shard_0004.jsonl'
+    assert load_archived_scene_file(prefix, entries[-1])['name'] == (
+        'scene_03'
+    )
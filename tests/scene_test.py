@@ -6,7 +6,11 @@ from machine_common_sense.config_manager import (
 )
 
 from generator import ObjectBounds, SceneObject, geometry
-from generator.scene import Scene, get_step_limit_from_dimensions
+from generator.scene import (
+    PartitionFloor,
+    Scene,
+    get_step_limit_from_dimensions
+)
 
 from .ile_helper import prior_scene_with_target, prior_scene_with_targets
 
@@ -119,6 +123,91 @@ def test_set_performer_start_rotation():
     assert scene.performer_start.rotation == Vector3d(x=23, y=258, z=0)
 
 
+def test_create_draft():
+    scene = Scene(
+        holes=[Vector2dInt(x=1, z=1)],
+        lava=[Vector2dInt(x=2, z=2)],
+        objects=[SceneObject({'id': 'object_1'})]
+    )
+    draft = scene.create_draft()
+    assert draft == scene
+    draft.holes.append(Vector2dInt(x=3, z=3))
+    draft.lava.append(Vector2dInt(x=4, z=4))
+    draft.objects.append(SceneObject({'id': 'object_2'}))
+    draft.floor_textures.append(
+        FloorTexturesConfig(material='blue', positions=[Vector2dInt()])
+    )
+    draft.room_dimensions = Vector3d(x=5, y=3, z=5)
+    # The original scene is unchanged.
+    assert scene.holes == [Vector2dInt(x=1, z=1)]
+    assert scene.lava == [Vector2dInt(x=2, z=2)]
+    assert scene.objects == [SceneObject({'id': 'object_1'})]
+    assert scene.floor_textures == []
+    assert scene.room_dimensions == Vector3d(x=10, y=3, z=10)
+
+
+def test_commit_draft():
+    scene = Scene(objects=[SceneObject({'id': 'object_1'})])
+    draft = scene.create_draft()
+    draft.lava.append(Vector2dInt(x=2, z=2))
+    draft.objects.append(SceneObject({'id': 'object_2'}))
+    scene.commit_draft(draft)
+    assert scene.lava == [Vector2dInt(x=2, z=2)]
+    assert scene.objects == [
+        SceneObject({'id': 'object_1'}),
+        SceneObject({'id': 'object_2'})
+    ]
+
+
+def test_get_floor_grid():
+    scene = Scene(
+        holes=[Vector2dInt(x=1, z=1)],
+        lava=[Vector2dInt(x=2, z=2)],
+        floor_textures=[FloorTexturesConfig(
+            material='blue',
+            positions=[Vector2dInt(x=3, z=3)]
+        )]
+    )
+    floor_grid = scene.get_floor_grid()
+    assert floor_grid.find_cells(geometry.FLOOR_HOLE) == [(1, 1)]
+    assert floor_grid.find_cells(geometry.FLOOR_LAVA) == [(2, 2)]
+    assert floor_grid.find_cells(geometry.FLOOR_TEXTURE) == [(3, 3)]
+    assert floor_grid.find_cells(geometry.FLOOR_PARTITION) == []
+    assert scene.get_floor_grid() is floor_grid
+
+    # Added holes, lava, and floor textures update the same grid.
+    scene.holes.append(Vector2dInt(x=-1, z=-1))
+    scene.lava += [Vector2dInt(x=-2, z=-2)]
+    scene.floor_textures[0].positions.append(Vector2dInt(x=-3, z=-3))
+    assert scene.get_floor_grid() is floor_grid
+    assert floor_grid.find_cells(geometry.FLOOR_HOLE) == [(-1, -1), (1, 1)]
+    assert floor_grid.find_cells(geometry.FLOOR_LAVA) == [(-2, -2), (2, 2)]
+    assert floor_grid.find_cells(geometry.FLOOR_TEXTURE) == [
+        (-3, -3), (3, 3)
+    ]
+
+    # Replaced lists or partition floors rebuild the grid.
+    scene.lava = scene.lava[:1]
+    scene.partition_floor = PartitionFloor(rightHalf=0.2)
+    floor_grid = scene.get_floor_grid()
+    assert floor_grid.find_cells(geometry.FLOOR_LAVA) == [(2, 2)]
+    assert floor_grid.find_cells(geometry.FLOOR_PARTITION) == [
+        (x, z) for x in [4, 5] for z in range(-5, 6)
+    ]
+
+
+def test_get_floor_grid_draft():
+    scene = Scene(lava=[Vector2dInt(x=2, z=2)])
+    floor_grid = scene.get_floor_grid()
+    draft = scene.create_draft()
+    draft.lava.append(Vector2dInt(x=3, z=3))
+    assert draft.get_floor_grid().has(3, 3, geometry.FLOOR_LAVA)
+    assert not scene.get_floor_grid().has(3, 3, geometry.FLOOR_LAVA)
+    assert scene.get_floor_grid() is floor_grid
+    scene.commit_draft(draft)
+    assert scene.get_floor_grid().has(3, 3, geometry.FLOOR_LAVA)
+
+
 def test_to_dict():
     scene = Scene()
     d = scene.to_dict()
@@ -322,6 +411,51 @@ def test_find_bounds():
     assert scene.find_bounds() == [bounds_4, bounds_3, bounds_1, bounds_2]
 
 
+def test_find_bounds_updates():
+    bounds_1 = ObjectBounds(box_xz=[
+        Vector3d(x=1, y=0, z=1),
+        Vector3d(x=2, y=0, z=1),
+        Vector3d(x=2, y=0, z=2),
+        Vector3d(x=1, y=0, z=2)
+    ], max_y=1, min_y=0)
+    bounds_2 = ObjectBounds(box_xz=[
+        Vector3d(x=-1, y=0, z=-1),
+        Vector3d(x=-2, y=0, z=-1),
+        Vector3d(x=-2, y=0, z=-2),
+        Vector3d(x=-1, y=0, z=-2)
+    ], max_y=1, min_y=0)
+    bounds_3 = geometry.generate_floor_area_bounds(3, 3)
+    scene = Scene(objects=[
+        {'id': 'id_1', 'shows': [{'boundingBox': bounds_1}]}
+    ])
+    assert scene.find_bounds() == [bounds_1]
+
+    # Changing the output list doesn't change the scene's bounds.
+    output = scene.find_bounds()
+    output.append(bounds_2)
+    assert scene.find_bounds() == [bounds_1]
+
+    # Add an object.
+    scene.objects.append({'id': 'id_2', 'shows': [{'boundingBox': bounds_2}]})
+    assert scene.find_bounds() == [bounds_1, bounds_2]
+    assert scene.find_bounds(ignore_ids=['id_1']) == [bounds_2]
+
+    # Add a hole.
+    scene.holes.append(Vector2dInt(x=3, z=3))
+    assert scene.find_bounds() == [bounds_3, bounds_1, bounds_2]
+    assert scene.find_bounds(ignore_ground=True) == [bounds_1, bounds_2]
+    assert scene.find_bounds(ignore_ids=['id_2']) == [bounds_3, bounds_1]
+
+    # Move an object.
+    scene.objects[0]['shows'][0]['boundingBox'] = bounds_2
+    assert scene.find_bounds() == [bounds_3, bounds_2, bounds_2]
+
+    # Remove an object.
+    scene.objects.pop(0)
+    assert scene.find_bounds() == [bounds_3, bounds_2]
+    assert scene.find_bounds(ignore_ground=True) == [bounds_2]
+
+
 def test_find_bounds_ignore_id():
     bounds_1 = ObjectBounds(box_xz=[
         Vector3d(x=1, y=0, z=1),